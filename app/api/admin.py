@@ -6,6 +6,8 @@ from app.models.mesa import Mesa
 from app.schemas.plato import PlatoCreate, PlatoUpdate, PlatoResponse, CategoriaPlatoCreate, CategoriaPlatoResponse
 from app.schemas.mesa import MesaCreate, MesaUpdate, MesaResponse
 from app.core.dependencies import RequireAdmin
+from app.core.catalogo import catalogo
+from app.core.ocupacion import ocupacion
 
 router = APIRouter(prefix="/admin", tags=["Administración"])
 
@@ -20,16 +22,21 @@ async def listar_categorias(_=RequireAdmin):
 async def crear_categoria(data: CategoriaPlatoCreate, _=RequireAdmin):
     cat = CategoriaPlato(**data.model_dump())
     await cat.insert()
+    catalogo.guardar_categoria(cat)
     return CategoriaPlatoResponse(id=str(cat.id), **cat.model_dump(exclude={"id"}))
 
 
 @router.get("/platos", response_model=list[PlatoResponse])
 async def listar_platos(_=RequireAdmin):
     platos = await Plato.find().sort(Plato.nombre).to_list()
+    await catalogo.asegurar()
+    if any(p.categoria_id and not catalogo.categoria(p.categoria_id) for p in platos):
+        # Categoría creada por otro worker después de la última carga.
+        await catalogo.cargar()
     cat_map = {}
     for p in platos:
         if p.categoria_id and p.categoria_id not in cat_map:
-            cat = await CategoriaPlato.get(PydanticObjectId(p.categoria_id))
+            cat = catalogo.categoria(p.categoria_id)
             cat_map[p.categoria_id] = CategoriaPlatoResponse(id=str(cat.id), nombre=cat.nombre, descripcion=cat.descripcion, orden=cat.orden) if cat else None
     return [
         PlatoResponse(id=str(p.id), categoria_id=p.categoria_id, categoria=cat_map.get(p.categoria_id), **p.model_dump(exclude={"id", "categoria_id"}))
@@ -41,6 +48,7 @@ async def listar_platos(_=RequireAdmin):
 async def crear_plato(data: PlatoCreate, _=RequireAdmin):
     plato = Plato(**data.model_dump())
     await plato.insert()
+    catalogo.guardar_plato(plato)
     return PlatoResponse(id=str(plato.id), categoria_id=plato.categoria_id, categoria=None, **plato.model_dump(exclude={"id", "categoria_id"}))
 
 
@@ -52,6 +60,7 @@ async def actualizar_plato(plato_id: str, data: PlatoUpdate, _=RequireAdmin):
     for k, v in data.model_dump(exclude_unset=True).items():
         setattr(plato, k, v)
     await plato.save()
+    catalogo.guardar_plato(plato)
     return PlatoResponse(id=str(plato.id), categoria_id=plato.categoria_id, categoria=None, **plato.model_dump(exclude={"id", "categoria_id"}))
 
 
@@ -61,6 +70,7 @@ async def eliminar_plato(plato_id: str, _=RequireAdmin):
     if not plato:
         raise HTTPException(404, "Plato no encontrado")
     await plato.delete()
+    catalogo.quitar_plato(plato_id)
     return {"ok": True}
 
 
@@ -76,6 +86,7 @@ async def crear_mesa(data: MesaCreate, _=RequireAdmin):
         raise HTTPException(400, f"Ya existe una mesa con número {data.numero}")
     mesa = Mesa(**data.model_dump())
     await mesa.insert()
+    catalogo.guardar_mesa(mesa)
     return MesaResponse(id=str(mesa.id), activa=mesa.activa, **mesa.model_dump(exclude={"id"}))
 
 
@@ -87,6 +98,7 @@ async def actualizar_mesa(mesa_id: str, data: MesaUpdate, _=RequireAdmin):
     for k, v in data.model_dump(exclude_unset=True).items():
         setattr(mesa, k, v)
     await mesa.save()
+    catalogo.guardar_mesa(mesa)
     return MesaResponse(id=str(mesa.id), activa=mesa.activa, **mesa.model_dump(exclude={"id"}))
 
 
@@ -97,4 +109,12 @@ async def eliminar_mesa(mesa_id: str, _=RequireAdmin):
         raise HTTPException(404, "Mesa no encontrada")
     mesa.activa = 0
     await mesa.save()
+    catalogo.guardar_mesa(mesa)
     return {"ok": True, "mensaje": "Mesa desactivada"}
+
+
+@router.post("/mesas/ocupacion/reconstruir")
+async def reconstruir_ocupacion(_=RequireAdmin):
+    """Recalcula el índice de ocupación de mesas desde las comandas activas."""
+    ocupadas = await ocupacion.reconstruir()
+    return {"ok": True, "mesas_ocupadas": ocupadas}
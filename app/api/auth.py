@@ -4,8 +4,9 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from pymongo.errors import DuplicateKeyError
 from app.models.user import User
 from app.schemas.auth import UserLogin, UserCreate, UserResponse, Token
-from app.core.security import verify_password, get_password_hash, create_access_token
+from app.core.security import verify_password_async, get_password_hash_async, create_access_token
 from app.core.dependencies import get_current_user, RequireAdmin
+from app.core.cache_tokens import UsuarioActual
 
 router = APIRouter(prefix="/auth", tags=["Autenticación"])
 logger = logging.getLogger(__name__)
@@ -14,7 +15,7 @@ logger = logging.getLogger(__name__)
 @router.post("/login", response_model=Token)
 async def login(data: UserLogin):
     user = await User.find_one(User.email == data.email, User.activo == 1)
-    if not user or not verify_password(data.password, user.hashed_password):
+    if not user or not await verify_password_async(data.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Email o contraseña incorrectos")
     token = create_access_token(data={"sub": str(user.id), "rol": user.rol.value})
     return Token(
@@ -30,7 +31,7 @@ async def register(data: UserCreate):
             raise HTTPException(status_code=400, detail="El email ya está registrado")
         user = User(
             email=data.email,
-            hashed_password=get_password_hash(data.password),
+            hashed_password=await get_password_hash_async(data.password),
             nombre=data.nombre,
             apellido=data.apellido,
             rol=data.rol,
@@ -47,12 +48,12 @@ async def register(data: UserCreate):
 
 
 @router.post("/register/admin", response_model=UserResponse)
-async def register_admin(data: UserCreate, _: User = RequireAdmin):
+async def register_admin(data: UserCreate, _: UsuarioActual = RequireAdmin):
     if await User.find_one(User.email == data.email):
         raise HTTPException(status_code=400, detail="El email ya está registrado")
     user = User(
         email=data.email,
-        hashed_password=get_password_hash(data.password),
+        hashed_password=await get_password_hash_async(data.password),
         nombre=data.nombre,
         apellido=data.apellido,
         rol=data.rol,
@@ -62,5 +63,8 @@ async def register_admin(data: UserCreate, _: User = RequireAdmin):
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_me(user: User = Depends(get_current_user)):
+async def get_me(usuario: UsuarioActual = Depends(get_current_user)):
+    user = await User.get(usuario.id)
+    if not user:
+        raise HTTPException(status_code=401, detail="Usuario no encontrado")
     return UserResponse(id=str(user.id), email=user.email, nombre=user.nombre, apellido=user.apellido, rol=user.rol)
@@ -1,63 +1,123 @@
 """API Área Cliente - Menú, comandas y notificación mesonera."""
-from fastapi import APIRouter, HTTPException
+import gzip
+import hashlib
+import json
+from typing import NamedTuple
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Request, Response
 from beanie import PydanticObjectId
-from beanie.operators import In, NE, And
-from app.models.plato import Plato, CategoriaPlato
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 from app.models.cliente import Cliente
-from app.models.comanda import Comanda, ComandaDetalleEmbedded, OrigenComanda, EstadoComanda
-from app.models.mesa import Mesa
+from app.models.comanda import Comanda, ComandaHistorico, ComandaDetalleEmbedded, OrigenComanda, EstadoComanda
 from app.schemas.plato import PlatoMenuResponse
-from app.schemas.comanda import ComandaCreate, ComandaResponse, ComandaDetalleResponse
+from app.schemas.cliente import ClienteCreate
+from app.schemas.comanda import ComandaCreate, ComandaResponse, ComandaLoteItem, ComandaLoteResultado
 from app.schemas.mesa import MesaSelectItem
+from app.config import get_settings
+from app.core.busqueda import tokens_cliente
+from app.core.catalogo import catalogo
+from app.core.middleware import codificaciones_aceptadas
+from app.core.ocupacion import ocupacion
+from app.core.relaciones import comanda_response
+from app.core.respuestas import respuesta
+from app.core.secuencias import secuencia_comandas, formatear_numero_comanda
+from app.api.websocket import emitir_cocina_creada, emitir_cocina_creadas
 
 router = APIRouter(prefix="/cliente", tags=["Área Cliente"])
+settings = get_settings()
 
 
 @router.get("/mesas-disponibles", response_model=list[MesaSelectItem])
 async def get_mesas_disponibles():
     """Mesas activas sin comanda activa. Público."""
-    estados_ocupada = [
-        EstadoComanda.PENDIENTE,
-        EstadoComanda.EN_PREPARACION,
-        EstadoComanda.LISTA,
-        EstadoComanda.ENTREGADA,
-    ]
-    comandas_activas = await Comanda.find(
-        And(
-            NE(Comanda.mesa_id, None),
-            In(Comanda.estado, estados_ocupada),
-        )
-    ).to_list()
-    mesas_ocupadas = {str(c.mesa_id) for c in comandas_activas if c.mesa_id}
-    mesas = await Mesa.find(Mesa.activa == 1).sort(Mesa.numero).to_list()
-    disponibles = [m for m in mesas if str(m.id) not in mesas_ocupadas]
+    await catalogo.asegurar()
+    await ocupacion.asegurar()
+    disponibles = [m for m in catalogo.mesas_activas() if ocupacion.estado_mesa(str(m.id)) == "libre"]
     return [MesaSelectItem(id=str(m.id), numero=m.numero, capacidad=m.capacidad, ubicacion=m.ubicacion) for m in disponibles]
 
 
+class _MenuCodificado(NamedTuple):
+    """Menú ya serializado para una versión del catálogo."""
+    version: int
+    etag: str
+    cuerpo: bytes
+    cuerpo_gzip: bytes
+
+
+_menu: _MenuCodificado | None = None
+
+
+def _menu_codificado() -> _MenuCodificado:
+    """Serializa el menú una sola vez por versión del catálogo."""
+    global _menu
+    if _menu is None or _menu.version != catalogo.version:
+        cat_map = {str(c.id): c.nombre for c in catalogo.categorias_activas()}
+        items = [
+            PlatoMenuResponse(
+                id=str(p.id),
+                nombre=p.nombre,
+                descripcion=p.descripcion,
+                precio=p.precio,
+                imagen_url=p.imagen_url,
+                categoria=cat_map.get(p.categoria_id),
+            ).model_dump(mode="json")
+            for p in catalogo.platos_disponibles() if p.categoria_id in cat_map
+        ]
+        cuerpo = json.dumps(items, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        # ETag derivado del contenido: igual en todos los workers para el mismo menú.
+        etag = hashlib.sha256(cuerpo).hexdigest()[:32]
+        _menu = _MenuCodificado(catalogo.version, etag, cuerpo, gzip.compress(cuerpo, compresslevel=9, mtime=0))
+    return _menu
+
+
+def precalentar_menu():
+    """Codifica el menú al arrancar (con el catálogo ya cargado) para que la primera request no lo haga."""
+    _menu_codificado()
+
+
+def _etag_coincidente(if_none_match: str | None, etags: tuple[str, ...]) -> str | None:
+    """ETag de `etags` que el cliente ya tiene (el primero si envía *); None si ninguno."""
+    if not if_none_match:
+        return None
+    for valor in if_none_match.split(","):
+        valor = valor.strip().removeprefix("W/")
+        if valor == "*":
+            return etags[0]
+        if valor in etags:
+            return valor
+    return None
+
+
 @router.get("/menu", response_model=list[PlatoMenuResponse])
-async def get_menu():
-    """Obtener menú completo. Público."""
-    categorias = await CategoriaPlato.find(CategoriaPlato.activo == 1).sort(CategoriaPlato.orden).to_list()
-    cat_map = {str(c.id): c.nombre for c in categorias}
-    platos = await Plato.find(Plato.disponible == 1).sort(Plato.nombre).to_list()
-    return [
-        PlatoMenuResponse(
-            id=str(p.id),
-            nombre=p.nombre,
-            descripcion=p.descripcion,
-            precio=p.precio,
-            imagen_url=p.imagen_url,
-            categoria=cat_map.get(p.categoria_id),
-        )
-        for p in platos if p.categoria_id in cat_map
-    ]
+async def get_menu(request: Request):
+    """
+    Obtener menú completo. Público.
+    Se sirve pre-serializado (y pre-comprimido) con ETag; responde 304 si el
+    cliente ya tiene la versión actual.
+    """
+    await catalogo.asegurar()
+    menu = _menu_codificado()
+    etag, etag_gzip = f'"{menu.etag}"', f'"{menu.etag}-gz"'
+    headers = {
+        "Cache-Control": f"public, max-age={settings.MENU_MAX_AGE_SEGUNDOS}",
+        "Vary": "Accept-Encoding",
+    }
+    acepta_gzip = "gzip" in codificaciones_aceptadas(request.headers.get("accept-encoding", ""))
+    # El 304 repite el ETag de la representación que el cliente tiene (gzip o sin comprimir).
+    coincide = _etag_coincidente(request.headers.get("if-none-match"), (etag_gzip, etag) if acepta_gzip else (etag, etag_gzip))
+    if coincide:
+        return Response(status_code=304, headers={**headers, "ETag": coincide})
+    if acepta_gzip:
+        return Response(menu.cuerpo_gzip, media_type="application/json", headers={**headers, "ETag": etag_gzip, "Content-Encoding": "gzip"})
+    return Response(menu.cuerpo, media_type="application/json", headers={**headers, "ETag": etag})
 
 
 @router.post("/comanda", response_model=ComandaResponse)
-async def crear_comanda_cliente(data: ComandaCreate):
+async def crear_comanda_cliente(data: ComandaCreate, request: Request):
     if data.origen != OrigenComanda.AREA_CLIENTE:
         raise HTTPException(400, "Origen debe ser area_cliente")
-    return await _crear_comanda(data, usuario_id=None)
+    return respuesta(request, await _crear_comanda(data, usuario_id=None))
 
 
 @router.post("/notificar-mesonera")
@@ -70,38 +130,31 @@ async def notificar_mesonera(mesa_id: str | None = None, mensaje: str = "El clie
     return {"ok": True, "mensaje": "Notificación enviada", "id": str(notif.id)}
 
 
-async def _crear_comanda(data: ComandaCreate, usuario_id: str | None = None):
+def _faltan_en_catalogo(datos: list[ComandaCreate]) -> bool:
+    return any(
+        (d.mesa_id and not catalogo.mesa(d.mesa_id)) or any(not catalogo.plato(det.plato_id) for det in d.platos)
+        for d in datos
+    )
+
+
+async def _asegurar_catalogo(datos: list[ComandaCreate]):
+    """Catálogo vigente y, si falta alguna mesa o plato pedido, recargado una vez antes de validar."""
+    await catalogo.asegurar()
+    if _faltan_en_catalogo(datos):
+        # Creado por otro worker después de la última carga (TTL de CATALOGO_TTL_SEGUNDOS).
+        await catalogo.recargar()
+
+
+def _armar_detalles(data: ComandaCreate) -> tuple[list[ComandaDetalleEmbedded], float]:
+    """Valida mesa y platos contra el catálogo (ya cargado) y calcula el subtotal."""
     if data.mesa_id:
-        mesa = await Mesa.get(PydanticObjectId(data.mesa_id))
+        mesa = catalogo.mesa(data.mesa_id)
         if not mesa or mesa.activa != 1:
             raise HTTPException(400, f"Mesa no encontrada o inactiva")
-
-    cliente = await Cliente.find_one(Cliente.cedula == data.cliente.cedula)
-    if not cliente:
-        cliente = Cliente(
-            cedula=data.cliente.cedula,
-            nombre=data.cliente.nombre,
-            apellido=data.cliente.apellido,
-            direccion=data.cliente.direccion,
-            telefono=data.cliente.telefono,
-            email=data.cliente.email,
-        )
-        await cliente.insert()
-    else:
-        cliente.nombre = data.cliente.nombre
-        cliente.apellido = data.cliente.apellido
-        cliente.direccion = data.cliente.direccion
-        cliente.telefono = data.cliente.telefono
-        cliente.email = data.cliente.email
-        await cliente.save()
-
-    count = await Comanda.count()
-    numero = f"CMD-{count + 1:06d}"
-
     detalles_embed = []
     subtotal = 0.0
     for det in data.platos:
-        plato = await Plato.get(PydanticObjectId(det.plato_id))
+        plato = catalogo.plato(det.plato_id)
         if not plato:
             raise HTTPException(400, f"Plato {det.plato_id} no encontrado")
         st = plato.precio * det.cantidad
@@ -114,12 +167,23 @@ async def _crear_comanda(data: ComandaCreate, usuario_id: str | None = None):
             subtotal=st,
             observaciones=det.observaciones,
         ))
+    return detalles_embed, subtotal
 
+
+def _nueva_comanda(
+    data: ComandaCreate,
+    usuario_id: str | None,
+    cliente_id: str,
+    numero: int,
+    detalles: list[ComandaDetalleEmbedded],
+    subtotal: float,
+    clave_idempotencia: str | None = None,
+) -> Comanda:
     impuesto = subtotal * 0.12
-    comanda = Comanda(
-        numero=numero,
+    return Comanda(
+        numero=formatear_numero_comanda(numero),
         mesa_id=data.mesa_id,
-        cliente_id=str(cliente.id),
+        cliente_id=cliente_id,
         usuario_id=usuario_id,
         estado=EstadoComanda.PENDIENTE,
         forma_pago=data.forma_pago,
@@ -128,36 +192,179 @@ async def _crear_comanda(data: ComandaCreate, usuario_id: str | None = None):
         subtotal=subtotal,
         impuesto=impuesto,
         total=subtotal + impuesto,
-        detalles=detalles_embed,
+        detalles=detalles,
+        clave_idempotencia=clave_idempotencia,
     )
-    await comanda.insert()
-
-    detalles_resp = [
-        ComandaDetalleResponse(
-            plato_id=d.plato_id,
-            plato_nombre=d.plato_nombre,
-            cantidad=d.cantidad,
-            precio_unitario=d.precio_unitario,
-            subtotal=d.subtotal,
-            observaciones=d.observaciones,
+
+
+def _campos_cliente(c: ClienteCreate) -> dict:
+    return {
+        "nombre": c.nombre,
+        "apellido": c.apellido,
+        "direccion": c.direccion,
+        "telefono": c.telefono,
+        "email": c.email,
+        "busqueda": tokens_cliente(c.nombre, c.apellido, c.cedula),
+    }
+
+
+def _update_cliente(c: ClienteCreate) -> dict:
+    # $set con valores iguales es un no-op en MongoDB: un cliente sin cambios no se reescribe.
+    return {"$set": _campos_cliente(c), "$setOnInsert": {"cedula": c.cedula, "created_at": datetime.utcnow()}}
+
+
+async def _upsert_cliente(c: ClienteCreate) -> Cliente:
+    """Alta o actualización del cliente por cédula en un solo findOneAndUpdate."""
+    coleccion = Cliente.get_motor_collection()
+    try:
+        doc = await coleccion.find_one_and_update(
+            {"cedula": c.cedula}, _update_cliente(c), upsert=True, projection={"_id": 1}, return_document=ReturnDocument.AFTER,
         )
-        for d in comanda.detalles
-    ]
-    return ComandaResponse(
-        id=str(comanda.id),
-        numero=comanda.numero,
-        mesa_id=comanda.mesa_id,
-        mesa_numero=(await Mesa.get(PydanticObjectId(data.mesa_id))).numero if data.mesa_id else None,
-        cliente_id=str(cliente.id),
-        estado=comanda.estado,
-        forma_pago=comanda.forma_pago,
-        origen=comanda.origen,
-        subtotal=comanda.subtotal,
-        impuesto=comanda.impuesto,
-        total=comanda.total,
-        observaciones=comanda.observaciones,
-        created_at=comanda.created_at,
-        detalles=detalles_resp,
-        cliente_nombre=f"{cliente.nombre} {cliente.apellido}",
-        cliente_cedula=cliente.cedula,
-    )
+    except DuplicateKeyError:
+        # Dos comandas simultáneas con la misma cédula nueva: el índice único deja
+        # insertar a una; la otra actualiza el documento ya creado.
+        doc = await coleccion.find_one_and_update(
+            {"cedula": c.cedula}, {"$set": _campos_cliente(c)}, projection={"_id": 1}, return_document=ReturnDocument.AFTER,
+        )
+    return Cliente(id=doc["_id"], cedula=c.cedula, **_campos_cliente(c))
+
+
+async def _upsert_clientes(clientes: dict[str, ClienteCreate]):
+    """_upsert_cliente para varias cédulas en un solo bulk_write (sin leer los ids)."""
+    coleccion = Cliente.get_motor_collection()
+    try:
+        await coleccion.bulk_write([
+            UpdateOne({"cedula": cedula}, _update_cliente(c), upsert=True)
+            for cedula, c in clientes.items()
+        ], ordered=False)
+    except BulkWriteError as e:
+        errores = e.details.get("writeErrors", [])
+        if any(err.get("code") != 11000 for err in errores):
+            raise
+        # Cédulas nuevas insertadas a la vez por otra sincronización: se actualiza el documento ya creado.
+        fallidas = {err["index"] for err in errores}
+        repetidas = [cedula for i, cedula in enumerate(clientes) if i in fallidas]
+        await coleccion.bulk_write([
+            UpdateOne({"cedula": cedula}, {"$set": _campos_cliente(clientes[cedula])})
+            for cedula in repetidas
+        ], ordered=False)
+
+
+async def _crear_comanda(data: ComandaCreate, usuario_id: str | None = None):
+    await _asegurar_catalogo([data])
+    detalles_embed, subtotal = _armar_detalles(data)
+    mesa = catalogo.mesa(data.mesa_id)
+
+    cliente = await _upsert_cliente(data.cliente)
+
+    comanda = _nueva_comanda(data, usuario_id, str(cliente.id), await secuencia_comandas.siguiente(), detalles_embed, subtotal)
+    for intento in range(3):
+        try:
+            await comanda.insert()
+            break
+        except DuplicateKeyError:
+            # El índice único de numero protege ante un contador desfasado: se toma otro número.
+            if intento == 2:
+                raise
+            comanda.numero = formatear_numero_comanda(await secuencia_comandas.siguiente())
+    await ocupacion.registrar(comanda)
+    await emitir_cocina_creada(comanda)
+
+    return comanda_response(comanda, cliente, mesa)
+
+
+def _filtro_claves(claves: list[str]) -> dict:
+    # Repite el filtro parcial del índice de clave_idempotencia para que el planner lo use.
+    return {"clave_idempotencia": {"$in": claves, "$type": "string"}}
+
+
+async def _crear_comandas_lote(items: list[ComandaLoteItem], usuario_id: str) -> list[ComandaLoteResultado]:
+    """
+    Ingesta en bloque para la sincronización offline del punto de venta.
+    Una lectura de catálogo, una consulta de claves ya sincronizadas (vivas y archivadas), un bulk_write
+    de clientes, una consulta de sus ids, una reserva de números y un insert_many (más una reserva
+    y un insert_many por reintento si el índice único de numero rechaza alguna).
+    La clave de idempotencia hace que reenviar el mismo lote no duplique comandas.
+    """
+    await _asegurar_catalogo([item.comanda for item in items])
+    resultados: dict[str, ComandaLoteResultado] = {}
+    pendientes: dict[str, ComandaLoteItem] = {}
+    for item in items:
+        # Una clave repetida dentro del lote es la misma comanda: cuenta la primera.
+        pendientes.setdefault(item.clave, item)
+
+    coleccion = Comanda.get_motor_collection()
+    # Las ya sincronizadas pueden estar archivadas: se buscan en las dos colecciones.
+    for modelo in (Comanda, ComandaHistorico):
+        if not pendientes:
+            break
+        existentes = modelo.get_motor_collection().find(_filtro_claves(list(pendientes)), {"clave_idempotencia": 1, "numero": 1})
+        async for doc in existentes:
+            clave = doc["clave_idempotencia"]
+            pendientes.pop(clave, None)
+            resultados[clave] = ComandaLoteResultado(clave=clave, ok=True, duplicada=True, comanda_id=str(doc["_id"]), numero=doc["numero"])
+
+    validas: dict[str, tuple[ComandaLoteItem, list[ComandaDetalleEmbedded], float]] = {}
+    for clave, item in pendientes.items():
+        if item.comanda.origen != OrigenComanda.PUNTO_VENTA:
+            resultados[clave] = ComandaLoteResultado(clave=clave, ok=False, error="Origen debe ser punto_venta")
+            continue
+        try:
+            detalles, subtotal = _armar_detalles(item.comanda)
+        except HTTPException as e:
+            resultados[clave] = ComandaLoteResultado(clave=clave, ok=False, error=str(e.detail))
+            continue
+        validas[clave] = (item, detalles, subtotal)
+
+    comandas: dict[str, Comanda] = {}
+    if validas:
+        # Un upsert por cédula; si se repite en el lote gana la última versión.
+        clientes = {item.comanda.cliente.cedula: item.comanda.cliente for item, _, _ in validas.values()}
+        await _upsert_clientes(clientes)
+        ids_cliente = {
+            doc["cedula"]: str(doc["_id"])
+            async for doc in Cliente.get_motor_collection().find({"cedula": {"$in": list(clientes)}}, {"cedula": 1})
+        }
+        numeros = await secuencia_comandas.siguientes(len(validas))
+        for numero, (clave, (item, detalles, subtotal)) in zip(numeros, validas.items()):
+            comanda = _nueva_comanda(item.comanda, usuario_id, ids_cliente[item.comanda.cliente.cedula], numero, detalles, subtotal, clave)
+            comanda.id = PydanticObjectId()
+            comandas[clave] = comanda
+
+        carrera = []
+        por_insertar = dict(comandas)
+        for intento in range(3):
+            fallidas: dict[int, dict] = {}
+            try:
+                await Comanda.insert_many(list(por_insertar.values()), ordered=False)
+            except BulkWriteError as e:
+                fallidas = {err["index"]: err for err in e.details.get("writeErrors", [])}
+            renumerar = []
+            for indice, (clave, comanda) in enumerate(por_insertar.items()):
+                error = fallidas.get(indice)
+                indice_repetido = (error.get("keyPattern") or {}) if error and error.get("code") == 11000 else {}
+                if error is None:
+                    resultados[clave] = ComandaLoteResultado(clave=clave, ok=True, comanda_id=str(comanda.id), numero=comanda.numero)
+                elif "clave_idempotencia" in indice_repetido:
+                    carrera.append(clave)  # otra sincronización simultánea la insertó primero
+                    del comandas[clave]
+                elif "numero" in indice_repetido and intento < 2:
+                    renumerar.append(clave)  # contador desfasado, como en _crear_comanda: se toma otro número
+                else:
+                    resultados[clave] = ComandaLoteResultado(clave=clave, ok=False, error=error.get("errmsg", "Error al insertar"))
+                    del comandas[clave]
+            if not renumerar:
+                break
+            for clave, numero in zip(renumerar, await secuencia_comandas.siguientes(len(renumerar))):
+                comandas[clave].numero = formatear_numero_comanda(numero)
+            por_insertar = {clave: comandas[clave] for clave in renumerar}
+        if carrera:
+            async for doc in coleccion.find(_filtro_claves(carrera), {"clave_idempotencia": 1, "numero": 1}):
+                resultados[doc["clave_idempotencia"]] = ComandaLoteResultado(
+                    clave=doc["clave_idempotencia"], ok=True, duplicada=True, comanda_id=str(doc["_id"]), numero=doc["numero"],
+                )
+
+    if comandas:
+        await ocupacion.registrar_nuevas(list(comandas.values()))
+        await emitir_cocina_creadas(list(comandas.values()))
+    return [resultados[item.clave] for item in items]
@@ -0,0 +1,19 @@
+"""API de Clientes - Búsqueda rápida (typeahead) por nombre, apellido o cédula."""
+from fastapi import APIRouter, Query, Request
+from app.schemas.cliente import ClienteBusquedaItem
+from app.core.dependencies import RequireMesoneraOrPOS
+from app.core.busqueda import buscar_clientes
+from app.core.respuestas import respuesta
+
+router = APIRouter(prefix="/clientes", tags=["Clientes"])
+
+
+@router.get("/buscar", response_model=list[ClienteBusquedaItem])
+async def buscar(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=100),
+    limite: int = Query(10, ge=1, le=50),
+    _=RequireMesoneraOrPOS,
+):
+    """Clientes cuyas palabras (sin acentos ni mayúsculas) o cédula empiezan por lo escrito en `q`."""
+    return respuesta(request, await buscar_clientes(q, limite))
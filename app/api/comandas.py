@@ -1,42 +1,48 @@
 """API común para actualizar estado de comandas."""
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from enum import Enum
+from fastapi import APIRouter, Depends, HTTPException, Request
 from beanie import PydanticObjectId
 from app.models.comanda import Comanda
-from app.models.cliente import Cliente
-from app.models.mesa import Mesa
-from app.schemas.comanda import ComandaUpdate, ComandaResponse, ComandaDetalleResponse
+from app.schemas.comanda import ComandaUpdate, ComandaResponse
 from app.core.dependencies import RequireMesoneraOrPOS
+from app.core.relaciones import RelacionesComanda
+from app.core.ocupacion import ocupacion
+from app.core import resumenes
+from app.core.respuestas import respuesta
+from app.api.websocket import emitir_cocina_estado
 
 router = APIRouter(prefix="/comandas", tags=["Comandas"])
 
 
 @router.patch("/{comanda_id}", response_model=ComandaResponse)
-async def actualizar_comanda(comanda_id: str, data: ComandaUpdate, _=RequireMesoneraOrPOS):
+async def actualizar_comanda(
+    comanda_id: str,
+    data: ComandaUpdate,
+    request: Request,
+    _=RequireMesoneraOrPOS,
+    relaciones: RelacionesComanda = Depends(RelacionesComanda),
+):
     comanda = await Comanda.get(PydanticObjectId(comanda_id))
     if not comanda:
         raise HTTPException(404, "Comanda no encontrada")
-    if data.estado is not None:
-        comanda.estado = data.estado
-    if data.forma_pago is not None:
-        comanda.forma_pago = data.forma_pago
-    await comanda.save()
-    cliente = await Cliente.get(PydanticObjectId(comanda.cliente_id)) if comanda.cliente_id else None
-    mesa = await Mesa.get(PydanticObjectId(comanda.mesa_id)) if comanda.mesa_id else None
-    return ComandaResponse(
-        id=str(comanda.id),
-        numero=comanda.numero,
-        mesa_id=comanda.mesa_id,
-        mesa_numero=mesa.numero if mesa else None,
-        cliente_id=comanda.cliente_id,
-        estado=comanda.estado,
-        forma_pago=comanda.forma_pago,
-        origen=comanda.origen,
-        subtotal=comanda.subtotal,
-        impuesto=comanda.impuesto,
-        total=comanda.total,
-        observaciones=comanda.observaciones,
-        created_at=comanda.created_at,
-        detalles=[ComandaDetalleResponse(plato_id=d.plato_id, plato_nombre=d.plato_nombre, cantidad=d.cantidad, precio_unitario=d.precio_unitario, subtotal=d.subtotal, observaciones=d.observaciones) for d in comanda.detalles],
-        cliente_nombre=f"{cliente.nombre} {cliente.apellido}" if cliente else None,
-        cliente_cedula=cliente.cedula if cliente else None,
-    )
+    antes = comanda.model_copy(deep=True)
+    cambios = data.model_dump(exclude_none=True)
+    if cambios:
+        # Actualización condicionada a lo leído: dos PATCH simultáneos no pueden
+        # aplicar la misma transición (ni sumarla dos veces a los reportes).
+        cambios["updated_at"] = datetime.utcnow()
+        resultado = await Comanda.get_motor_collection().update_one(
+            {"_id": comanda.id, "estado": antes.estado.value, "forma_pago": antes.forma_pago.value if antes.forma_pago else None},
+            {"$set": {k: v.value if isinstance(v, Enum) else v for k, v in cambios.items()}},
+        )
+        if resultado.matched_count == 0:
+            raise HTTPException(409, "La comanda cambió mientras se actualizaba, intente de nuevo")
+        for k, v in cambios.items():
+            setattr(comanda, k, v)
+        await resumenes.registrar_cambio(antes, comanda)
+    if comanda.estado != antes.estado:
+        await ocupacion.registrar(comanda)
+        await emitir_cocina_estado(comanda)
+    await relaciones.cargar([comanda])
+    return respuesta(request, relaciones.response(comanda))
@@ -1,62 +1,189 @@
 """API Módulo de Facturación - Búsqueda y filtros."""
-from fastapi import APIRouter, Depends, Query
-from datetime import date, datetime
+import asyncio
+from fastapi import APIRouter, Depends, Query, Request
+from datetime import date, datetime, time, timedelta
 from beanie import PydanticObjectId
-from app.models.comanda import Comanda
+from app.models.comanda import Comanda, ComandaHistorico
 from app.models.cliente import Cliente
 from app.models.mesa import Mesa
 from app.schemas.comanda import ComandaFacturacionResponse
+from app.config import get_settings
 from app.core.dependencies import RequireMesoneraOrPOS
+from app.core.archivo import buscar_comanda, limite_archivo
+from app.core.busqueda import SIN_COINCIDENCIAS, filtro_busqueda, ids_clientes
+from app.core.lectura import coleccion, leer_de
+from app.core.relaciones import RelacionesComanda
+from app.core.respuestas import respuesta
 
-router = APIRouter(prefix="/facturacion", tags=["Facturación"])
+settings = get_settings()
+router = APIRouter(prefix="/facturacion", tags=["Facturación"], dependencies=[Depends(leer_de(settings.MONGODB_LECTURA_REPORTES))])
+
+
+def _lookup_cliente() -> list[dict]:
+    """Une cada comanda con su cliente (cliente_id se guarda como string)."""
+    return [
+        {"$addFields": {"_cliente_oid": {"$convert": {"input": "$cliente_id", "to": "objectId", "onError": None, "onNull": None}}}},
+        {"$lookup": {"from": Cliente.get_collection_name(), "localField": "_cliente_oid", "foreignField": "_id", "as": "cliente"}},
+        {"$unwind": {"path": "$cliente", "preserveNullAndEmptyArrays": True}},
+    ]
+
+
+def _lookup_mesa() -> list[dict]:
+    return [
+        {"$addFields": {"_mesa_oid": {"$convert": {"input": "$mesa_id", "to": "objectId", "onError": None, "onNull": None}}}},
+        {"$lookup": {
+            "from": Mesa.get_collection_name(),
+            "localField": "_mesa_oid",
+            "foreignField": "_id",
+            "as": "mesa",
+        }},
+    ]
+
+
+_CAMPOS_LISTADO = {"numero": 1, "total": 1, "estado": 1, "forma_pago": 1, "created_at": 1, "cliente_id": 1, "mesa_id": 1}
+
+
+def _filtro_comandas(fecha_desde: date | None, fecha_hasta: date | None, cliente_ids: list[str] | None = None) -> dict:
+    match: dict = {}
+    if fecha_desde or fecha_hasta:
+        rango = {}
+        if fecha_desde:
+            rango["$gte"] = datetime.combine(fecha_desde, time.min)
+        if fecha_hasta:
+            rango["$lt"] = datetime.combine(fecha_hasta + timedelta(days=1), time.min)
+        match["created_at"] = rango
+    if cliente_ids is not None:
+        match["cliente_id"] = {"$in": cliente_ids}
+    return match
+
+
+def _rama(match: dict, tope: int, filtro_cliente: dict | None) -> list[dict]:
+    """
+    Etapas de una colección (vivas o histórico): el $sort usa el índice de
+    created_at y se corta en `tope` antes de unir, así ninguna rama ordena ni
+    arrastra más de una página de más. Solo los campos del listado: detalles
+    (lo más pesado) no pasa del primer stage.
+    """
+    if not filtro_cliente:
+        return [{"$match": match}, {"$sort": {"created_at": -1}}, {"$limit": tope}, {"$project": _CAMPOS_LISTADO}]
+    return [
+        {"$match": match}, {"$sort": {"created_at": -1}}, {"$project": _CAMPOS_LISTADO},
+        *_lookup_cliente(), {"$match": filtro_cliente}, {"$limit": tope},
+    ]
+
+
+def _pipeline_busqueda(
+    fecha_desde: date | None,
+    fecha_hasta: date | None,
+    skip: int,
+    limit: int,
+    cliente_ids: list[str] | None = None,
+    filtro_cliente: dict | None = None,
+    incluir_historico: bool = False,
+) -> list[dict]:
+    """
+    Página de la búsqueda de facturación (el total se cuenta aparte, con _contar).
+    El rango de fechas se filtra primero sobre comandas. Los clientes buscados
+    llegan ya resueltos como `cliente_ids` (índice cliente_id); solo si eran
+    demasiados se pasa `filtro_cliente`, que fuerza el $lookup antes de paginar.
+    Con `incluir_historico` se suman, con $unionWith, las comandas archivadas.
+    """
+    match = _filtro_comandas(fecha_desde, fecha_hasta, cliente_ids)
+    pipeline = _rama(match, skip + limit, filtro_cliente)
+    if incluir_historico:
+        pipeline += [
+            {"$unionWith": {"coll": ComandaHistorico.get_collection_name(), "pipeline": _rama(match, skip + limit, filtro_cliente)}},
+            {"$sort": {"created_at": -1}},
+        ]
+
+    pagina: list[dict] = [{"$skip": skip}, {"$limit": limit}]
+    if not filtro_cliente:
+        pagina += _lookup_cliente()
+    pagina += _lookup_mesa() + [{
+        "$project": {
+            "_id": 0,
+            "id": {"$toString": "$_id"},
+            "numero": 1,
+            "mesa_numero": {"$ifNull": [{"$arrayElemAt": ["$mesa.numero", 0]}, None]},
+            "cliente_nombre": {"$ifNull": ["$cliente.nombre", ""]},
+            "cliente_apellido": {"$ifNull": ["$cliente.apellido", ""]},
+            "cliente_cedula": {"$ifNull": ["$cliente.cedula", ""]},
+            "cliente_telefono": {"$ifNull": ["$cliente.telefono", ""]},
+            "total": 1,
+            "estado": 1,
+            "forma_pago": 1,
+            "created_at": 1,
+        }
+    }]
+    return pipeline + pagina
+
+
+async def _contar(modelo, match: dict, filtro_cliente: dict | None) -> int:
+    """Total de una colección para X-Total-Count, con su propio índice (sin pasar por la página)."""
+    if filtro_cliente:
+        pipeline = [{"$match": match}, {"$project": {"cliente_id": 1}}, *_lookup_cliente(), {"$match": filtro_cliente}, {"$count": "n"}]
+        resultado = await coleccion(modelo).aggregate(pipeline).to_list(1)
+        return resultado[0]["n"] if resultado else 0
+    if not match:
+        return await coleccion(modelo).estimated_document_count()
+    return await coleccion(modelo).count_documents(match)
 
 
 @router.get("/comandas", response_model=list[ComandaFacturacionResponse])
 async def buscar_comandas(
+    request: Request,
     nombre: str | None = Query(None),
     cedula: str | None = Query(None),
     fecha_desde: date | None = Query(None),
     fecha_hasta: date | None = Query(None),
+    pagina: int = Query(1, ge=1),
+    por_pagina: int = Query(50, ge=1, le=500),
     _=RequireMesoneraOrPOS,
 ):
-    comandas = await Comanda.find().sort(-Comanda.created_at).to_list()
-    result = []
-    for c in comandas:
-        cliente = await Cliente.get(PydanticObjectId(c.cliente_id)) if c.cliente_id else None
-        if not cliente:
-            continue
-        if nombre and nombre.lower() not in cliente.nombre.lower() and nombre.lower() not in cliente.apellido.lower():
-            continue
-        if cedula and cedula not in cliente.cedula:
-            continue
-        if fecha_desde and c.created_at and c.created_at.date() < fecha_desde:
-            continue
-        if fecha_hasta and c.created_at and c.created_at.date() > fecha_hasta:
-            continue
-        mesa = await Mesa.get(PydanticObjectId(c.mesa_id)) if c.mesa_id else None
-        result.append(ComandaFacturacionResponse(
-            id=str(c.id),
-            numero=c.numero,
-            mesa_numero=mesa.numero if mesa else None,
-            cliente_nombre=cliente.nombre,
-            cliente_apellido=cliente.apellido,
-            cliente_cedula=cliente.cedula,
-            cliente_telefono=cliente.telefono,
-            total=c.total,
-            estado=c.estado,
-            forma_pago=c.forma_pago,
-            created_at=c.created_at,
-        ))
-    return result
+    """
+    Búsqueda paginada. `nombre` y `cedula` buscan por prefijo (sin acentos ni
+    mayúsculas) como /clientes/buscar. El total se devuelve en el header X-Total-Count.
+    """
+    cliente_ids = filtro_cliente = None
+    filtro = filtro_busqueda(nombre, cedula)
+    if filtro is SIN_COINCIDENCIAS:
+        return respuesta(request, [], headers={"X-Total-Count": "0"})
+    if filtro is not None:
+        cliente_ids = await ids_clientes(filtro, settings.BUSQUEDA_MAX_CLIENTES)
+        if cliente_ids == []:
+            return respuesta(request, [], headers={"X-Total-Count": "0"})
+        if cliente_ids is None:
+            filtro_cliente = filtro_busqueda(nombre, cedula, campo="cliente.busqueda")
+    skip = (pagina - 1) * por_pagina
+    # El histórico solo se consulta si el rango empieza antes de lo que ya pudo archivarse. Con el
+    # filtro por $lookup (cada fila se une a su cliente) hace falta además una fecha_desde explícita.
+    if fecha_desde:
+        incluir_historico = datetime.combine(fecha_desde, time.min) < limite_archivo()
+    else:
+        incluir_historico = filtro_cliente is None
+    pipeline = _pipeline_busqueda(fecha_desde, fecha_hasta, skip, por_pagina, cliente_ids, filtro_cliente, incluir_historico)
+    match = _filtro_comandas(fecha_desde, fecha_hasta, cliente_ids)
+    modelos = [Comanda, ComandaHistorico] if incluir_historico else [Comanda]
+    items, *totales = await asyncio.gather(
+        coleccion(Comanda).aggregate(pipeline).to_list(None),
+        *(_contar(modelo, match, filtro_cliente) for modelo in modelos),
+    )
+    # Los items salen del $project con la forma de ComandaFacturacionResponse: se codifican sin revalidar.
+    return respuesta(request, items, headers={"X-Total-Count": str(sum(totales))})
 
 
 @router.get("/comandas/{comanda_id}")
-async def detalle_comanda_facturacion(comanda_id: str, _=RequireMesoneraOrPOS):
-    comanda = await Comanda.get(PydanticObjectId(comanda_id))
+async def detalle_comanda_facturacion(
+    comanda_id: str,
+    _=RequireMesoneraOrPOS,
+    relaciones: RelacionesComanda = Depends(RelacionesComanda),
+):
+    comanda = await buscar_comanda(PydanticObjectId(comanda_id))
     if not comanda:
         return {"error": "Comanda no encontrada"}
-    cliente = await Cliente.get(PydanticObjectId(comanda.cliente_id)) if comanda.cliente_id else None
-    mesa = await Mesa.get(PydanticObjectId(comanda.mesa_id)) if comanda.mesa_id else None
+    await relaciones.cargar([comanda])
+    cliente = relaciones.cliente(comanda.cliente_id)
+    mesa = relaciones.mesa(comanda.mesa_id)
     return {
         "id": str(comanda.id),
         "numero": comanda.numero,
@@ -1,13 +1,35 @@
 """API de Mesas - Listar mesas para seleccionar al crear comanda."""
 from fastapi import APIRouter, Depends
-from app.models.mesa import Mesa
-from app.schemas.mesa import MesaSelectItem
+from app.schemas.mesa import MesaSelectItem, MesaEstadoItem
 from app.core.dependencies import RequireMesoneraOrPOS
+from app.core.catalogo import catalogo
+from app.core.ocupacion import ocupacion
 
 router = APIRouter(prefix="/mesas", tags=["Mesas"])
 
 
 @router.get("", response_model=list[MesaSelectItem])
 async def listar_mesas_para_comanda(_=RequireMesoneraOrPOS):
-    mesas = await Mesa.find(Mesa.activa == 1).sort(Mesa.numero).to_list()
+    await catalogo.asegurar()
+    mesas = catalogo.mesas_activas()
     return [MesaSelectItem(id=str(m.id), numero=m.numero, capacidad=m.capacidad, ubicacion=m.ubicacion) for m in mesas]
+
+
+@router.get("/estado", response_model=list[MesaEstadoItem])
+async def estado_salon(_=RequireMesoneraOrPOS):
+    """Estado de todas las mesas activas (libre, ocupada, por_cobrar) en una sola llamada."""
+    await catalogo.asegurar()
+    await ocupacion.asegurar()
+    result = []
+    for m in catalogo.mesas_activas():
+        ocupada = ocupacion.ocupacion(str(m.id))
+        result.append(MesaEstadoItem(
+            id=str(m.id),
+            numero=m.numero,
+            capacidad=m.capacidad,
+            ubicacion=m.ubicacion,
+            estado=ocupacion.estado_mesa(str(m.id)),
+            comanda_id=ocupada.comanda_id if ocupada else None,
+            comanda_estado=ocupada.estado if ocupada else None,
+        ))
+    return result
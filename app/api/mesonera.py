@@ -1,72 +1,81 @@
 """API Módulo Mesonera - Comandas y notificaciones."""
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException, Request
 from beanie import PydanticObjectId
-from app.models.comanda import Comanda, EstadoComanda, OrigenComanda
-from app.models.cliente import Cliente
-from app.models.mesa import Mesa
+from app.models.comanda import Comanda, ComandaResumen, EstadoComanda, OrigenComanda
 from app.models.notificacion import NotificacionMesonera
-from app.schemas.comanda import ComandaCreate, ComandaResponse, ComandaDetalleResponse, ComandaUpdate
+from app.schemas.comanda import ComandaCreate, ComandaResponse, ComandaResumenResponse, ComandaUpdate
 from app.core.dependencies import RequireMesoneraOrPOS
-from app.models.user import User
+from app.core.archivo import buscar_comanda
+from app.core.relaciones import RelacionesComanda
+from app.core.cache_tokens import UsuarioActual
+from app.core.respuestas import respuesta
 
 router = APIRouter(prefix="/mesonera", tags=["Mesonera"])
 
 
 @router.get("/notificaciones")
-async def listar_notificaciones_pendientes(user: User = RequireMesoneraOrPOS):
+async def listar_notificaciones_pendientes(user: UsuarioActual = RequireMesoneraOrPOS):
     notifs = await NotificacionMesonera.find(NotificacionMesonera.atendida == 0).sort(-NotificacionMesonera.created_at).to_list()
     return [{"id": str(n.id), "mesa_id": n.mesa_id, "mensaje": n.mensaje, "created_at": n.created_at.isoformat() if n.created_at else None} for n in notifs]
 
 
 @router.post("/notificaciones/{notif_id}/atender")
-async def marcar_notificacion_atendida(notif_id: str, user: User = RequireMesoneraOrPOS):
+async def marcar_notificacion_atendida(notif_id: str, user: UsuarioActual = RequireMesoneraOrPOS):
     notif = await NotificacionMesonera.get(PydanticObjectId(notif_id))
     if not notif:
         raise HTTPException(404, "Notificación no encontrada")
     notif.atendida = 1
+    notif.atendida_at = datetime.utcnow()
     await notif.save()
     return {"ok": True}
 
 
 @router.post("/comanda", response_model=ComandaResponse)
-async def crear_comanda_mesonera(data: ComandaCreate, user: User = RequireMesoneraOrPOS):
+async def crear_comanda_mesonera(data: ComandaCreate, request: Request, user: UsuarioActual = RequireMesoneraOrPOS):
     if data.origen != OrigenComanda.MESONERA:
         raise HTTPException(400, "Origen debe ser mesonera")
     from app.api.cliente_area import _crear_comanda
     data_copy = data.model_copy()
     data_copy.origen = OrigenComanda.MESONERA
-    return await _crear_comanda(data_copy, str(user.id))
+    return respuesta(request, await _crear_comanda(data_copy, str(user.id)))
 
 
-@router.get("/comandas", response_model=list[ComandaResponse])
-async def listar_comandas_mesonera(user: User = RequireMesoneraOrPOS, estado: str | None = None):
+@router.get("/comandas", response_model=list[ComandaResponse] | list[ComandaResumenResponse])
+async def listar_comandas_mesonera(
+    request: Request,
+    user: UsuarioActual = RequireMesoneraOrPOS,
+    estado: str | None = None,
+    campos: Literal["completo", "resumen"] = "completo",
+    relaciones: RelacionesComanda = Depends(RelacionesComanda),
+):
+    """`campos=resumen` omite los detalles (se leen con GET /comandas/{id}): no salen de MongoDB."""
+    filtro = {}
     if estado:
         try:
-            comandas = await Comanda.find(Comanda.estado == EstadoComanda(estado)).sort(-Comanda.created_at).to_list()
+            filtro = {"estado": EstadoComanda(estado).value}
         except ValueError:
-            comandas = await Comanda.find().sort(-Comanda.created_at).to_list()
-    else:
-        comandas = await Comanda.find().sort(-Comanda.created_at).to_list()
-    result = []
-    for c in comandas:
-        cliente = await Cliente.get(PydanticObjectId(c.cliente_id)) if c.cliente_id else None
-        mesa = await Mesa.get(PydanticObjectId(c.mesa_id)) if c.mesa_id else None
-        result.append(ComandaResponse(
-            id=str(c.id),
-            numero=c.numero,
-            mesa_id=c.mesa_id,
-            mesa_numero=mesa.numero if mesa else None,
-            cliente_id=c.cliente_id,
-            estado=c.estado,
-            forma_pago=c.forma_pago,
-            origen=c.origen,
-            subtotal=c.subtotal,
-            impuesto=c.impuesto,
-            total=c.total,
-            observaciones=c.observaciones,
-            created_at=c.created_at,
-            detalles=[ComandaDetalleResponse(plato_id=d.plato_id, plato_nombre=d.plato_nombre, cantidad=d.cantidad, precio_unitario=d.precio_unitario, subtotal=d.subtotal, observaciones=d.observaciones) for d in c.detalles],
-            cliente_nombre=f"{cliente.nombre} {cliente.apellido}" if cliente else None,
-            cliente_cedula=cliente.cedula if cliente else None,
-        ))
-    return result
+            pass
+    consulta = Comanda.find(filtro).sort(-Comanda.created_at)
+    if campos == "resumen":
+        comandas = await consulta.project(ComandaResumen).to_list()
+        await relaciones.cargar(comandas)
+        return respuesta(request, [relaciones.resumen(c) for c in comandas])
+    comandas = await consulta.to_list()
+    await relaciones.cargar(comandas)
+    return respuesta(request, [relaciones.response(c) for c in comandas])
+
+
+@router.get("/comandas/{comanda_id}", response_model=ComandaResponse)
+async def detalle_comanda_mesonera(
+    comanda_id: str,
+    request: Request,
+    user: UsuarioActual = RequireMesoneraOrPOS,
+    relaciones: RelacionesComanda = Depends(RelacionesComanda),
+):
+    comanda = await buscar_comanda(PydanticObjectId(comanda_id)) if PydanticObjectId.is_valid(comanda_id) else None
+    if not comanda:
+        raise HTTPException(404, "Comanda no encontrada")
+    await relaciones.cargar([comanda])
+    return respuesta(request, relaciones.response(comanda))
@@ -1,16 +1,27 @@
 """API Punto de Venta - Comandas."""
-from fastapi import APIRouter, Depends, HTTPException
-from app.schemas.comanda import ComandaCreate, ComandaResponse
+from fastapi import APIRouter, Depends, HTTPException, Request
+from app.schemas.comanda import ComandaCreate, ComandaResponse, ComandaLoteCreate, ComandaLoteResultado
 from app.models.comanda import OrigenComanda
 from app.core.dependencies import RequireMesoneraOrPOS
-from app.models.user import User
+from app.core.cache_tokens import UsuarioActual
+from app.core.respuestas import respuesta
 
 router = APIRouter(prefix="/pos", tags=["Punto de Venta"])
 
 
 @router.post("/comanda", response_model=ComandaResponse)
-async def crear_comanda_pos(data: ComandaCreate, user: User = RequireMesoneraOrPOS):
+async def crear_comanda_pos(data: ComandaCreate, request: Request, user: UsuarioActual = RequireMesoneraOrPOS):
     if data.origen != OrigenComanda.PUNTO_VENTA:
         raise HTTPException(400, "Origen debe ser punto_venta")
     from app.api.cliente_area import _crear_comanda
-    return await _crear_comanda(data, str(user.id))
+    return respuesta(request, await _crear_comanda(data, str(user.id)))
+
+
+@router.post("/comandas/lote", response_model=list[ComandaLoteResultado])
+async def sincronizar_comandas_pos(data: ComandaLoteCreate, user: UsuarioActual = RequireMesoneraOrPOS):
+    """
+    Sincroniza comandas creadas sin conexión. Cada item lleva una `clave` única
+    generada por la tablet; reenviar el lote no duplica comandas (vuelven con duplicada=true).
+    """
+    from app.api.cliente_area import _crear_comandas_lote
+    return await _crear_comandas_lote(data.items, str(user.id))
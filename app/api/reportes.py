@@ -0,0 +1,60 @@
+"""API de Reportes - Ventas pre-agregadas por día y hora."""
+from datetime import date
+from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException, Query
+from app.config import get_settings
+from app.core.dependencies import RequireAdmin, RequireAdminOrPOS
+from app.core.lectura import leer_de
+from app.core import resumenes
+
+router = APIRouter(prefix="/reportes", tags=["Reportes"], dependencies=[Depends(leer_de(get_settings().MONGODB_LECTURA_REPORTES))])
+
+MAX_DIAS = 366
+
+
+def _validar_rango(desde: date, hasta: date):
+    if hasta < desde:
+        raise HTTPException(400, "fecha_hasta debe ser posterior a fecha_desde")
+    if (hasta - desde).days > MAX_DIAS:
+        raise HTTPException(400, f"El rango no puede superar {MAX_DIAS} días")
+
+
+@router.get("/ventas")
+async def reporte_ventas(
+    fecha_desde: date = Query(...),
+    fecha_hasta: date = Query(...),
+    granularidad: Literal["dia", "hora"] = Query("dia"),
+    _=RequireAdminOrPOS,
+):
+    """Ingresos, impuesto, comandas y cancelaciones por período, con totales por forma de pago y origen."""
+    _validar_rango(fecha_desde, fecha_hasta)
+    diarios = await resumenes.resumenes_rango(fecha_desde, fecha_hasta, "dia")
+    periodos = diarios if granularidad == "dia" else await resumenes.resumenes_rango(fecha_desde, fecha_hasta, "hora")
+    totales = resumenes.sumar(diarios)
+    totales.pop("platos", None)
+    return {
+        "fecha_desde": fecha_desde.isoformat(),
+        "fecha_hasta": fecha_hasta.isoformat(),
+        "granularidad": granularidad,
+        "totales": totales,
+        "periodos": [r.model_dump(mode="json", exclude={"id", "revision_id", "periodo", "platos"}) for r in periodos],
+    }
+
+
+@router.get("/platos")
+async def reporte_platos(
+    fecha_desde: date = Query(...),
+    fecha_hasta: date = Query(...),
+    _=RequireAdminOrPOS,
+):
+    """Unidades e ingresos por plato en el rango, de mayor a menor venta."""
+    _validar_rango(fecha_desde, fecha_hasta)
+    totales = resumenes.sumar(await resumenes.resumenes_rango(fecha_desde, fecha_hasta, "dia"))
+    platos = [{"plato_id": plato_id, **valores} for plato_id, valores in totales.get("platos", {}).items()]
+    return sorted(platos, key=lambda p: p.get("unidades", 0), reverse=True)
+
+
+@router.post("/reconstruir")
+async def reconstruir_reportes(_=RequireAdmin):
+    """Recalcula los resúmenes desde el historial de comandas."""
+    return {"ok": True, "resumenes": await resumenes.reconstruir()}
@@ -1,12 +1,26 @@
-"""WebSocket para notificaciones en tiempo real a mesoneras."""
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, Query
-from typing import Set
+"""WebSocket para notificaciones en tiempo real a mesoneras y cocina."""
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, Query, HTTPException
+from beanie.operators import In
 import json
+from app.models.comanda import Comanda, EstadoComanda
+from app.models.user import RolUsuario
+from app.core.broker import broker
+from app.core.catalogo import catalogo
+from app.core.conexiones_ws import CanalWS
+from app.core.dependencies import usuario_desde_token
 
 router = APIRouter(tags=["WebSocket"])
 
+CANAL_MESONERA = "mesonera"
+CANAL_COCINA = "cocina"
+
+# Comandas que la cocina sigue en pantalla
+ESTADOS_COCINA = (EstadoComanda.PENDIENTE, EstadoComanda.EN_PREPARACION, EstadoComanda.LISTA)
+
 # Conexiones activas de mesoneras (reciben notificaciones y vibración)
-mesonera_connections: Set[WebSocket] = set()
+mesonera_connections = CanalWS("mesonera")
+# Pantallas de cocina
+cocina_connections = CanalWS("cocina")
 
 
 @router.websocket("/ws/mesonera")
@@ -18,31 +32,104 @@ async def websocket_mesonera(websocket: WebSocket):
     del navegador (navigator.vibrate) al recibir el mensaje.
     """
     await websocket.accept()
-    mesonera_connections.add(websocket)
+    mesonera_connections.agregar(websocket)
     try:
         while True:
             data = await websocket.receive_text()
             # El cliente puede enviar ping para mantener conexión
             if data == "ping":
-                await websocket.send_text(json.dumps({"type": "pong"}))
+                mesonera_connections.enviar(websocket, json.dumps({"type": "pong"}))
     except WebSocketDisconnect:
-        mesonera_connections.discard(websocket)
+        pass
+    finally:
+        mesonera_connections.quitar(websocket)
 
 
 async def broadcast_notificacion_mesonera(mesa_id: str | None, mensaje: str, notif_id: str):
-    """Enviar notificación a todas las mesoneras conectadas (para vibración)."""
-    msg = json.dumps({
+    """Publicar notificación para las mesoneras de todos los workers (para vibración)."""
+    await broker.publicar(CANAL_MESONERA, {
         "type": "notificacion_cliente",
         "vibrar": True,
         "mesa_id": mesa_id,
         "mensaje": mensaje,
         "id": notif_id,
     })
-    disconnected = set()
-    for ws in mesonera_connections:
-        try:
-            await ws.send_text(msg)
-        except Exception:
-            disconnected.add(ws)
-    for ws in disconnected:
-        mesonera_connections.discard(ws)
+
+
+def _entregar_mesoneras(payload: dict):
+    """Encolar para las mesoneras conectadas a este worker; no espera a ningún socket."""
+    mesonera_connections.difundir(json.dumps(payload))
+
+
+@router.websocket("/ws/cocina")
+async def websocket_cocina(websocket: WebSocket, token: str = Query(...)):
+    """
+    Pantalla de cocina (rol cocinero o admin). Autenticación con ?token=<JWT>.
+    Al conectarse recibe {"type": "snapshot", "comandas": [...]} con las comandas
+    abiertas; después solo deltas:
+    {"type": "creada", "comanda": {...}}, {"type": "creadas", "comandas": [...]},
+    {"type": "estado", "id", "estado"},
+    {"type": "cancelada", "id"}.
+    """
+    try:
+        usuario = await usuario_desde_token(token)
+    except HTTPException:
+        await websocket.close(code=1008)
+        return
+    if usuario.rol not in (RolUsuario.COCINERO, RolUsuario.ADMIN):
+        await websocket.close(code=1008)
+        return
+    await websocket.accept()
+    # Se registra pausada antes de leer el snapshot: los deltas que ocurran
+    # mientras tanto quedan en cola y salen después del snapshot.
+    conexion = cocina_connections.agregar(websocket, pausada=True)
+    try:
+        await catalogo.asegurar()
+        abiertas = await Comanda.find(In(Comanda.estado, list(ESTADOS_COCINA))).sort(Comanda.created_at).to_list()
+        conexion.reanudar(primero=json.dumps({"type": "snapshot", "comandas": [_comanda_cocina(c) for c in abiertas]}))
+        while True:
+            data = await websocket.receive_text()
+            if data == "ping":
+                cocina_connections.enviar(websocket, json.dumps({"type": "pong"}))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        cocina_connections.quitar(websocket)
+
+
+def _comanda_cocina(c: Comanda) -> dict:
+    """Forma compacta de una comanda para la pantalla de cocina."""
+    mesa = catalogo.mesa(c.mesa_id)
+    return {
+        "id": str(c.id),
+        "numero": c.numero,
+        "mesa": mesa.numero if mesa else None,
+        "estado": c.estado.value,
+        "hora": c.created_at.isoformat() if c.created_at else None,
+        "obs": c.observaciones,
+        "items": [[d.plato_nombre, d.cantidad, d.observaciones] for d in c.detalles],
+    }
+
+
+async def emitir_cocina_creada(comanda: Comanda):
+    await broker.publicar(CANAL_COCINA, {"type": "creada", "comanda": _comanda_cocina(comanda)})
+
+
+async def emitir_cocina_creadas(comandas: list[Comanda]):
+    """Varias comandas nuevas en un solo mensaje (sincronización en lote del punto de venta)."""
+    await broker.publicar(CANAL_COCINA, {"type": "creadas", "comandas": [_comanda_cocina(c) for c in comandas]})
+
+
+async def emitir_cocina_estado(comanda: Comanda):
+    if comanda.estado == EstadoComanda.CANCELADA:
+        await broker.publicar(CANAL_COCINA, {"type": "cancelada", "id": str(comanda.id)})
+    else:
+        await broker.publicar(CANAL_COCINA, {"type": "estado", "id": str(comanda.id), "estado": comanda.estado.value})
+
+
+def _entregar_cocina(payload: dict):
+    cocina_connections.difundir(json.dumps(payload, separators=(",", ":")))
+
+
+broker.suscribir(CANAL_MESONERA, _entregar_mesoneras)
+broker.suscribir(CANAL_COCINA, _entregar_cocina)
@@ -1,6 +1,7 @@
 """Configuración de la aplicación."""
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Literal
 
 
 class Settings(BaseSettings):
@@ -9,7 +10,49 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 480  # 8 horas
     MONGODB_URL: str = "mongodb://localhost:27017/casa_fernando"
+    # Pool del driver, por worker: con N workers el servidor ve hasta N * MAX_POOL conexiones
+    MONGODB_MAX_POOL: int = 50
+    MONGODB_MIN_POOL: int = 0  # Conexiones que se mantienen abiertas aunque estén ociosas
+    MONGODB_MAX_IDLE_MS: int = 0  # 0: no se cierran por inactividad
+    MONGODB_ESPERA_POOL_MS: int = 0  # Espera máxima por una conexión libre; 0 sin límite
+    MONGODB_COMPRESORES: str = ""  # "zstd,snappy,zlib": compresión del protocolo, en orden de preferencia
+    MONGODB_SELECCION_TIMEOUT_MS: int = 5000  # Sin servidor disponible en este tiempo, la operación falla
+    MONGODB_CONEXION_TIMEOUT_MS: int = 10000
+    MONGODB_SOCKET_TIMEOUT_MS: int = 0  # 0: sin límite por operación
+    # Lecturas pesadas de facturación y reportes: primary, secondaryPreferred, nearest...
+    MONGODB_LECTURA_REPORTES: str = "primary"
+    MONGODB_LECTURA_MAX_STALENESS_SEGUNDOS: int = -1  # -1 sin límite; si no, mínimo 90
     CORS_ORIGINS: str = "http://localhost:3000,https://casa-fernando-frontend.vercel.app"
+    CATALOGO_TTL_SEGUNDOS: int = 60  # Vigencia del catálogo en memoria (platos, categorías, mesas)
+    OCUPACION_TTL_SEGUNDOS: int = 5  # Cada worker relee el índice de ocupación de mesas tras este tiempo
+    MENU_MAX_AGE_SEGUNDOS: int = 30  # Cache-Control del menú público
+    BCRYPT_ROUNDS: int = 12  # Factor de costo de bcrypt para hashes nuevos
+    BCRYPT_MAX_CONCURRENCIA: int = 2  # Hilos dedicados a hashear/verificar contraseñas
+    AUTH_CACHE_MAX_ENTRADAS: int = 1024  # Tokens verificados en caché por worker
+    AUTH_CACHE_TTL_SEGUNDOS: int = 300  # Máximo que se reutiliza un token verificado sin releer el usuario
+    COMANDA_NUMERO_BLOQUE: int = 20  # Números de comanda que cada worker reserva por viaje a la BD
+    # Pub/sub de notificaciones: "memoria" (un solo proceso) o "mongo" (varios workers/hosts)
+    BROKER_BACKEND: str = "memoria"
+    BROKER_COLECCION: str = "eventos_broker"
+    BROKER_TAMANO_BYTES: int = 16 * 1024 * 1024
+    WS_COLA_MAX: int = 64  # Mensajes pendientes por WebSocket antes de expulsarlo
+    WS_ENVIO_TIMEOUT_SEGUNDOS: float = 5.0
+    COMPRESION_MIN_BYTES: int = 1024  # Respuestas más chicas se envían sin comprimir
+    COMPRESION_NIVEL_GZIP: int = 6
+    NOTIFICACION_TTL_SEGUNDOS: int = 24 * 3600  # Las atendidas se borran solas tras este tiempo
+    ARCHIVO_EDAD_DIAS: int = 1  # Comandas pagadas/canceladas más viejas pasan a comandas_historico
+    ARCHIVO_INTERVALO_SEGUNDOS: int = 3600  # 0 desactiva el archivador en segundo plano
+    # Índices al arrancar: "arranque" (revisar antes de aceptar requests), "segundo_plano"
+    # (arranque rápido, se revisan después) o "manual" (solo scripts/asegurar_indices.py).
+    # Los únicos se crean siempre al arrancar si faltan.
+    INDICES_MODO: Literal["arranque", "segundo_plano", "manual"] = "arranque"
+    PRECALENTAR_CACHES: bool = True  # Cargar catálogo, menú y ocupación antes de la primera request
+    MODO_DESARROLLO: bool = False  # Avisos en el log de consultas excesivas o repetidas (N+1) por request
+    CONSULTAS_PRESUPUESTO: int = 10  # Consultas MongoDB por request antes de avisar
+    CONSULTAS_REPETIDAS_MAX: int = 3  # Mismo find por _id en una request: a partir de aquí se avisa
+    METRICAS_HABILITADAS: bool = False  # GET /metrics (Prometheus)
+    METRICAS_TOKEN: str = ""  # Si no está vacío, /metrics exige Authorization: Bearer <token>
+    BUSQUEDA_MAX_CLIENTES: int = 1000  # Más coincidencias: facturación filtra con $lookup en vez de cliente_id $in
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,84 @@
+"""
+Archivo de comandas cerradas.
+
+Las comandas PAGADA/CANCELADA con más de ARCHIVO_EDAD_DIAS se mueven de
+`comandas` a `comandas_historico`, así las pantallas en vivo solo recorren lo
+reciente. Facturación y reportes leen el histórico cuando lo necesitan.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from pymongo import ReplaceOne
+from app.config import get_settings
+from app.models.comanda import Comanda, ComandaHistorico, EstadoComanda
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+ESTADOS_ARCHIVABLES = [EstadoComanda.PAGADA.value, EstadoComanda.CANCELADA.value]
+
+
+def limite_archivo(ahora: datetime | None = None) -> datetime:
+    """Las comandas cerradas creadas antes de este instante pueden estar en el histórico."""
+    return (ahora or datetime.utcnow()) - timedelta(days=settings.ARCHIVO_EDAD_DIAS)
+
+
+async def archivar(limite: datetime | None = None, lote: int = 500) -> int:
+    """
+    Mueve las comandas cerradas anteriores a `limite` al histórico. Devuelve cuántas.
+    Idempotente: la copia es un upsert por _id, así que reintentar tras un corte no duplica.
+    """
+    filtro = {"estado": {"$in": ESTADOS_ARCHIVABLES}, "created_at": {"$lt": limite or limite_archivo()}}
+    vivas = Comanda.get_motor_collection()
+    historico = ComandaHistorico.get_motor_collection()
+    total = 0
+    while docs := await vivas.find(filtro).limit(lote).to_list(lote):
+        ahora = datetime.utcnow()
+        await historico.bulk_write([ReplaceOne({"_id": d["_id"]}, {**d, "archivada_at": ahora}, upsert=True) for d in docs], ordered=False)
+        ids = [d["_id"] for d in docs]
+        borradas = await vivas.delete_many({"_id": {"$in": ids}, **filtro})
+        if borradas.deleted_count < len(ids):
+            # Alguna cambió de estado entre la copia y el borrado: sigue viva y se descarta su copia.
+            siguen = [d["_id"] async for d in vivas.find({"_id": {"$in": ids}}, {"_id": 1})]
+            await historico.delete_many({"_id": {"$in": siguen}})
+        total += borradas.deleted_count
+    return total
+
+
+async def buscar_comanda(comanda_id) -> Comanda | None:
+    """Comanda viva o, si ya se archivó, su copia en el histórico."""
+    return await Comanda.get(comanda_id) or await ComandaHistorico.get(comanda_id)
+
+
+class Archivador:
+    """Tarea en segundo plano que llama a archivar() cada ARCHIVO_INTERVALO_SEGUNDOS."""
+
+    def __init__(self, intervalo_segundos: int):
+        self.intervalo_segundos = intervalo_segundos
+        self._tarea: asyncio.Task | None = None
+
+    async def iniciar(self):
+        if self.intervalo_segundos > 0:
+            self._tarea = asyncio.create_task(self._ciclo())
+
+    async def detener(self):
+        if self._tarea:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+            self._tarea = None
+
+    async def _ciclo(self):
+        while True:
+            try:
+                movidas = await archivar()
+                if movidas:
+                    logger.info("Comandas archivadas: %s", movidas)
+            except Exception:
+                logger.exception("Error archivando comandas; se reintenta en el próximo ciclo")
+            await asyncio.sleep(self.intervalo_segundos)
+
+
+archivador = Archivador(settings.ARCHIVO_INTERVALO_SEGUNDOS)
@@ -0,0 +1,78 @@
+"""
+Arranque de la API: fases cronometradas, índices diferidos y precalentado.
+
+app.main importa este módulo antes que el resto de la app, así la primera fase
+("importar") mide la carga de todos los módulos, routers incluidos. El perfil
+queda en el log y en /metrics (app_startup_phase_seconds).
+"""
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class PerfilArranque:
+    """Duración de cada fase del arranque, en el orden en que ocurren."""
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self._anterior = self.inicio
+        self.fases: dict[str, float] = {}
+
+    def marcar(self, fase: str):
+        """Cierra `fase`: el tiempo desde la marca anterior."""
+        ahora = time.perf_counter()
+        self.fases[fase] = ahora - self._anterior
+        self._anterior = ahora
+
+    def total(self) -> float:
+        return self._anterior - self.inicio
+
+    def resumen(self) -> str:
+        fases = ", ".join(f"{fase} {segundos:.3f}s" for fase, segundos in self.fases.items())
+        return f"{self.total():.3f}s ({fases})"
+
+
+perfil = PerfilArranque()
+
+
+async def precalentar():
+    """Carga lo que necesitan las primeras requests: catálogo, menú codificado y ocupación de mesas."""
+    from app.api.cliente_area import precalentar_menu
+    from app.core.catalogo import catalogo
+    from app.core.ocupacion import ocupacion
+    await asyncio.gather(catalogo.asegurar(), ocupacion.asegurar())
+    precalentar_menu()
+
+
+class IndicesDiferidos:
+    """Revisa los índices en segundo plano cuando el arranque se los salteó."""
+
+    def __init__(self):
+        self._tarea: asyncio.Task | None = None
+
+    def iniciar(self):
+        self._tarea = asyncio.create_task(self._asegurar())
+
+    async def detener(self):
+        if self._tarea and not self._tarea.done():
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+        self._tarea = None
+
+    async def _asegurar(self):
+        from app.database import asegurar_indices
+        inicio = time.perf_counter()
+        try:
+            await asegurar_indices()
+        except Exception:
+            logger.exception("No se pudieron asegurar los índices; correr python scripts/asegurar_indices.py")
+            return
+        logger.info("Índices asegurados en segundo plano en %.2fs", time.perf_counter() - inicio)
+
+
+indices_diferidos = IndicesDiferidos()
@@ -0,0 +1,129 @@
+"""Broker pub/sub para repartir eventos entre workers."""
+import asyncio
+from abc import ABC, abstractmethod
+import inspect
+import logging
+import uuid
+from collections import defaultdict
+from typing import Awaitable, Callable
+from bson import Timestamp
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+Manejador = Callable[[dict], Awaitable[None] | None]
+
+
+class Broker(ABC):
+    """
+    Publica mensajes por canal. Cada worker se suscribe a los canales que le
+    interesan y entrega a sus propias conexiones.
+    """
+
+    def __init__(self):
+        self._suscriptores: dict[str, list[Manejador]] = defaultdict(list)
+
+    def suscribir(self, canal: str, manejador: Manejador):
+        self._suscriptores[canal].append(manejador)
+
+    @abstractmethod
+    async def publicar(self, canal: str, mensaje: dict):
+        ...
+
+    async def iniciar(self):
+        pass
+
+    async def detener(self):
+        pass
+
+    async def _entregar(self, canal: str, mensaje: dict):
+        for manejador in self._suscriptores.get(canal, ()):
+            try:
+                resultado = manejador(mensaje)
+                if inspect.isawaitable(resultado):
+                    await resultado
+            except Exception:
+                logger.exception("Error entregando mensaje del canal %s", canal)
+
+
+class BrokerMemoria(Broker):
+    """Un solo proceso: publicar es entregar directamente a los suscriptores locales."""
+
+    async def publicar(self, canal: str, mensaje: dict):
+        await self._entregar(canal, mensaje)
+
+
+class BrokerMongo(Broker):
+    """
+    Varios workers/hosts: los mensajes se insertan en una colección capped y
+    cada worker la sigue con un cursor tailable. El worker que publica entrega
+    a sus sockets de inmediato y descarta su propio eco al leer la colección.
+    """
+
+    def __init__(self, coleccion: str, tamano_bytes: int):
+        super().__init__()
+        self.nombre_coleccion = coleccion
+        self.tamano_bytes = tamano_bytes
+        self.origen = uuid.uuid4().hex
+        self._tarea: asyncio.Task | None = None
+
+    def _coleccion(self):
+        from app import database
+        return database.client.get_default_database()[self.nombre_coleccion]
+
+    async def iniciar(self):
+        db = self._coleccion().database
+        try:
+            await db.create_collection(self.nombre_coleccion, capped=True, size=self.tamano_bytes)
+        except CollectionInvalid:
+            pass  # ya existe
+        coleccion = self._coleccion()
+        ultimo = await coleccion.find_one(sort=[("$natural", -1)])
+        if ultimo is None:
+            # Un cursor tailable sobre una colección vacía muere al instante.
+            await coleccion.insert_one({"ts": Timestamp(0, 0), "canal": None})
+            ultimo = await coleccion.find_one(sort=[("$natural", -1)])
+        self._tarea = asyncio.create_task(self._escuchar(ultimo["ts"]))
+
+    async def detener(self):
+        if self._tarea:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+            self._tarea = None
+
+    async def publicar(self, canal: str, mensaje: dict):
+        # Timestamp(0, 0) en un campo de primer nivel lo reemplaza el servidor por uno monótono.
+        await self._coleccion().insert_one({"ts": Timestamp(0, 0), "canal": canal, "mensaje": mensaje, "origen": self.origen})
+        await self._entregar(canal, mensaje)
+
+    async def _escuchar(self, desde: Timestamp):
+        ultimo = desde
+        while True:
+            try:
+                cursor = self._coleccion().find({"ts": {"$gt": ultimo}}, cursor_type=CursorType.TAILABLE_AWAIT)
+                async for doc in cursor:
+                    ultimo = doc["ts"]
+                    if doc.get("origen") != self.origen and doc.get("canal"):
+                        await self._entregar(doc["canal"], doc["mensaje"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Error siguiendo la colección %s; reintentando", self.nombre_coleccion)
+            await asyncio.sleep(0.5)
+
+
+def crear_broker() -> Broker:
+    if settings.BROKER_BACKEND == "mongo":
+        return BrokerMongo(settings.BROKER_COLECCION, settings.BROKER_TAMANO_BYTES)
+    if settings.BROKER_BACKEND != "memoria":
+        raise ValueError(f"BROKER_BACKEND desconocido: {settings.BROKER_BACKEND}")
+    return BrokerMemoria()
+
+
+broker = crear_broker()
@@ -0,0 +1,102 @@
+"""
+Búsqueda de clientes por prefijo: nombre, apellido y cédula.
+
+Cada cliente guarda en `busqueda` sus palabras normalizadas (minúsculas, sin
+acentos) y los dígitos de la cédula. Un prefijo se resuelve con una regex
+anclada (^...) sobre ese array, que MongoDB recorre como un rango del índice
+multikey en vez de revisar todos los clientes.
+"""
+import re
+import unicodedata
+from app.core.lectura import coleccion
+from app.models.cliente import Cliente
+
+_PALABRA = re.compile(r"[a-z0-9]+")
+_CEDULA = re.compile(r"^[vejgp]?[\s.-]*\d[\d.\s-]*$", re.IGNORECASE)
+MAX_TOKENS_CONSULTA = 5
+# Una búsqueda sin nada buscable ("!!", "V-"): resuelta por el índice de _id sin leer documentos.
+SIN_COINCIDENCIAS = {"_id": {"$exists": False}}
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas y sin diacríticos: 'Peña Ávila' -> 'pena avila'."""
+    descompuesto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in descompuesto if not unicodedata.combining(c)).lower()
+
+
+def digitos_cedula(cedula: str) -> str:
+    return "".join(c for c in cedula if c.isdigit())
+
+
+def tokens_cliente(nombre: str, apellido: str, cedula: str) -> list[str]:
+    tokens = dict.fromkeys(_PALABRA.findall(normalizar(f"{nombre} {apellido}")))
+    digitos = digitos_cedula(cedula)
+    if digitos:
+        tokens[digitos] = None
+    return list(tokens)
+
+
+def _prefijo(campo: str, token: str) -> dict:
+    return {campo: {"$regex": f"^{re.escape(token)}"}}
+
+
+def _filtro_sin_indexar(q: str | None, cedula: str | None, prefijo: str) -> dict:
+    """
+    Clientes guardados antes del campo `busqueda` (hasta correr scripts/indexar_clientes.py):
+    el filtro anterior por regex. `busqueda` nulo o vacío se resuelve por el mismo índice.
+    """
+    condiciones: list[dict] = [{f"{prefijo}busqueda": {"$in": [None, []]}}]
+    if q:
+        patron = {"$regex": re.escape(q.strip()), "$options": "i"}
+        condiciones.append({"$or": [{f"{prefijo}nombre": patron}, {f"{prefijo}apellido": patron}]})
+    if cedula:
+        condiciones.append({f"{prefijo}cedula": {"$regex": re.escape(cedula.strip())}})
+    return {"$and": condiciones}
+
+
+def filtro_busqueda(q: str | None = None, cedula: str | None = None, campo: str = "busqueda") -> dict | None:
+    """
+    Filtro sobre `campo` para un texto libre `q` y/o un prefijo de cédula.
+    Todas las palabras deben coincidir (por prefijo) con alguna del cliente.
+    Un `q` con forma de cédula (V-1234, 12.345) se trata como cédula, salvo que
+    ya venga una `cedula` explícita. None si no se pidió buscar nada;
+    SIN_COINCIDENCIAS si lo pedido no tiene palabras ni dígitos.
+    """
+    q, cedula = (q or "").strip() or None, (cedula or "").strip() or None
+    if not q and not cedula:
+        return None
+    condiciones = []
+    if q and not cedula and _CEDULA.match(q):
+        cedula, q = q, None
+    if q:
+        condiciones += [_prefijo(campo, t) for t in _PALABRA.findall(normalizar(q))[:MAX_TOKENS_CONSULTA]]
+    if cedula and digitos_cedula(cedula):
+        condiciones.append(_prefijo(campo, digitos_cedula(cedula)))
+    if not condiciones:
+        return SIN_COINCIDENCIAS
+    por_tokens = condiciones[0] if len(condiciones) == 1 else {"$and": condiciones}
+    return {"$or": [por_tokens, _filtro_sin_indexar(q, cedula, campo.removesuffix("busqueda"))]}
+
+
+async def buscar_clientes(q: str, limite: int = 10) -> list[dict]:
+    """
+    Primeras coincidencias para el typeahead en orden alfabético, solo con los
+    campos que muestra. El orden se resuelve en memoria como top-`limite` sobre
+    las coincidencias del índice (no hay índice por nombre que combine con `busqueda`).
+    """
+    filtro = filtro_busqueda(q)
+    if filtro is None or filtro is SIN_COINCIDENCIAS:
+        return []
+    proyeccion = {"cedula": 1, "nombre": 1, "apellido": 1, "telefono": 1}
+    cursor = coleccion(Cliente).find(filtro, proyeccion).sort([("nombre", 1), ("apellido", 1), ("_id", 1)]).limit(limite)
+    return [{"id": str(doc.pop("_id")), **doc} async for doc in cursor]
+
+
+async def ids_clientes(filtro: dict, limite: int) -> list[str] | None:
+    """
+    Ids (como se guardan en Comanda.cliente_id) de los clientes que cumplen `filtro`.
+    None si hay más de `limite`: al llamador le conviene filtrar con $lookup.
+    """
+    cursor = coleccion(Cliente).find(filtro, {"_id": 1}).limit(limite + 1)
+    ids = [str(doc["_id"]) async for doc in cursor]
+    return None if len(ids) > limite else ids
@@ -0,0 +1,55 @@
+"""Caché de tokens verificados para get_current_user."""
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+from beanie import PydanticObjectId
+from app.config import get_settings
+from app.models.user import RolUsuario
+
+settings = get_settings()
+
+
+class UsuarioActual(NamedTuple):
+    """Vista mínima del usuario autenticado: lo que necesitan los chequeos de rol."""
+    id: PydanticObjectId
+    rol: RolUsuario
+    activo: int
+
+
+class _Entrada(NamedTuple):
+    usuario: UsuarioActual
+    expira: float  # epoch
+
+
+class CacheTokens:
+    """
+    LRU acotada: token -> UsuarioActual.
+    Cada entrada vence en el `exp` del token o al cumplir el TTL (lo que ocurra
+    antes). La API no modifica usuarios: el TTL acota cuánto tarda en verse un
+    cambio hecho por fuera (seed, edición directa en la BD).
+    """
+
+    def __init__(self, max_entradas: int, ttl_segundos: float):
+        self.max_entradas = max_entradas
+        self.ttl_segundos = ttl_segundos
+        self._entradas: OrderedDict[str, _Entrada] = OrderedDict()
+
+    def obtener(self, token: str) -> UsuarioActual | None:
+        entrada = self._entradas.get(token)
+        if entrada is None:
+            return None
+        if entrada.expira <= time.time():
+            del self._entradas[token]
+            return None
+        self._entradas.move_to_end(token)
+        return entrada.usuario
+
+    def guardar(self, token: str, exp: float, usuario: UsuarioActual):
+        expira = min(exp, time.time() + self.ttl_segundos)
+        self._entradas[token] = _Entrada(usuario, expira)
+        self._entradas.move_to_end(token)
+        while len(self._entradas) > self.max_entradas:
+            self._entradas.popitem(last=False)
+
+
+cache_tokens = CacheTokens(max_entradas=settings.AUTH_CACHE_MAX_ENTRADAS, ttl_segundos=settings.AUTH_CACHE_TTL_SEGUNDOS)
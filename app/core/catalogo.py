@@ -0,0 +1,108 @@
+"""Catálogo en memoria de platos, categorías y mesas."""
+import asyncio
+import time
+from app.config import get_settings
+from app.models.plato import Plato, CategoriaPlato
+from app.models.mesa import Mesa
+
+settings = get_settings()
+
+
+class CatalogoMenu:
+    """
+    Copia en memoria de las tablas de referencia (pocas decenas de documentos).
+    Se carga completa en una sola pasada y responde búsquedas por id en O(1).
+    Los endpoints de administración la actualizan al escribir (write-through);
+    el TTL cubre los cambios hechos por otros workers.
+    """
+
+    def __init__(self, ttl_segundos: float):
+        self.ttl_segundos = ttl_segundos
+        self.categorias: dict[str, CategoriaPlato] = {}
+        self.platos: dict[str, Plato] = {}
+        self.mesas: dict[str, Mesa] = {}
+        self.version = 0
+        self._cargado_en: float | None = None
+        self._lock = asyncio.Lock()
+
+    def _vigente(self) -> bool:
+        return self._cargado_en is not None and time.monotonic() - self._cargado_en < self.ttl_segundos
+
+    def _cambio(self):
+        self.version += 1
+
+    async def cargar(self):
+        categorias, platos, mesas = await asyncio.gather(
+            CategoriaPlato.find().sort(CategoriaPlato.orden).to_list(),
+            Plato.find().sort(Plato.nombre).to_list(),
+            Mesa.find().sort(Mesa.numero).to_list(),
+        )
+        self.categorias = {str(c.id): c for c in categorias}
+        self.platos = {str(p.id): p for p in platos}
+        self.mesas = {str(m.id): m for m in mesas}
+        self._cargado_en = time.monotonic()
+        self._cambio()
+
+    async def asegurar(self):
+        """Carga el catálogo si nunca se cargó o si venció el TTL."""
+        if self._vigente():
+            return
+        async with self._lock:
+            if not self._vigente():
+                await self.cargar()
+
+    async def recargar(self, min_segundos: float = 1.0):
+        """
+        Recarga ante una referencia desconocida (p. ej. un plato recién creado en
+        otro worker). A lo sumo una vez por `min_segundos`: ids inválidos repetidos
+        no fuerzan una carga completa en cada request.
+        """
+        async with self._lock:
+            if self._cargado_en is None or time.monotonic() - self._cargado_en >= min_segundos:
+                await self.cargar()
+
+    def invalidar(self):
+        self._cargado_en = None
+
+    # Búsquedas por id
+    def plato(self, plato_id: str | None) -> Plato | None:
+        return self.platos.get(plato_id) if plato_id else None
+
+    def categoria(self, categoria_id: str | None) -> CategoriaPlato | None:
+        return self.categorias.get(categoria_id) if categoria_id else None
+
+    def mesa(self, mesa_id: str | None) -> Mesa | None:
+        return self.mesas.get(mesa_id) if mesa_id else None
+
+    # Vistas ordenadas (los dicts conservan el orden de carga)
+    def categorias_activas(self) -> list[CategoriaPlato]:
+        return [c for c in self.categorias.values() if c.activo == 1]
+
+    def platos_disponibles(self) -> list[Plato]:
+        return [p for p in self.platos.values() if p.disponible == 1]
+
+    def mesas_activas(self) -> list[Mesa]:
+        return [m for m in self.mesas.values() if m.activa == 1]
+
+    # Write-through desde administración
+    def guardar_categoria(self, categoria: CategoriaPlato):
+        self.categorias[str(categoria.id)] = categoria
+        self.categorias = dict(sorted(self.categorias.items(), key=lambda kv: kv[1].orden))
+        self._cambio()
+
+    def guardar_plato(self, plato: Plato):
+        self.platos[str(plato.id)] = plato
+        self.platos = dict(sorted(self.platos.items(), key=lambda kv: kv[1].nombre))
+        self._cambio()
+
+    def quitar_plato(self, plato_id: str):
+        self.platos.pop(plato_id, None)
+        self._cambio()
+
+    def guardar_mesa(self, mesa: Mesa):
+        self.mesas[str(mesa.id)] = mesa
+        self.mesas = dict(sorted(self.mesas.items(), key=lambda kv: kv[1].numero))
+        self._cambio()
+
+
+catalogo = CatalogoMenu(ttl_segundos=settings.CATALOGO_TTL_SEGUNDOS)
@@ -0,0 +1,105 @@
+"""Conexiones WebSocket con cola de salida propia y expulsión de consumidores lentos."""
+import asyncio
+import logging
+from fastapi import WebSocket
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class ConexionWS:
+    """
+    Un WebSocket con su cola acotada y una tarea que la vacía.
+    Difundir solo encola; si la cola se llena o un envío excede el timeout,
+    la conexión se expulsa del canal y se cierra.
+    Una conexión pausada acumula mensajes sin enviarlos hasta reanudar(), lo que
+    permite mandar primero un snapshot sin perder los eventos ocurridos mientras se armaba.
+    """
+
+    def __init__(self, websocket: WebSocket, canal: "CanalWS", pausada: bool = False):
+        self.websocket = websocket
+        self.canal = canal
+        self.cola: asyncio.Queue[str] = asyncio.Queue(maxsize=settings.WS_COLA_MAX)
+        self._tarea: asyncio.Task | None = None
+        if not pausada:
+            self.reanudar()
+
+    def reanudar(self, primero: str | None = None):
+        """Arranca el envío; `primero` sale antes que lo ya encolado."""
+        if self._tarea is None:
+            self._tarea = asyncio.create_task(self._enviar(primero))
+
+    def _cancelar(self):
+        if self._tarea is not None and self._tarea is not asyncio.current_task():
+            self._tarea.cancel()
+
+    def encolar(self, texto: str) -> bool:
+        try:
+            self.cola.put_nowait(texto)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def _enviar(self, primero: str | None = None):
+        try:
+            if primero is not None:
+                await asyncio.wait_for(self.websocket.send_text(primero), settings.WS_ENVIO_TIMEOUT_SEGUNDOS)
+            while True:
+                texto = await self.cola.get()
+                await asyncio.wait_for(self.websocket.send_text(texto), settings.WS_ENVIO_TIMEOUT_SEGUNDOS)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info("Conexión %s expulsada: %r", self.canal.nombre, e)
+            self.canal.expulsar(self.websocket)
+
+    async def _cerrar(self):
+        try:
+            await asyncio.wait_for(self.websocket.close(code=1013), settings.WS_ENVIO_TIMEOUT_SEGUNDOS)
+        except Exception:
+            pass
+
+
+class CanalWS:
+    """Grupo de conexiones que reciben los mismos mensajes."""
+
+    def __init__(self, nombre: str):
+        self.nombre = nombre
+        self.conexiones: dict[WebSocket, ConexionWS] = {}
+        self._cierres: set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self.conexiones)
+
+    def agregar(self, websocket: WebSocket, pausada: bool = False) -> ConexionWS:
+        conexion = ConexionWS(websocket, self, pausada=pausada)
+        self.conexiones[websocket] = conexion
+        return conexion
+
+    def quitar(self, websocket: WebSocket):
+        conexion = self.conexiones.pop(websocket, None)
+        if conexion:
+            conexion._cancelar()
+
+    def expulsar(self, websocket: WebSocket):
+        """Quita la conexión y la cierra en segundo plano (1013: reintentar más tarde)."""
+        conexion = self.conexiones.pop(websocket, None)
+        if conexion is None:
+            return
+        conexion._cancelar()
+        cierre = asyncio.create_task(conexion._cerrar())
+        self._cierres.add(cierre)
+        cierre.add_done_callback(self._cierres.discard)
+
+    def enviar(self, websocket: WebSocket, texto: str):
+        """Encola un mensaje para una sola conexión del canal."""
+        conexion = self.conexiones.get(websocket)
+        if conexion and not conexion.encolar(texto):
+            self.expulsar(websocket)
+
+    def difundir(self, texto: str):
+        """Encola el mensaje en todas las conexiones sin esperar a ninguna."""
+        for websocket, conexion in list(self.conexiones.items()):
+            if not conexion.encolar(texto):
+                self.expulsar(websocket)
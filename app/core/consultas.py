@@ -0,0 +1,188 @@
+"""
+Conteo de consultas a MongoDB por request (presupuesto y detector de N+1).
+
+Un CommandListener anota cada comando en el ContadorConsultas activo: el de la
+request (contextvar, lo fija el middleware PresupuestoConsultas en modo
+desarrollo) y los abiertos con max_consultas()/contar_consultas() en tests.
+Motor ejecuta en un pool de hilos copiando el contexto, así que la contextvar
+llega al listener.
+"""
+import functools
+import inspect
+import json
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pymongo import monitoring
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# Comandos del driver que no son consultas de la aplicación.
+IGNORADOS = {"hello", "isMaster", "ismaster", "ping", "endSessions", "saslStart", "saslContinue", "buildInfo", "killCursors"}
+
+_contador: ContextVar["ContadorConsultas | None"] = ContextVar("contador_consultas", default=None)
+_globales: list["ContadorConsultas"] = []
+_candado = threading.Lock()
+
+
+def _forma(valor):
+    """Estructura de un filtro sin sus valores: {'_id': '?'}."""
+    if isinstance(valor, dict):
+        return {k: _forma(v) for k, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_forma(valor[0]), "..."] if valor else []
+    return "?"
+
+
+def forma_comando(nombre: str, comando: dict) -> str:
+    """Comando, colección y forma del filtro, p. ej. `find comandas {"_id": "?"}`."""
+    coleccion = comando.get("collection") if nombre == "getMore" else comando.get(nombre)
+    if nombre == "find":
+        filtro = comando.get("filter", {})
+    elif nombre == "aggregate":
+        filtro = next((etapa["$match"] for etapa in comando.get("pipeline", []) if "$match" in etapa), {})
+    elif nombre in ("update", "delete"):
+        sentencias = comando.get("updates") or comando.get("deletes") or [{}]
+        filtro = sentencias[0].get("q", {})
+    elif nombre == "findAndModify":
+        filtro = comando.get("query", {})
+    else:
+        filtro = None
+    forma = json.dumps(_forma(filtro), sort_keys=True, default=str) if filtro is not None else ""
+    return f"{nombre} {coleccion if isinstance(coleccion, str) else '-'} {forma}".strip()
+
+
+def _es_find_por_id(nombre: str, comando: dict) -> bool:
+    filtro = comando.get("filter", {}) if nombre == "find" else None
+    return isinstance(filtro, dict) and list(filtro) == ["_id"] and not isinstance(filtro["_id"], dict)
+
+
+class ContadorConsultas:
+    def __init__(self):
+        self.total = 0
+        self.formas: Counter[str] = Counter()
+        self.por_id: Counter[str] = Counter()  # find {_id: x} por colección
+
+    def registrar(self, nombre: str, comando: dict):
+        forma = forma_comando(nombre, comando)
+        with _candado:
+            self.total += 1
+            self.formas[forma] += 1
+            if _es_find_por_id(nombre, comando):
+                self.por_id[forma] += 1
+
+    def repetidas_por_id(self, minimo: int) -> list[tuple[str, int]]:
+        return [(forma, n) for forma, n in self.por_id.most_common() if n >= minimo]
+
+    def resumen(self, n: int = 5) -> str:
+        return "; ".join(f"{veces}x {forma}" for forma, veces in self.formas.most_common(n))
+
+
+class ContadorComandos(monitoring.CommandListener):
+    def started(self, event: monitoring.CommandStartedEvent):
+        if event.command_name in IGNORADOS:
+            return
+        contador = _contador.get()
+        if contador is not None:
+            contador.registrar(event.command_name, event.command)
+        for global_ in _globales:
+            global_.registrar(event.command_name, event.command)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+class PresupuestoExcedido(AssertionError):
+    pass
+
+
+@contextmanager
+def contar_consultas():
+    """
+    Cuenta todas las consultas del proceso mientras está abierto (no solo las del
+    contexto actual): así funciona con TestClient, que corre la app en otro hilo.
+    """
+    contador = ContadorConsultas()
+    _globales.append(contador)
+    try:
+        yield contador
+    finally:
+        _globales.remove(contador)
+
+
+class max_consultas:
+    """
+    Falla si el bloque o la función decorada hace más de `limite` consultas.
+
+        with max_consultas(3):
+            client.get("/api/mesonera/comandas")
+
+        @max_consultas(3)
+        def test_listar(client): ...
+    """
+
+    def __init__(self, limite: int):
+        self.limite = limite
+        self._contexto = None
+
+    def __enter__(self) -> ContadorConsultas:
+        self._contexto = contar_consultas()
+        self.contador = self._contexto.__enter__()
+        return self.contador
+
+    def __exit__(self, tipo, valor, traza):
+        self._contexto.__exit__(tipo, valor, traza)
+        if tipo is None and self.contador.total > self.limite:
+            raise PresupuestoExcedido(f"{self.contador.total} consultas (máximo {self.limite}): {self.contador.resumen()}")
+
+    def __call__(self, funcion):
+        if inspect.iscoroutinefunction(funcion):
+            @functools.wraps(funcion)
+            async def envoltura_async(*args, **kwargs):
+                with max_consultas(self.limite):
+                    return await funcion(*args, **kwargs)
+            return envoltura_async
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with max_consultas(self.limite):
+                return funcion(*args, **kwargs)
+        return envoltura
+
+
+class PresupuestoConsultas:
+    """
+    Middleware de desarrollo: cuenta las consultas de cada request y avisa en el
+    log si pasa del presupuesto o si repite el mismo find por _id (N+1).
+    """
+
+    def __init__(self, app: ASGIApp, presupuesto: int, repeticiones_max: int):
+        self.app = app
+        self.presupuesto = presupuesto
+        self.repeticiones_max = repeticiones_max
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        contador = ContadorConsultas()
+        token = _contador.set(contador)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _contador.reset(token)
+            self._revisar(scope, contador)
+
+    def _revisar(self, scope: Scope, contador: ContadorConsultas):
+        ruta = getattr(scope.get("route"), "path", scope.get("path"))
+        peticion = f"{scope['method']} {ruta}"
+        if contador.total > self.presupuesto:
+            logger.warning("%s hizo %d consultas (presupuesto %d): %s", peticion, contador.total, self.presupuesto, contador.resumen())
+        for forma, veces in contador.repetidas_por_id(self.repeticiones_max):
+            logger.warning("%s repitió %d veces %s: posible N+1, usar una consulta $in", peticion, veces, forma)
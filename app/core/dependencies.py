@@ -4,14 +4,17 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from beanie import PydanticObjectId
 from app.models.user import User, RolUsuario
 from app.core.security import decode_token
+from app.core.cache_tokens import cache_tokens, UsuarioActual
 
 security = HTTPBearer(auto_error=False)
 
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials | None = Depends(security)) -> User:
-    if not credentials:
-        raise HTTPException(status_code=401, detail="No se proporcionó token de autenticación")
-    payload = decode_token(credentials.credentials)
+async def usuario_desde_token(token: str) -> UsuarioActual:
+    """Resuelve el token con la caché; solo decodifica y consulta la BD en un fallo de caché."""
+    usuario = cache_tokens.obtener(token)
+    if usuario is not None:
+        return usuario
+    payload = decode_token(token)
     if not payload:
         raise HTTPException(status_code=401, detail="Token inválido o expirado")
     user_id = payload.get("sub")
@@ -23,11 +26,19 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials | None = De
         user = None
     if not user or user.activo != 1:
         raise HTTPException(status_code=401, detail="Usuario no encontrado")
-    return user
+    usuario = UsuarioActual(id=user.id, rol=user.rol, activo=user.activo)
+    cache_tokens.guardar(token, float(payload.get("exp", 0)), usuario)
+    return usuario
+
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials | None = Depends(security)) -> UsuarioActual:
+    if not credentials:
+        raise HTTPException(status_code=401, detail="No se proporcionó token de autenticación")
+    return await usuario_desde_token(credentials.credentials)
 
 
 def require_roles(*roles: RolUsuario):
-    async def role_checker(user: User = Depends(get_current_user)) -> User:
+    async def role_checker(user: UsuarioActual = Depends(get_current_user)) -> UsuarioActual:
         if user.rol not in roles:
             raise HTTPException(status_code=403, detail="No tiene permisos para acceder a este recurso")
         return user
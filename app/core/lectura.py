@@ -0,0 +1,55 @@
+"""
+Preferencia de lectura por router.
+
+Los routers de reportes declaran `dependencies=[Depends(leer_de(modo))]`; mientras
+dura la request, las consultas que piden su colección con coleccion(Modelo) leen
+con esa preferencia (p. ej. secundarios). Lo demás sigue yendo al primario, y
+las escrituras siempre van al primario.
+"""
+from contextvars import ContextVar
+from beanie import Document
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo.read_preferences import make_read_preference, read_pref_mode_from_name
+from app.config import get_settings
+
+MODOS = ("primary", "primaryPreferred", "secondary", "secondaryPreferred", "nearest")
+
+_modo: ContextVar[str | None] = ContextVar("modo_lectura", default=None)
+# (colección base, modo) -> colección con with_options; se rehace si init_db cambia la base.
+_colecciones: dict[tuple[str, str], tuple[AsyncIOMotorCollection, AsyncIOMotorCollection]] = {}
+
+
+def preferencia(modo: str):
+    """ReadPreference de pymongo para `modo`, con el máximo de desfase configurado."""
+    if modo not in MODOS:
+        raise ValueError(f"Preferencia de lectura desconocida: {modo!r} (usar {', '.join(MODOS)})")
+    if modo == "primary":
+        return make_read_preference(0, None)
+    return make_read_preference(read_pref_mode_from_name(modo), None, get_settings().MONGODB_LECTURA_MAX_STALENESS_SEGUNDOS)
+
+
+def leer_de(modo: str):
+    """Dependencia de router: las lecturas con coleccion() de la request usan `modo`."""
+    preferencia(modo)  # valida al importar el router, no en la primera request
+
+    async def dependencia():
+        token = _modo.set(modo)
+        try:
+            yield
+        finally:
+            _modo.reset(token)
+
+    return dependencia
+
+
+def coleccion(modelo: type[Document]) -> AsyncIOMotorCollection:
+    """Colección Motor del modelo con la preferencia de lectura de la request actual."""
+    base = modelo.get_motor_collection()
+    modo = _modo.get()
+    if modo is None:
+        return base
+    clave = (base.full_name, modo)
+    guardada = _colecciones.get(clave)
+    if guardada is None or guardada[0] is not base:
+        guardada = _colecciones[clave] = (base, base.with_options(read_preference=preferencia(modo)))
+    return guardada[1]
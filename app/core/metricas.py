@@ -0,0 +1,129 @@
+"""
+Métricas Prometheus: latencia HTTP por ruta, comandos MongoDB y pool de conexiones.
+
+Cada worker expone las suyas en /metrics; Prometheus las agrega por instancia.
+Las etiquetas usan la plantilla de la ruta (/api/comandas/{comanda_id}), no la
+URL, para que la cardinalidad no crezca con los ids.
+"""
+import time
+from prometheus_client import Counter, Gauge, Histogram
+from pymongo import monitoring
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+BUCKETS_HTTP = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_MONGO = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+http_duracion = Histogram(
+    "http_request_duration_seconds", "Duración de las peticiones HTTP",
+    ["metodo", "ruta", "estado"], buckets=BUCKETS_HTTP,
+)
+mongo_duracion = Histogram(
+    "mongodb_command_duration_seconds", "Duración de los comandos MongoDB",
+    ["comando", "coleccion"], buckets=BUCKETS_MONGO,
+)
+mongo_fallos = Counter("mongodb_command_failures_total", "Comandos MongoDB fallidos", ["comando", "coleccion"])
+pool_abiertas = Gauge("mongodb_pool_connections", "Conexiones abiertas en el pool", ["servidor"])
+pool_en_uso = Gauge("mongodb_pool_connections_in_use", "Conexiones del pool prestadas a una operación", ["servidor"])
+arranque_fases = Gauge("app_startup_phase_seconds", "Duración de cada fase del arranque del worker", ["fase"])
+websockets_activos = Gauge("websocket_connections", "WebSockets conectados a este worker", ["canal"])
+
+SIN_RUTA = "sin_ruta"
+
+# getMore y killCursors llevan la colección en otro campo que el nombre del comando.
+_CAMPO_COLECCION = {"getMore": "collection", "killCursors": "killCursors"}
+
+
+def coleccion_de(nombre_comando: str, comando: dict) -> str:
+    valor = comando.get(_CAMPO_COLECCION.get(nombre_comando, nombre_comando))
+    return valor if isinstance(valor, str) else "-"
+
+
+class MetricasHTTP:
+    """Middleware ASGI: observa cada petición HTTP al terminar la respuesta."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        inicio = time.perf_counter()
+        estado = 500
+
+        async def send_estado(message: Message):
+            nonlocal estado
+            if message["type"] == "http.response.start":
+                estado = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_estado)
+        finally:
+            # FastAPI deja la ruta resuelta en el scope; sin ella (404) se agrupa todo junto.
+            ruta = getattr(scope.get("route"), "path", SIN_RUTA)
+            http_duracion.labels(scope["method"], ruta, str(estado)).observe(time.perf_counter() - inicio)
+
+
+class MetricasComandos(monitoring.CommandListener):
+    """Cuenta y cronometra cada comando enviado a MongoDB, por colección."""
+
+    def __init__(self):
+        self._colecciones: dict[tuple[int, object], str] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        self._colecciones[(event.request_id, event.connection_id)] = coleccion_de(event.command_name, event.command)
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        coleccion = self._colecciones.pop((event.request_id, event.connection_id), "-")
+        mongo_duracion.labels(event.command_name, coleccion).observe(event.duration_micros / 1e6)
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        coleccion = self._colecciones.pop((event.request_id, event.connection_id), "-")
+        mongo_duracion.labels(event.command_name, coleccion).observe(event.duration_micros / 1e6)
+        mongo_fallos.labels(event.command_name, coleccion).inc()
+
+
+class MetricasPool(monitoring.ConnectionPoolListener):
+    """Conexiones abiertas y prestadas por servidor."""
+
+    def _servidor(self, event) -> str:
+        host, puerto = event.address
+        return f"{host}:{puerto}"
+
+    def connection_created(self, event):
+        pool_abiertas.labels(self._servidor(event)).inc()
+
+    def connection_closed(self, event):
+        pool_abiertas.labels(self._servidor(event)).dec()
+
+    def connection_checked_out(self, event):
+        pool_en_uso.labels(self._servidor(event)).inc()
+
+    def connection_checked_in(self, event):
+        pool_en_uso.labels(self._servidor(event)).dec()
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        pass
+
+
+def listeners_mongo() -> list:
+    return [MetricasComandos(), MetricasPool()]
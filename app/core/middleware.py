@@ -0,0 +1,230 @@
+"""
+Middlewares ASGI puros: CORS y compresión.
+
+A diferencia de BaseHTTPMiddleware no envuelven la respuesta en otra tarea ni en
+otro stream: solo reescriben los mensajes http.response.start/body al pasar.
+"""
+import re
+import zlib
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él solo se ofrece gzip
+    brotli = None
+
+METODOS_CORS = "GET, POST, PUT, PATCH, DELETE, OPTIONS"
+EXPOSE_HEADERS = "ETag, X-Total-Count"
+MAX_EDAD_PREFLIGHT = "600"
+
+
+class CORS:
+    """
+    CORS con la decisión por origen cacheada y las cabeceras ya codificadas.
+
+    Un origen se evalúa (lista + regex) una sola vez; después es un lookup en un
+    dict. El cache se vacía al llenarse para que orígenes arbitrarios no lo hagan crecer.
+    """
+
+    def __init__(self, app: ASGIApp, origenes: list[str], origen_regex: str | None = None, max_origenes: int = 256):
+        self.app = app
+        self.origenes = set(origenes)
+        self.regex = re.compile(origen_regex) if origen_regex else None
+        self.max_origenes = max_origenes
+        self._decisiones: dict[bytes, bool] = {}
+        self._fijas = [
+            (b"access-control-allow-credentials", b"true"),
+            (b"access-control-expose-headers", EXPOSE_HEADERS.encode()),
+        ]
+        self._preflight = [
+            (b"access-control-allow-credentials", b"true"),
+            (b"access-control-allow-methods", METODOS_CORS.encode()),
+            (b"access-control-max-age", MAX_EDAD_PREFLIGHT.encode()),
+            (b"vary", b"Origin"),
+        ]
+
+    def permitido(self, origen: bytes) -> bool:
+        decision = self._decisiones.get(origen)
+        if decision is None:
+            texto = origen.decode("latin-1")
+            decision = texto in self.origenes or bool(self.regex and self.regex.fullmatch(texto))
+            if len(self._decisiones) >= self.max_origenes:
+                self._decisiones.clear()
+            self._decisiones[origen] = decision
+        return decision
+
+    def cabeceras(self, origen: str | None) -> dict[str, str]:
+        """Cabeceras CORS para una respuesta construida fuera del middleware (errores 500)."""
+        if not origen or not self.permitido(origen.encode("latin-1")):
+            return {}
+        return {"Access-Control-Allow-Origin": origen, "Access-Control-Allow-Credentials": "true", "Vary": "Origin"}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        origen = None
+        metodo_solicitado = None
+        cabeceras_solicitadas = None
+        for nombre, valor in scope["headers"]:
+            if nombre == b"origin":
+                origen = valor
+            elif nombre == b"access-control-request-method":
+                metodo_solicitado = valor
+            elif nombre == b"access-control-request-headers":
+                cabeceras_solicitadas = valor
+        if origen is None:
+            await self.app(scope, receive, send)
+            return
+
+        permitido = self.permitido(origen)
+        if scope["method"] == "OPTIONS" and metodo_solicitado is not None:
+            await self._responder_preflight(send, origen, permitido, cabeceras_solicitadas)
+            return
+        if not permitido:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_cors(message: Message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.raw.append((b"access-control-allow-origin", origen))
+                headers.raw.extend(self._fijas)
+                headers.add_vary_header("Origin")
+            await send(message)
+
+        await self.app(scope, receive, send_cors)
+
+    async def _responder_preflight(self, send: Send, origen: bytes, permitido: bool, cabeceras_solicitadas: bytes | None):
+        if not permitido:
+            cuerpo = b"Disallowed CORS origin"
+            await send({"type": "http.response.start", "status": 400, "headers": [
+                (b"content-type", b"text/plain; charset=utf-8"), (b"content-length", str(len(cuerpo)).encode()),
+            ]})
+            await send({"type": "http.response.body", "body": cuerpo})
+            return
+        headers = [(b"access-control-allow-origin", origen), *self._preflight, (b"content-length", b"0")]
+        if cabeceras_solicitadas:
+            headers.append((b"access-control-allow-headers", cabeceras_solicitadas))
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": b""})
+
+
+def codificaciones_aceptadas(accept_encoding: str) -> set[str]:
+    """
+    Codificaciones de Accept-Encoding con q > 0 ("gzip;q=0" las rechaza).
+    "*" acepta gzip y br salvo que aparezcan con su propio q.
+    """
+    calidades: dict[str, float] = {}
+    for parte in accept_encoding.lower().split(","):
+        token, *parametros = (p.strip() for p in parte.split(";"))
+        if not token:
+            continue
+        calidad = 1.0
+        for parametro in parametros:
+            nombre, _, valor = parametro.partition("=")
+            if nombre.strip() == "q":
+                try:
+                    calidad = float(valor)
+                except ValueError:
+                    calidad = 0.0
+        calidades[token] = calidad
+    if calidades.get("*", 0) > 0:
+        for codificacion in ("gzip", "br"):
+            calidades.setdefault(codificacion, calidades["*"])
+    return {token for token, calidad in calidades.items() if calidad > 0 and token != "*"}
+
+
+def _elegir_codificacion(accept_encoding: str) -> str | None:
+    codificaciones = codificaciones_aceptadas(accept_encoding)
+    if brotli is not None and "br" in codificaciones:
+        return "br"
+    if "gzip" in codificaciones:
+        return "gzip"
+    return None
+
+
+class _Compresor:
+    """Compresión incremental con la misma interfaz para gzip y brotli."""
+
+    def __init__(self, codificacion: str, nivel_gzip: int, calidad_brotli: int):
+        if codificacion == "br":
+            self._obj = brotli.Compressor(quality=calidad_brotli)
+            self._comprimir, self._vaciar = self._obj.process, self._obj.finish
+        else:
+            self._obj = zlib.compressobj(nivel_gzip, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._comprimir, self._vaciar = self._obj.compress, self._obj.flush
+
+    def comprimir(self, datos: bytes) -> bytes:
+        return self._comprimir(datos)
+
+    def terminar(self, datos: bytes = b"") -> bytes:
+        return self._comprimir(datos) + self._vaciar()
+
+
+class Compresion:
+    """
+    Comprime con brotli (si está instalado) o gzip las respuestas de al menos
+    `minimo_bytes`. No toca las que ya traen Content-Encoding, como el menú
+    pre-comprimido, ni las que no son http.
+    """
+
+    def __init__(self, app: ASGIApp, minimo_bytes: int = 1024, nivel_gzip: int = 6, calidad_brotli: int = 4):
+        self.app = app
+        self.minimo_bytes = minimo_bytes
+        self.nivel_gzip = nivel_gzip
+        self.calidad_brotli = calidad_brotli
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        codificacion = _elegir_codificacion(Headers(scope=scope).get("accept-encoding", ""))
+        if codificacion is None:
+            await self.app(scope, receive, send)
+            return
+
+        inicio: Message | None = None
+        compresor: _Compresor | None = None
+        pasar = False
+
+        async def send_comprimido(message: Message):
+            nonlocal inicio, compresor, pasar
+            if message["type"] == "http.response.start":
+                inicio = message
+                pasar = "content-encoding" in Headers(raw=message["headers"])
+                if pasar:
+                    await send(message)
+                return
+            if message["type"] != "http.response.body" or pasar:
+                await send(message)
+                return
+
+            cuerpo = message.get("body", b"")
+            mas = message.get("more_body", False)
+            if compresor is None:
+                if len(cuerpo) < self.minimo_bytes and not mas:
+                    pasar = True
+                    await send(inicio)
+                    await send(message)
+                    return
+                compresor = _Compresor(codificacion, self.nivel_gzip, self.calidad_brotli)
+                headers = MutableHeaders(scope=inicio)
+                headers["Content-Encoding"] = codificacion
+                headers.add_vary_header("Accept-Encoding")
+                if mas:
+                    del headers["Content-Length"]
+                    await send(inicio)
+                    await send({"type": "http.response.body", "body": compresor.comprimir(cuerpo), "more_body": True})
+                    return
+                cuerpo = compresor.terminar(cuerpo)
+                headers["Content-Length"] = str(len(cuerpo))
+                await send(inicio)
+                await send({"type": "http.response.body", "body": cuerpo})
+                return
+            datos = compresor.comprimir(cuerpo) if mas else compresor.terminar(cuerpo)
+            await send({"type": "http.response.body", "body": datos, "more_body": mas})
+
+        await self.app(scope, receive, send_comprimido)
+
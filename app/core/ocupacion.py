@@ -0,0 +1,170 @@
+"""Índice materializado de ocupación de mesas."""
+import asyncio
+import time
+from datetime import datetime
+from typing import NamedTuple
+from beanie.operators import In, NE, And
+from pymongo import DeleteMany, UpdateOne
+from pymongo.errors import BulkWriteError
+from app.config import get_settings
+from app.models.comanda import Comanda, EstadoComanda
+from app.models.ocupacion import OcupacionMesa
+
+settings = get_settings()
+
+ESTADOS_ACTIVOS = (
+    EstadoComanda.PENDIENTE,
+    EstadoComanda.EN_PREPARACION,
+    EstadoComanda.LISTA,
+    EstadoComanda.ENTREGADA,
+)
+
+
+class MesaOcupada(NamedTuple):
+    comanda_id: str
+    estado: EstadoComanda
+
+
+class OcupacionMesas:
+    """
+    Mapa mesa_id -> comanda activa, mantenido al crear comandas y al cambiar su estado.
+    Se persiste en `ocupacion_mesas` para sobrevivir reinicios y compartirse entre
+    workers (cada uno relee la colección al vencer el TTL). Puede reconstruirse
+    desde Comanda en cualquier momento.
+    """
+
+    def __init__(self, ttl_segundos: float):
+        self.ttl_segundos = ttl_segundos
+        self.por_mesa: dict[str, MesaOcupada] = {}
+        self._cargado_en: float | None = None
+        self._lock = asyncio.Lock()
+
+    def _vigente(self) -> bool:
+        return self._cargado_en is not None and time.monotonic() - self._cargado_en < self.ttl_segundos
+
+    async def cargar(self):
+        primera_carga = self._cargado_en is None
+        docs = await OcupacionMesa.find().to_list()
+        if not docs and primera_carga:
+            # Índice vacío al arrancar: puede que nunca se haya construido.
+            await self.reconstruir()
+            return
+        self.por_mesa = {d.mesa_id: MesaOcupada(d.comanda_id, d.estado) for d in docs}
+        self._cargado_en = time.monotonic()
+
+    async def asegurar(self):
+        if self._vigente():
+            return
+        async with self._lock:
+            if not self._vigente():
+                await self.cargar()
+
+    async def reconstruir(self) -> int:
+        """
+        Recalcula el índice desde las comandas activas. Devuelve las mesas ocupadas.
+        Sin borrado general: upsert por mesa y baja de las que ya no están, solo para
+        documentos anteriores a la reconstrucción. Así varios workers pueden reconstruir
+        a la vez y no se pisan los _ocupar que lleguen mientras tanto.
+        """
+        inicio = datetime.utcnow()
+        comandas = await Comanda.find(
+            And(NE(Comanda.mesa_id, None), In(Comanda.estado, list(ESTADOS_ACTIVOS)))
+        ).sort(Comanda.created_at).to_list()
+        # La comanda más antigua de cada mesa la ocupa, como en _ocupar.
+        por_mesa: dict[str, MesaOcupada] = {}
+        for c in comandas:
+            por_mesa.setdefault(c.mesa_id, MesaOcupada(str(c.id), c.estado))
+        operaciones = [
+            UpdateOne(
+                {"mesa_id": mesa_id, "updated_at": {"$lt": inicio}},
+                {"$set": {"comanda_id": o.comanda_id, "estado": o.estado.value, "updated_at": inicio}},
+                upsert=True,
+            )
+            for mesa_id, o in por_mesa.items()
+        ]
+        operaciones.append(DeleteMany({"mesa_id": {"$nin": list(por_mesa)}, "updated_at": {"$lt": inicio}}))
+        try:
+            await OcupacionMesa.get_motor_collection().bulk_write(operaciones, ordered=False)
+        except BulkWriteError as e:
+            # 11000: la mesa ya tiene un documento más nuevo (otro worker o un _ocupar): se respeta.
+            if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+                raise
+        self.por_mesa = por_mesa
+        self._cargado_en = time.monotonic()
+        return len(por_mesa)
+
+    async def _ocupar(self, ocupantes: dict[str, MesaOcupada]):
+        """
+        Registra cada mesa a su comanda salvo que ya la ocupe otra: el upsert filtra
+        también por comanda_id, así que si la mesa tiene el documento de otra comanda
+        el índice único de mesa_id lo rechaza (11000) y la mesa se queda con aquella.
+        """
+        if not ocupantes:
+            return
+        coleccion = OcupacionMesa.get_motor_collection()
+        ahora = datetime.utcnow()
+        mesas = list(ocupantes)
+        rechazadas: list[str] = []
+        try:
+            await coleccion.bulk_write([
+                UpdateOne(
+                    {"mesa_id": mesa_id, "comanda_id": o.comanda_id},
+                    {"$set": {"estado": o.estado.value, "updated_at": ahora}},
+                    upsert=True,
+                )
+                for mesa_id, o in ocupantes.items()
+            ], ordered=False)
+        except BulkWriteError as e:
+            errores = e.details.get("writeErrors", [])
+            if any(err.get("code") != 11000 for err in errores):
+                raise
+            rechazadas = [mesas[err["index"]] for err in errores]
+        for mesa_id, o in ocupantes.items():
+            self.por_mesa[mesa_id] = o
+        if rechazadas:
+            for mesa_id in rechazadas:
+                self.por_mesa.pop(mesa_id, None)
+            async for doc in coleccion.find({"mesa_id": {"$in": rechazadas}}):
+                self.por_mesa[doc["mesa_id"]] = MesaOcupada(doc["comanda_id"], EstadoComanda(doc["estado"]))
+
+    async def registrar_nuevas(self, comandas: list[Comanda]):
+        """Registra en una sola escritura las mesas ocupadas por un lote de comandas nuevas."""
+        por_mesa: dict[str, MesaOcupada] = {}
+        for c in comandas:
+            if c.mesa_id and c.estado in ESTADOS_ACTIVOS:
+                por_mesa.setdefault(c.mesa_id, MesaOcupada(str(c.id), c.estado))
+        await self._ocupar(por_mesa)
+
+    async def registrar(self, comanda: Comanda):
+        """Actualiza el índice tras crear una comanda o cambiar su estado."""
+        if not comanda.mesa_id:
+            return
+        comanda_id = str(comanda.id)
+        if comanda.estado in ESTADOS_ACTIVOS:
+            await self._ocupar({comanda.mesa_id: MesaOcupada(comanda_id, comanda.estado)})
+            return
+        # Se libera solo si la mesa sigue registrada a esta comanda (condición en MongoDB:
+        # el mapa en memoria puede estar atrasado hasta OCUPACION_TTL_SEGUNDOS).
+        await OcupacionMesa.get_motor_collection().delete_one({"mesa_id": comanda.mesa_id, "comanda_id": comanda_id})
+        # La mesa puede seguir ocupada por otra comanda activa: pasa a la más antigua.
+        otra = await Comanda.find(
+            Comanda.mesa_id == comanda.mesa_id,
+            In(Comanda.estado, list(ESTADOS_ACTIVOS)),
+        ).sort(+Comanda.created_at).limit(1).to_list()
+        if otra:
+            await self._ocupar({comanda.mesa_id: MesaOcupada(str(otra[0].id), otra[0].estado)})
+        else:
+            self.por_mesa.pop(comanda.mesa_id, None)
+
+    def ocupacion(self, mesa_id: str) -> MesaOcupada | None:
+        return self.por_mesa.get(mesa_id)
+
+    def estado_mesa(self, mesa_id: str) -> str:
+        """libre, ocupada o por_cobrar (comanda entregada pendiente de pago)."""
+        ocupada = self.por_mesa.get(mesa_id)
+        if ocupada is None:
+            return "libre"
+        return "por_cobrar" if ocupada.estado == EstadoComanda.ENTREGADA else "ocupada"
+
+
+ocupacion = OcupacionMesas(ttl_segundos=settings.OCUPACION_TTL_SEGUNDOS)
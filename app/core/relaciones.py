@@ -0,0 +1,87 @@
+"""Carga agrupada de relaciones Cliente/Mesa para comandas."""
+import asyncio
+from typing import Iterable
+from beanie import PydanticObjectId
+from beanie.operators import In
+from app.models.cliente import Cliente
+from app.models.comanda import Comanda, ComandaResumen
+from app.models.mesa import Mesa
+
+
+def _ids_pendientes(ids: Iterable[str | None], cache: dict) -> list[PydanticObjectId]:
+    """Ids válidos, sin repetir, que aún no están en la caché."""
+    return [PydanticObjectId(i) for i in {i for i in ids if i} if i not in cache and PydanticObjectId.is_valid(i)]
+
+
+async def _buscar(documento, ids: list[PydanticObjectId]) -> list:
+    if not ids:
+        return []
+    return await documento.find(In(documento.id, ids)).to_list()
+
+
+class RelacionesComanda:
+    """
+    Cargador por request (estilo DataLoader).
+    Reúne los cliente_id/mesa_id de un grupo de comandas y los resuelve con una
+    consulta In por colección, sin repetir ids ya cargados.
+    Se inyecta con Depends(RelacionesComanda): FastAPI crea una instancia por request.
+    """
+
+    def __init__(self):
+        self.clientes: dict[str, Cliente | None] = {}
+        self.mesas: dict[str, Mesa | None] = {}
+
+    async def cargar(self, comandas: Iterable[Comanda | ComandaResumen]) -> "RelacionesComanda":
+        comandas = list(comandas)
+        cliente_ids = _ids_pendientes((c.cliente_id for c in comandas), self.clientes)
+        mesa_ids = _ids_pendientes((c.mesa_id for c in comandas), self.mesas)
+        clientes, mesas = await asyncio.gather(_buscar(Cliente, cliente_ids), _buscar(Mesa, mesa_ids))
+        self.clientes.update({str(i): None for i in cliente_ids})
+        self.clientes.update({str(c.id): c for c in clientes})
+        self.mesas.update({str(i): None for i in mesa_ids})
+        self.mesas.update({str(m.id): m for m in mesas})
+        return self
+
+    def cliente(self, cliente_id: str | None) -> Cliente | None:
+        return self.clientes.get(cliente_id) if cliente_id else None
+
+    def mesa(self, mesa_id: str | None) -> Mesa | None:
+        return self.mesas.get(mesa_id) if mesa_id else None
+
+    def response(self, comanda: Comanda) -> dict:
+        return comanda_response(comanda, self.cliente(comanda.cliente_id), self.mesa(comanda.mesa_id))
+
+    def resumen(self, comanda: Comanda | ComandaResumen) -> dict:
+        return comanda_resumen_response(comanda, self.cliente(comanda.cliente_id), self.mesa(comanda.mesa_id))
+
+
+def comanda_resumen_response(c: Comanda | ComandaResumen, cliente: Cliente | None, mesa: Mesa | None) -> dict:
+    """Payload con la forma de ComandaResumenResponse."""
+    return {
+        "id": str(c.id),
+        "numero": c.numero,
+        "mesa_id": c.mesa_id,
+        "mesa_numero": mesa.numero if mesa else None,
+        "cliente_id": c.cliente_id,
+        "estado": c.estado,
+        "forma_pago": c.forma_pago,
+        "origen": c.origen,
+        "subtotal": c.subtotal,
+        "impuesto": c.impuesto,
+        "total": c.total,
+        "observaciones": c.observaciones,
+        "created_at": c.created_at,
+        "cliente_nombre": f"{cliente.nombre} {cliente.apellido}" if cliente else None,
+        "cliente_cedula": cliente.cedula if cliente else None,
+    }
+
+
+def comanda_response(c: Comanda, cliente: Cliente | None, mesa: Mesa | None) -> dict:
+    """Payload con la forma de ComandaResponse, armado sin pasar por pydantic (ver core.respuestas)."""
+    return {
+        **comanda_resumen_response(c, cliente, mesa),
+        "detalles": [
+            {"plato_id": d.plato_id, "plato_nombre": d.plato_nombre, "cantidad": d.cantidad, "precio_unitario": d.precio_unitario, "subtotal": d.subtotal, "observaciones": d.observaciones}
+            for d in c.detalles
+        ],
+    }
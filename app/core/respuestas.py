@@ -0,0 +1,43 @@
+"""
+Respuestas serializadas con orjson (y msgpack si el cliente lo pide).
+
+Los endpoints de comandas arman el payload como dicts desde los documentos y
+devuelven la Response ya codificada: FastAPI no vuelve a validar contra el
+response_model (que queda solo para la documentación OpenAPI).
+"""
+from datetime import datetime
+from enum import Enum
+from fastapi import Request
+from fastapi.responses import ORJSONResponse, Response
+
+try:
+    import msgpack
+except ImportError:  # msgpack es opcional: sin él siempre se responde JSON
+    msgpack = None
+
+MEDIA_MSGPACK = "application/msgpack"
+
+
+def _msgpack_default(valor):
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    if isinstance(valor, Enum):
+        return valor.value
+    raise TypeError(f"No serializable en msgpack: {type(valor).__name__}")
+
+
+class MsgpackResponse(Response):
+    media_type = MEDIA_MSGPACK
+
+    def render(self, content) -> bytes:
+        return msgpack.packb(content, default=_msgpack_default)
+
+
+def acepta_msgpack(request: Request) -> bool:
+    return msgpack is not None and MEDIA_MSGPACK in request.headers.get("accept", "")
+
+
+def respuesta(request: Request, contenido, status_code: int = 200, headers: dict[str, str] | None = None) -> Response:
+    """JSON con orjson, o msgpack si el cliente envía Accept: application/msgpack."""
+    clase = MsgpackResponse if acepta_msgpack(request) else ORJSONResponse
+    return clase(contenido, status_code=status_code, headers={**(headers or {}), "Vary": "Accept"})
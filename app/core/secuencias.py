@@ -0,0 +1,94 @@
+"""Secuencias atómicas respaldadas por la colección de contadores."""
+import asyncio
+from pymongo import ReturnDocument
+from app.config import get_settings
+from app.models.contador import Contador
+from app.models.comanda import Comanda, ComandaHistorico
+
+settings = get_settings()
+
+
+def formatear_numero_comanda(n: int) -> str:
+    return f"CMD-{n:06d}"
+
+
+class Secuencia:
+    """
+    Secuencia de enteros avanzada con findOneAndUpdate + $inc.
+    Cada worker reserva un bloque de números en una sola llamada y los reparte
+    en memoria; solo vuelve a la BD cuando agota el bloque.
+    Los números son únicos entre workers, pero no necesariamente consecutivos
+    (un reinicio deja huecos en el bloque no usado).
+    """
+
+    def __init__(self, nombre: str, bloque: int = 1):
+        self.nombre = nombre
+        self.bloque = max(1, bloque)
+        self._siguiente = 1
+        self._limite = 0  # último número reservado (inclusive)
+        self._inicializada = False
+        self._lock = asyncio.Lock()
+
+    async def _valor_inicial(self) -> int:
+        """Valor desde el que arranca el contador si aún no existe en la BD."""
+        return 0
+
+    async def _inicializar(self):
+        collection = Contador.get_motor_collection()
+        if not await collection.find_one({"nombre": self.nombre}, {"_id": 1}):
+            # $max es idempotente: si dos workers inicializan a la vez gana el mayor.
+            await collection.update_one(
+                {"nombre": self.nombre},
+                {"$max": {"valor": await self._valor_inicial()}},
+                upsert=True,
+            )
+        self._inicializada = True
+
+    async def _reservar(self, cantidad: int) -> int:
+        """Reserva `cantidad` números en la BD. Devuelve el primero del bloque."""
+        doc = await Contador.get_motor_collection().find_one_and_update(
+            {"nombre": self.nombre},
+            {"$inc": {"valor": cantidad}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return doc["valor"] - cantidad + 1
+
+    async def siguientes(self, cantidad: int) -> list[int]:
+        async with self._lock:
+            if not self._inicializada:
+                await self._inicializar()
+            numeros = list(range(self._siguiente, self._limite + 1))[:cantidad]
+            faltan = cantidad - len(numeros)
+            if faltan:
+                reserva = max(self.bloque, faltan)
+                inicio = await self._reservar(reserva)
+                numeros += range(inicio, inicio + faltan)
+                self._siguiente = inicio + faltan
+                self._limite = inicio + reserva - 1
+            else:
+                self._siguiente += cantidad
+            return numeros
+
+    async def siguiente(self) -> int:
+        return (await self.siguientes(1))[0]
+
+
+class SecuenciaComandas(Secuencia):
+    """Numeración CMD-xxxxxx. Si el contador no existe arranca tras la comanda más alta (viva o archivada)."""
+
+    async def _valor_inicial(self) -> int:
+        # Máximo numérico, no de texto: "CMD-1000000" ordena antes que "CMD-999999".
+        # Recorre las colecciones, pero solo ocurre una vez (el contador no existía).
+        sufijo = {"$convert": {"input": {"$arrayElemAt": [{"$split": ["$numero", "-"]}, -1]}, "to": "long", "onError": None, "onNull": None}}
+        valor = 0
+        for modelo in (Comanda, ComandaHistorico):
+            resultado = await modelo.get_motor_collection().aggregate([
+                {"$group": {"_id": None, "maximo": {"$max": sufijo}}},
+            ]).to_list(1)
+            if resultado and resultado[0]["maximo"] is not None:
+                valor = max(valor, int(resultado[0]["maximo"]))
+        return valor
+
+
+secuencia_comandas = SecuenciaComandas("comanda", bloque=settings.COMANDA_NUMERO_BLOQUE)
@@ -1,12 +1,16 @@
 """Seguridad y autenticación."""
+import asyncio
 import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.config import get_settings
 
 settings = get_settings()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+# bcrypt libera el GIL: un pool pequeño saca el hash del event loop y limita cuántos corren a la vez.
+_hash_executor = ThreadPoolExecutor(max_workers=settings.BCRYPT_MAX_CONCURRENCIA, thread_name_prefix="bcrypt")
 
 
 def _normalize_for_bcrypt(password: str) -> str:
@@ -25,6 +29,16 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(_normalize_for_bcrypt(password))
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password en el pool de bcrypt, sin bloquear el event loop."""
+    return await asyncio.get_running_loop().run_in_executor(_hash_executor, verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash en el pool de bcrypt, sin bloquear el event loop."""
+    return await asyncio.get_running_loop().run_in_executor(_hash_executor, get_password_hash, password)
+
+
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
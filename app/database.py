@@ -1,25 +1,144 @@
 """Configuración de base de datos MongoDB."""
+import asyncio
+import logging
 from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
+from beanie.odm.utils.init import Initializer
+from beanie.odm.utils.pydantic import get_model_fields
+from beanie.odm.utils.typing import get_index_attributes
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure
 from app.config import get_settings
+from app.core.consultas import ContadorComandos
+from app.core.metricas import listeners_mongo
+
+logger = logging.getLogger(__name__)
 
 settings = get_settings()
 client: AsyncIOMotorClient | None = None
+database = None
+
+
+def opciones_cliente(**cambios) -> dict:
+    """Opciones de AsyncIOMotorClient según Settings (`cambios` las sobrescribe, p. ej. en benchmarks)."""
+    opciones = {
+        "maxPoolSize": settings.MONGODB_MAX_POOL,
+        "minPoolSize": settings.MONGODB_MIN_POOL,
+        "serverSelectionTimeoutMS": settings.MONGODB_SELECCION_TIMEOUT_MS,
+        "connectTimeoutMS": settings.MONGODB_CONEXION_TIMEOUT_MS,
+        # En pymongo None es "sin límite"; en Settings se usa 0 para eso.
+        "maxIdleTimeMS": settings.MONGODB_MAX_IDLE_MS or None,
+        "waitQueueTimeoutMS": settings.MONGODB_ESPERA_POOL_MS or None,
+        "socketTimeoutMS": settings.MONGODB_SOCKET_TIMEOUT_MS or None,
+        "event_listeners": [*listeners_mongo(), ContadorComandos()],
+    }
+    compresores = [c.strip() for c in settings.MONGODB_COMPRESORES.split(",") if c.strip()]
+    if compresores:
+        opciones["compressors"] = compresores
+    return {**opciones, **cambios}
+
+
+def _segundos(valor: float | None) -> str:
+    return "sin límite" if valor is None else f"{valor:g}s"
+
+
+def describir_cliente(cliente: AsyncIOMotorClient) -> str:
+    """Configuración efectiva del pool, tal como la resolvió el driver (URL + opciones)."""
+    pool = cliente.options.pool_options
+    # Los compresores sin su paquete instalado (zstandard, python-snappy) los descarta pymongo.
+    compresores = ",".join(pool._compression_settings.compressors) or "ninguno"
+    return (
+        f"pool {pool.min_pool_size}-{pool.max_pool_size} por worker, compresión {compresores}, "
+        f"timeouts selección={_segundos(cliente.options.server_selection_timeout)} conexión={_segundos(pool.connect_timeout)} "
+        f"socket={_segundos(pool.socket_timeout)} espera_pool={_segundos(pool.wait_queue_timeout)}, "
+        f"lectura {cliente.read_preference.mongos_mode} (reportes {settings.MONGODB_LECTURA_REPORTES})"
+    )
+
+
+class InicializadorSinIndices(Initializer):
+    """Registra los modelos en Beanie sin revisar ni crear índices (arranque rápido)."""
+
+    async def init_indexes(self, cls, allow_index_dropping: bool = False):
+        pass
 
 
-async def init_db():
-    """Inicializar conexión MongoDB y documentos Beanie."""
-    global client
+def modelos() -> list:
     from app.models.user import User
     from app.models.cliente import Cliente
     from app.models.plato import Plato, CategoriaPlato
-    from app.models.comanda import Comanda
+    from app.models.comanda import Comanda, ComandaHistorico
     from app.models.mesa import Mesa
     from app.models.notificacion import NotificacionMesonera
+    from app.models.contador import Contador
+    from app.models.ocupacion import OcupacionMesa
+    from app.models.resumen import ResumenVentas
+    return [User, Cliente, CategoriaPlato, Plato, Mesa, Comanda, ComandaHistorico, NotificacionMesonera, Contador, OcupacionMesa, ResumenVentas]
 
-    client = AsyncIOMotorClient(settings.MONGODB_URL)
-    database = client.get_default_database()
-    await init_beanie(
-        database=database,
-        document_models=[User, Cliente, CategoriaPlato, Plato, Mesa, Comanda, NotificacionMesonera],
-    )
+
+async def init_db(nombre_bd: str | None = None, indices: bool | None = True):
+    """
+    Inicializar conexión MongoDB y documentos Beanie (por defecto la BD de MONGODB_URL).
+    indices=True revisa y crea todos los índices; False solo los únicos (el resto
+    queda para asegurar_indices()); None no toca ninguno, para las migraciones que
+    corrigen los datos antes de crear los únicos (scripts/migrar_indices.py).
+    """
+    global client, database
+    client = AsyncIOMotorClient(settings.MONGODB_URL, **opciones_cliente())
+    logger.info("MongoDB: %s", describir_cliente(client))
+    database = client.get_database(nombre_bd) if nombre_bd else client.get_default_database()
+    if not indices:
+        await InicializadorSinIndices(database=database, document_models=modelos())
+        if indices is False:
+            await asegurar_indices_unicos()
+        return
+    # Sin allow_index_dropping: los índices que no declaran los modelos (creados por
+    # operaciones o Atlas) se respetan. Los cambios de opciones van en scripts/migrar_indices.py.
+    await init_beanie(database=database, document_models=modelos())
+
+
+def _indices_unicos(modelo) -> list[IndexModel]:
+    """Índices únicos declarados en el modelo (Indexed(..., unique=True) y Settings.indexes)."""
+    unicos = []
+    for nombre, campo in get_model_fields(modelo).items():
+        atributos = get_index_attributes(campo)
+        if atributos and atributos[1].get("unique"):
+            unicos.append(IndexModel([(campo.alias or nombre, atributos[0])], **atributos[1]))
+    for indice in modelo.get_settings().indexes or []:
+        indice = getattr(indice, "index", indice)  # Beanie los guarda como IndexModelField
+        if isinstance(indice, IndexModel) and indice.document.get("unique"):
+            unicos.append(indice)
+    return unicos
+
+
+async def _asegurar_unicos(modelo):
+    coleccion = modelo.get_motor_collection()
+    existentes = await coleccion.index_information()
+    faltan = [i for i in _indices_unicos(modelo) if not existentes.get(i.document["name"], {}).get("unique")]
+    if not faltan:
+        return
+    try:
+        await coleccion.create_indexes(faltan)
+    except OperationFailure as e:
+        raise RuntimeError(
+            f"No se pudieron crear los índices únicos de {coleccion.name} ({', '.join(i.document['name'] for i in faltan)}): "
+            f"{e}. Correr python scripts/migrar_indices.py"
+        ) from e
+    logger.info("Índices únicos creados en %s: %s", coleccion.name, ", ".join(i.document["name"] for i in faltan))
+
+
+async def asegurar_indices_unicos():
+    """
+    Crea ya los índices únicos que falten: de ellos dependen la numeración de comandas,
+    la idempotencia de los lotes, la cédula y la ocupación por mesa, así que no se
+    difieren. Si no se pueden crear (datos repetidos, índice viejo) la API no arranca.
+    """
+    await asyncio.gather(*(_asegurar_unicos(modelo) for modelo in modelos()))
+
+
+async def asegurar_indices():
+    """Revisa y crea los índices de todos los modelos, como init_db(indices=True)."""
+    inicializador = Initializer(database=database, document_models=modelos())
+    # Los modelos ya están inicializados: que Beanie no vuelva a configurarlos.
+    inicializador.inited_classes = list(inicializador.document_models)
+    for modelo in inicializador.document_models:
+        await inicializador.init_indexes(modelo)
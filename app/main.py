@@ -1,39 +1,47 @@
 """Aplicación principal - Casa Fernando Backend."""
 import logging
-import re
+import secrets
 from contextlib import asynccontextmanager
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from fastapi import FastAPI, Request
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from app.core.arranque import indices_diferidos, perfil, precalentar  # primero: mide la importación del resto
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from app.database import init_db
 from app.config import get_settings
-from app.api import auth, cliente_area, mesonera, pos, facturacion, admin, websocket, comandas, mesas
+from app.core.archivo import archivador
+from app.core.broker import broker
+from app.core.consultas import PresupuestoConsultas
+from app.core.metricas import MetricasHTTP, arranque_fases, websockets_activos
+from app.core.middleware import CORS, Compresion
+from app.api import auth, cliente_area, mesonera, pos, facturacion, admin, websocket, comandas, mesas, reportes, clientes
 
 logger = logging.getLogger(__name__)
 
-VERCEL_REGEX = re.compile(r"^https://[a-z0-9.-]+\.vercel\.app$")
-
-
-class AddCORSHeadersMiddleware(BaseHTTPMiddleware):
-    """Añade CORS headers a TODAS las respuestas para evitar bloqueos."""
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-        origin = request.headers.get("origin")
-        if origin and (origin in ("http://localhost:3000", "https://casa-fernando-frontend.vercel.app") or VERCEL_REGEX.match(origin)):
-            response.headers["Access-Control-Allow-Origin"] = origin
-        response.headers["Access-Control-Allow-Credentials"] = "true"
-        response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, PATCH, DELETE, OPTIONS"
-        response.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization"
-        return response
+VERCEL_REGEX = r"https://[a-z0-9.-]+\.vercel\.app"
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Inicializar BD al arrancar."""
-    await init_db()
+    perfil.marcar("servidor")
+    modo_indices = _settings.INDICES_MODO
+    await init_db(indices=modo_indices == "arranque")
+    perfil.marcar("init_db")
+    await broker.iniciar()
+    await archivador.iniciar()
+    perfil.marcar("broker")
+    if _settings.PRECALENTAR_CACHES:
+        await precalentar()
+        perfil.marcar("precalentar")
+    if modo_indices == "segundo_plano":
+        indices_diferidos.iniciar()
+    for fase, segundos in perfil.fases.items():
+        arranque_fases.labels(fase).set(segundos)
+    logger.info("Arranque en %s, índices: %s", perfil.resumen(), modo_indices)
     yield
+    await indices_diferidos.detener()
+    await archivador.detener()
+    await broker.detener()
 
 
 app = FastAPI(
@@ -41,6 +49,7 @@ app = FastAPI(
     description="Backend ERP para restaurante - Área cliente, mesonera, punto de venta y facturación",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 _settings = get_settings()
@@ -50,25 +59,19 @@ if not _cors_origins:
 if "https://casa-fernando-frontend.vercel.app" not in _cors_origins:
     _cors_origins.append("https://casa-fernando-frontend.vercel.app")
 
-app.add_middleware(AddCORSHeadersMiddleware)
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=_cors_origins,
-    allow_origin_regex=r"https://.*\.vercel\.app",
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-    expose_headers=["*"],
-)
+# El último en añadirse es el más externo: CORS ve también las respuestas comprimidas.
+if _settings.MODO_DESARROLLO:
+    app.add_middleware(PresupuestoConsultas, presupuesto=_settings.CONSULTAS_PRESUPUESTO, repeticiones_max=_settings.CONSULTAS_REPETIDAS_MAX)
+app.add_middleware(Compresion, minimo_bytes=_settings.COMPRESION_MIN_BYTES, nivel_gzip=_settings.COMPRESION_NIVEL_GZIP)
+app.add_middleware(CORS, origenes=_cors_origins, origen_regex=VERCEL_REGEX)
+if _settings.METRICAS_HABILITADAS:
+    app.add_middleware(MetricasHTTP)
+_cors = CORS(None, origenes=_cors_origins, origen_regex=VERCEL_REGEX)
+
 
 def _add_cors_to_response(response: JSONResponse, request: Request) -> JSONResponse:
     """Añade CORS a respuestas de error (el middleware no las procesa cuando hay excepción)."""
-    origin = request.headers.get("origin")
-    if origin and (origin in ("http://localhost:3000", "https://casa-fernando-frontend.vercel.app") or VERCEL_REGEX.match(origin)):
-        response.headers["Access-Control-Allow-Origin"] = origin
-    response.headers["Access-Control-Allow-Credentials"] = "true"
-    response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, PATCH, DELETE, OPTIONS"
-    response.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization"
+    response.headers.update(_cors.cabeceras(request.headers.get("origin")))
     return response
 
 
@@ -100,6 +103,22 @@ app.include_router(admin.router, prefix="/api")
 app.include_router(websocket.router, prefix="/api")
 app.include_router(comandas.router, prefix="/api")
 app.include_router(mesas.router, prefix="/api")
+app.include_router(reportes.router, prefix="/api")
+app.include_router(clientes.router, prefix="/api")
+
+
+websockets_activos.labels("mesonera").set_function(lambda: len(websocket.mesonera_connections))
+websockets_activos.labels("cocina").set_function(lambda: len(websocket.cocina_connections))
+
+
+if _settings.METRICAS_HABILITADAS:
+    @app.get("/metrics", include_in_schema=False)
+    async def metricas(request: Request):
+        if _settings.METRICAS_TOKEN and not secrets.compare_digest(
+            request.headers.get("authorization", ""), f"Bearer {_settings.METRICAS_TOKEN}"
+        ):
+            raise HTTPException(status_code=401, detail="Token de métricas inválido")
+        return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 
 @app.get("/")
@@ -109,3 +128,6 @@ async def root():
         "docs": "/docs",
         "version": "1.0.0",
     }
+
+
+perfil.marcar("importar")
@@ -2,9 +2,12 @@
 from app.models.user import User
 from app.models.cliente import Cliente
 from app.models.plato import Plato, CategoriaPlato
-from app.models.comanda import Comanda, ComandaDetalleEmbedded, EstadoComanda, FormaPago, OrigenComanda
+from app.models.comanda import Comanda, ComandaDetalleEmbedded, ComandaHistorico, ComandaResumen, ComandaVentas, EstadoComanda, FormaPago, OrigenComanda
 from app.models.mesa import Mesa
 from app.models.notificacion import NotificacionMesonera
+from app.models.contador import Contador
+from app.models.ocupacion import OcupacionMesa
+from app.models.resumen import ResumenVentas
 
 __all__ = [
     "User",
@@ -13,9 +16,15 @@ __all__ = [
     "CategoriaPlato",
     "Comanda",
     "ComandaDetalleEmbedded",
+    "ComandaHistorico",
+    "ComandaResumen",
+    "ComandaVentas",
     "EstadoComanda",
     "FormaPago",
     "OrigenComanda",
     "Mesa",
     "NotificacionMesonera",
+    "Contador",
+    "OcupacionMesa",
+    "ResumenVentas",
 ]
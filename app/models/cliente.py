@@ -1,19 +1,24 @@
 """Modelo de cliente."""
 from beanie import Document, Indexed
 from pydantic import Field
+from pymongo import IndexModel, ASCENDING
 from datetime import datetime
 from typing import Optional
 
 
 class Cliente(Document):
-    cedula: Indexed(str)
+    cedula: Indexed(str, unique=True)
     nombre: str
     apellido: str
     direccion: Optional[str] = None
     telefono: str
     email: Optional[str] = None
+    busqueda: list[str] = []  # Palabras normalizadas + dígitos de cédula (core.busqueda)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: Optional[datetime] = None
 
     class Settings:
         name = "clientes"
+        indexes = [
+            IndexModel([("busqueda", ASCENDING)]),
+        ]
@@ -1,6 +1,7 @@
 """Modelos de comandas."""
-from beanie import Document
+from beanie import Document, Indexed, PydanticObjectId
 from pydantic import BaseModel, Field
+from pymongo import IndexModel, ASCENDING, DESCENDING
 from datetime import datetime
 from typing import Optional
 import enum
@@ -37,10 +38,51 @@ class OrigenComanda(str, enum.Enum):
     PUNTO_VENTA = "punto_venta"
 
 
-class Comanda(Document):
+class ComandaResumen(BaseModel):
+    """Vista de proyección para listados: todo menos `detalles`, que solo leen los endpoints de detalle."""
+    id: PydanticObjectId = Field(alias="_id")
     numero: str
     mesa_id: Optional[str] = None
     cliente_id: str
+    estado: EstadoComanda
+    forma_pago: Optional[FormaPago] = None
+    origen: OrigenComanda
+    subtotal: float = 0.0
+    impuesto: float = 0.0
+    total: float = 0.0
+    observaciones: Optional[str] = None
+    created_at: datetime
+
+
+class DetalleVentas(BaseModel):
+    plato_id: str
+    plato_nombre: str
+    cantidad: int = 1
+    subtotal: float
+
+
+class ComandaVentas(BaseModel):
+    """Vista de proyección para recalcular los resúmenes de ventas: importes, estado y platos vendidos."""
+    estado: EstadoComanda
+    forma_pago: Optional[FormaPago] = None
+    origen: OrigenComanda
+    subtotal: float = 0.0
+    impuesto: float = 0.0
+    total: float = 0.0
+    created_at: datetime
+    detalles: list[DetalleVentas] = []
+
+    class Settings:
+        projection = {
+            "estado": 1, "forma_pago": 1, "origen": 1, "subtotal": 1, "impuesto": 1, "total": 1, "created_at": 1,
+            "detalles.plato_id": 1, "detalles.plato_nombre": 1, "detalles.cantidad": 1, "detalles.subtotal": 1,
+        }
+
+
+class Comanda(Document):
+    numero: Indexed(str, unique=True)
+    mesa_id: Optional[str] = None
+    cliente_id: str
     usuario_id: Optional[str] = None
     estado: EstadoComanda = EstadoComanda.PENDIENTE
     forma_pago: Optional[FormaPago] = None
@@ -50,8 +92,39 @@ class Comanda(Document):
     total: float = 0.0
     observaciones: Optional[str] = None
     detalles: list[ComandaDetalleEmbedded] = []
+    clave_idempotencia: Optional[str] = None  # Generada por el cliente en la sincronización offline
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: Optional[datetime] = None
 
     class Settings:
         name = "comandas"
+        indexes = [
+            IndexModel([("created_at", DESCENDING)]),
+            IndexModel([("estado", ASCENDING), ("created_at", DESCENDING)]),
+            IndexModel([("mesa_id", ASCENDING), ("estado", ASCENDING), ("created_at", DESCENDING)]),
+            IndexModel([("cliente_id", ASCENDING), ("created_at", DESCENDING)]),
+            IndexModel(
+                [("clave_idempotencia", ASCENDING)],
+                unique=True,
+                partialFilterExpression={"clave_idempotencia": {"$type": "string"}},
+            ),
+        ]
+
+
+class ComandaHistorico(Comanda):
+    """Comandas pagadas/canceladas movidas fuera de la colección viva (core.archivo)."""
+    archivada_at: Optional[datetime] = None
+
+    class Settings:
+        name = "comandas_historico"
+        indexes = [
+            IndexModel([("created_at", DESCENDING)]),
+            IndexModel([("cliente_id", ASCENDING), ("created_at", DESCENDING)]),
+            # La sincronización offline busca aquí también las claves ya usadas: un lote
+            # reenviado después del archivo no debe duplicar comandas.
+            IndexModel(
+                [("clave_idempotencia", ASCENDING)],
+                unique=True,
+                partialFilterExpression={"clave_idempotencia": {"$type": "string"}},
+            ),
+        ]
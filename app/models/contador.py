@@ -0,0 +1,10 @@
+"""Modelo de contadores atómicos (secuencias)."""
+from beanie import Document, Indexed
+
+
+class Contador(Document):
+    nombre: Indexed(str, unique=True)
+    valor: int = 0
+
+    class Settings:
+        name = "contadores"
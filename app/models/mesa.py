@@ -1,6 +1,7 @@
 """Modelo de mesa."""
 from beanie import Document
 from pydantic import Field
+from pymongo import IndexModel, ASCENDING
 from datetime import datetime
 from typing import Optional
 
@@ -14,3 +15,7 @@ class Mesa(Document):
 
     class Settings:
         name = "mesas"
+        indexes = [
+            IndexModel([("numero", ASCENDING)]),
+            IndexModel([("activa", ASCENDING), ("numero", ASCENDING)]),
+        ]
@@ -1,8 +1,10 @@
 """Modelo de notificaciones para mesonera."""
 from beanie import Document
 from pydantic import Field
+from pymongo import IndexModel, ASCENDING, DESCENDING
 from datetime import datetime
 from typing import Optional
+from app.config import get_settings
 
 
 class NotificacionMesonera(Document):
@@ -10,6 +12,11 @@ class NotificacionMesonera(Document):
     mensaje: str = "El cliente solicita atención"
     atendida: int = 0
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    atendida_at: Optional[datetime] = None  # Con fecha, el índice TTL la elimina
 
     class Settings:
         name = "notificaciones_mesonera"
+        indexes = [
+            IndexModel([("atendida", ASCENDING), ("created_at", DESCENDING)]),
+            IndexModel([("atendida_at", ASCENDING)], expireAfterSeconds=get_settings().NOTIFICACION_TTL_SEGUNDOS),
+        ]
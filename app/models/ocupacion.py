@@ -0,0 +1,16 @@
+"""Modelo del índice de ocupación de mesas."""
+from beanie import Document, Indexed
+from pydantic import Field
+from datetime import datetime
+from app.models.comanda import EstadoComanda
+
+
+class OcupacionMesa(Document):
+    """Comanda activa de cada mesa ocupada. Las mesas libres no tienen documento."""
+    mesa_id: Indexed(str, unique=True)
+    comanda_id: str
+    estado: EstadoComanda
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "ocupacion_mesas"
@@ -1,6 +1,7 @@
 """Modelos de platos y categorías."""
 from beanie import Document
 from pydantic import Field
+from pymongo import IndexModel, ASCENDING
 from datetime import datetime
 from typing import Optional
 
@@ -14,6 +15,10 @@ class CategoriaPlato(Document):
 
     class Settings:
         name = "categorias_plato"
+        indexes = [
+            IndexModel([("orden", ASCENDING)]),
+            IndexModel([("activo", ASCENDING), ("orden", ASCENDING)]),
+        ]
 
 
 class Plato(Document):
@@ -28,3 +33,7 @@ class Plato(Document):
 
     class Settings:
         name = "platos"
+        indexes = [
+            IndexModel([("nombre", ASCENDING)]),
+            IndexModel([("disponible", ASCENDING), ("nombre", ASCENDING)]),
+        ]
@@ -0,0 +1,30 @@
+"""Modelo de resúmenes de ventas pre-agregados."""
+from beanie import Document
+from pydantic import Field
+from datetime import datetime
+from pymongo import IndexModel, ASCENDING
+
+
+class ResumenVentas(Document):
+    """
+    Totales de un día u hora (según `periodo`), mantenidos con $inc cuando una
+    comanda llega a PAGADA o CANCELADA. `por_forma_pago` y `por_origen` guardan
+    {"comandas", "total"}; `platos` guarda {plato_id: {"nombre", "unidades", "ingresos"}}.
+    """
+    periodo: str  # "dia" | "hora"
+    inicio: datetime
+    comandas: int = 0
+    subtotal: float = 0.0
+    impuesto: float = 0.0
+    ingresos: float = 0.0
+    canceladas: int = 0
+    monto_cancelado: float = 0.0
+    por_forma_pago: dict[str, dict] = Field(default_factory=dict)
+    por_origen: dict[str, dict] = Field(default_factory=dict)
+    platos: dict[str, dict] = Field(default_factory=dict)
+
+    class Settings:
+        name = "resumen_ventas"
+        indexes = [
+            IndexModel([("periodo", ASCENDING), ("inicio", ASCENDING)], unique=True),
+        ]
@@ -0,0 +1,45 @@
+"""
+Plugin de pytest: presupuesto de consultas MongoDB por test.
+
+Se activa en conftest.py con `pytest_plugins = ["app.pytest_plugin"]` (o `pytest -p app.pytest_plugin`).
+
+    @pytest.mark.max_consultas(3)
+    def test_listar_comandas(client):
+        client.get("/api/mesonera/comandas")
+
+    def test_detalle(client, presupuesto_consultas):
+        with presupuesto_consultas(2):
+            client.get(f"/api/mesonera/comandas/{comanda_id}")
+
+    def test_algo(client, consultas):
+        ...
+        assert consultas.total <= 4, consultas.resumen()
+"""
+import pytest
+from app.core.consultas import ContadorConsultas, contar_consultas, max_consultas
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "max_consultas(n): falla si el test hace más de n consultas a MongoDB")
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_pyfunc_call(pyfuncitem):
+    marca = pyfuncitem.get_closest_marker("max_consultas")
+    if marca is None:
+        return (yield)
+    with max_consultas(marca.args[0]):
+        return (yield)
+
+
+@pytest.fixture
+def consultas() -> ContadorConsultas:
+    """Contador de las consultas hechas durante el test."""
+    with contar_consultas() as contador:
+        yield contador
+
+
+@pytest.fixture
+def presupuesto_consultas() -> type[max_consultas]:
+    """max_consultas(n) como context manager para acotar solo una parte del test."""
+    return max_consultas
@@ -20,3 +20,12 @@ class ClienteResponse(ClienteBase):
 
     class Config:
         from_attributes = True
+
+
+class ClienteBusquedaItem(BaseModel):
+    """Coincidencia del typeahead de clientes."""
+    id: str
+    cedula: str
+    nombre: str
+    apellido: str
+    telefono: str | None = None
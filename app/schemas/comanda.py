@@ -1,5 +1,5 @@
 """Esquemas de comandas."""
-from pydantic import BaseModel, model_validator
+from pydantic import BaseModel, Field, model_validator
 from datetime import datetime
 from app.models.comanda import EstadoComanda, FormaPago, OrigenComanda
 from app.schemas.cliente import ClienteCreate
@@ -40,6 +40,25 @@ class ComandaCreate(BaseModel):
         return self
 
 
+class ComandaLoteItem(BaseModel):
+    """Comanda encolada offline con su clave de idempotencia (generada en la tablet)."""
+    clave: str = Field(..., min_length=1, max_length=100)
+    comanda: ComandaCreate
+
+
+class ComandaLoteCreate(BaseModel):
+    items: list[ComandaLoteItem] = Field(..., min_length=1, max_length=1000)
+
+
+class ComandaLoteResultado(BaseModel):
+    clave: str
+    ok: bool
+    duplicada: bool = False
+    comanda_id: str | None = None
+    numero: str | None = None
+    error: str | None = None
+
+
 class ComandaUpdate(BaseModel):
     estado: EstadoComanda | None = None
     forma_pago: FormaPago | None = None
@@ -67,6 +86,25 @@ class ComandaResponse(BaseModel):
         from_attributes = True
 
 
+class ComandaResumenResponse(BaseModel):
+    """Comanda sin detalles (listados con ?campos=resumen)."""
+    id: str
+    numero: str
+    mesa_id: str | None = None
+    mesa_numero: str | None = None
+    cliente_id: str
+    estado: EstadoComanda
+    forma_pago: FormaPago | None = None
+    origen: OrigenComanda
+    subtotal: float
+    impuesto: float
+    total: float
+    observaciones: str | None = None
+    created_at: datetime
+    cliente_nombre: str | None = None
+    cliente_cedula: str | None = None
+
+
 class ComandaFacturacionResponse(BaseModel):
     """Comanda para módulo de facturación."""
     id: str
@@ -1,5 +1,6 @@
 """Esquemas de mesas."""
 from pydantic import BaseModel
+from app.models.comanda import EstadoComanda
 
 
 class MesaBase(BaseModel):
@@ -27,6 +28,17 @@ class MesaResponse(MesaBase):
         from_attributes = True
 
 
+class MesaEstadoItem(BaseModel):
+    """Estado de una mesa en el salón: libre, ocupada o por_cobrar."""
+    id: str
+    numero: str
+    capacidad: int
+    ubicacion: str | None = None
+    estado: str
+    comanda_id: str | None = None
+    comanda_estado: EstadoComanda | None = None
+
+
 class MesaSelectItem(BaseModel):
     """Mesa para selector al crear comanda."""
     id: str
@@ -0,0 +1,9 @@
+"""
+Benchmarks de carga del backend.
+
+    python -m benchmarks sembrar --comandas 100000 --clientes 50000
+    python -m benchmarks rush --segundos 30 --salida resultados/rush.json
+
+Trabajan sobre una base aparte (por defecto <bd de MONGODB_URL>_bench) de un
+MongoDB local; la app corre en el mismo proceso vía httpx.ASGITransport.
+"""
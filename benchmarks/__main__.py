@@ -0,0 +1,104 @@
+"""
+CLI de benchmarks.
+
+    python -m benchmarks sembrar --comandas 100000 --clientes 50000 --dias 180
+    python -m benchmarks rush --segundos 30 --salida resultados/rush.json
+    python -m benchmarks pool --tamanos 5,10,25,50,100 --concurrencia 200
+
+El informe es JSON (stdout o --salida) para guardarlo y comparar entre versiones.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config import get_settings
+from app.core.broker import broker
+from app.database import init_db
+
+
+def _bd_por_defecto() -> str:
+    from pymongo.uri_parser import parse_uri
+    return f"{parse_uri(get_settings().MONGODB_URL).get('database') or 'casa_fernando'}_bench"
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def sembrar(args):
+    from benchmarks.datos import sembrar
+    await init_db(args.bd)
+    resultado = await sembrar(args.comandas, args.clientes, args.dias)
+    print(json.dumps({"bd": args.bd, **resultado}, indent=2))
+
+
+async def rush(args):
+    from benchmarks.escenario import ejecutar
+    await init_db(args.bd)
+    await broker.iniciar()
+    try:
+        informe = await ejecutar(args.segundos, args.comensales, args.mesoneras, args.cajas, args.llamadas)
+    finally:
+        await broker.detener()
+    _escribir(args, informe)
+
+
+async def pool(args):
+    from benchmarks.pool import comparar
+    await init_db(args.bd)
+    tamanos = [int(t) for t in args.tamanos.split(",")]
+    _escribir(args, await comparar(args.bd, tamanos, args.concurrencia, args.segundos))
+
+
+def _escribir(args, informe: dict):
+    informe = {"fecha": datetime.utcnow().isoformat(), "commit": _commit(), "python": platform.python_version(), "bd": args.bd, **informe}
+    texto = json.dumps(informe, indent=2, ensure_ascii=False)
+    if args.salida:
+        Path(args.salida).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.salida).write_text(texto + "\n", encoding="utf-8")
+    print(texto)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmarks de carga del backend")
+    parser.add_argument("--bd", default=_bd_por_defecto(), help="Base de datos a usar (se sobrescribe al sembrar)")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_sembrar = sub.add_parser("sembrar", help="Reemplaza la base por datos sintéticos")
+    p_sembrar.add_argument("--comandas", type=int, default=100_000)
+    p_sembrar.add_argument("--clientes", type=int, default=50_000)
+    p_sembrar.add_argument("--dias", type=int, default=180, help="Días de historial")
+    p_sembrar.set_defaults(funcion=sembrar)
+
+    p_rush = sub.add_parser("rush", help="Escenario de hora del almuerzo")
+    p_rush.add_argument("--segundos", type=float, default=30)
+    p_rush.add_argument("--comensales", type=int, default=40)
+    p_rush.add_argument("--mesoneras", type=int, default=8)
+    p_rush.add_argument("--cajas", type=int, default=2)
+    p_rush.add_argument("--llamadas", type=int, default=5, help="Clientes llamando a la mesonera")
+    p_rush.add_argument("--salida", help="Archivo JSON donde guardar el informe")
+    p_rush.set_defaults(funcion=rush)
+
+    p_pool = sub.add_parser("pool", help="Compara tamaños de pool de conexiones bajo carga")
+    p_pool.add_argument("--tamanos", default="5,10,25,50,100", help="Valores de maxPoolSize separados por coma")
+    p_pool.add_argument("--concurrencia", type=int, default=200, help="Tareas haciendo consultas a la vez")
+    p_pool.add_argument("--segundos", type=float, default=10, help="Duración de cada tamaño")
+    p_pool.add_argument("--salida", help="Archivo JSON donde guardar el informe")
+    p_pool.set_defaults(funcion=pool)
+
+    args = parser.parse_args()
+    asyncio.run(args.funcion(args))
+
+
+if __name__ == "__main__":
+    main()
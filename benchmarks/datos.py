@@ -0,0 +1,160 @@
+"""
+Datos sintéticos en volumen: catálogo, usuarios, clientes y meses de comandas.
+
+Se inserta con insert_many en lotes directamente en las colecciones de Beanie
+(sin validar modelo por modelo) y al final se recalculan los derivados:
+resúmenes de ventas, archivo de comandas cerradas y ocupación de mesas.
+"""
+import random
+import time
+from datetime import datetime, timedelta
+from bson import ObjectId
+from app.core.archivo import archivar
+from app.core.busqueda import tokens_cliente
+from app.core.ocupacion import ocupacion
+from app.core.resumenes import reconstruir
+from app.core.secuencias import formatear_numero_comanda
+from app.core.security import get_password_hash
+from app.models.cliente import Cliente
+from app.models.comanda import Comanda, ComandaHistorico, EstadoComanda, OrigenComanda, FormaPago
+from app.models.contador import Contador
+from app.models.mesa import Mesa
+from app.models.notificacion import NotificacionMesonera
+from app.models.ocupacion import OcupacionMesa
+from app.models.plato import Plato, CategoriaPlato
+from app.models.resumen import ResumenVentas
+from app.models.user import User, RolUsuario
+
+LOTE = 5000
+CLAVE_USUARIOS = "bench123"
+
+NOMBRES = ["María", "José", "Ana", "Luis", "Carmen", "Jesús", "Rosa", "Carlos", "Andrés", "Sofía", "Ángel", "Lucía", "Raúl", "Inés", "Óscar", "Valentina"]
+APELLIDOS = ["Pérez", "González", "Rodríguez", "Hernández", "García", "Martínez", "López", "Díaz", "Peña", "Sánchez", "Ramírez", "Núñez", "Álvarez", "Muñoz"]
+CATEGORIAS = ["Entradas", "Sopas", "Platos Fuertes", "Parrilla", "Pescados", "Bebidas", "Postres"]
+
+# Día típico: casi todo entre 12:00 y 15:00 y entre 19:00 y 22:00.
+HORAS = [11] * 2 + [12] * 10 + [13] * 14 + [14] * 8 + [15] * 2 + [18] * 2 + [19] * 6 + [20] * 8 + [21] * 5 + [22] * 2
+
+USUARIOS = {
+    RolUsuario.ADMIN: "admin@bench.local",
+    RolUsuario.MESONERA: "mesonera@bench.local",
+    RolUsuario.PUNTO_VENTA: "pos@bench.local",
+    RolUsuario.COCINERO: "cocinero@bench.local",
+}
+
+
+async def _insertar(documento, docs: list[dict]):
+    coleccion = documento.get_motor_collection()
+    for i in range(0, len(docs), LOTE):
+        await coleccion.insert_many(docs[i:i + LOTE], ordered=False)
+
+
+async def limpiar():
+    for documento in (User, Cliente, CategoriaPlato, Plato, Mesa, Comanda, ComandaHistorico, NotificacionMesonera, Contador, OcupacionMesa, ResumenVentas):
+        await documento.get_motor_collection().delete_many({})
+
+
+def _usuarios() -> list[dict]:
+    hashed = get_password_hash(CLAVE_USUARIOS)
+    return [
+        {"_id": ObjectId(), "email": email, "hashed_password": hashed, "nombre": rol.value.title(), "apellido": "Bench", "rol": rol.value, "activo": 1, "created_at": datetime.utcnow()}
+        for rol, email in USUARIOS.items()
+    ]
+
+
+def _catalogo(n_platos: int, n_mesas: int) -> tuple[list[dict], list[dict], list[dict]]:
+    categorias = [{"_id": ObjectId(), "nombre": n, "orden": i, "activo": 1, "created_at": datetime.utcnow()} for i, n in enumerate(CATEGORIAS)]
+    platos = [{
+        "_id": ObjectId(),
+        "categoria_id": str(random.choice(categorias)["_id"]),
+        "nombre": f"Plato {i:03d}",
+        "descripcion": "Descripción de prueba " * random.randint(1, 4),
+        "precio": round(random.uniform(2, 30), 2),
+        "disponible": 1 if random.random() > 0.05 else 0,
+        "created_at": datetime.utcnow(),
+    } for i in range(n_platos)]
+    mesas = [{"_id": ObjectId(), "numero": str(i), "capacidad": random.choice([2, 4, 6]), "activa": 1} for i in range(1, n_mesas + 1)]
+    return categorias, platos, mesas
+
+
+def _clientes(n: int) -> list[dict]:
+    clientes = []
+    for i in range(n):
+        nombre = f"{random.choice(NOMBRES)} {random.choice(NOMBRES)}" if random.random() < 0.3 else random.choice(NOMBRES)
+        apellido = f"{random.choice(APELLIDOS)} {random.choice(APELLIDOS)}"
+        cedula = f"V-{10_000_000 + i}"
+        clientes.append({
+            "_id": ObjectId(), "cedula": cedula, "nombre": nombre, "apellido": apellido, "telefono": f"0414{i:07d}",
+            "busqueda": tokens_cliente(nombre, apellido, cedula), "created_at": datetime.utcnow(),
+        })
+    return clientes
+
+
+def _detalles(platos: list[dict]) -> tuple[list[dict], float]:
+    detalles = []
+    for plato in random.sample(platos, random.randint(1, 6)):
+        cantidad = random.randint(1, 3)
+        detalles.append({
+            "plato_id": str(plato["_id"]), "plato_nombre": plato["nombre"], "cantidad": cantidad,
+            "precio_unitario": plato["precio"], "subtotal": round(plato["precio"] * cantidad, 2),
+            "observaciones": "sin sal" if random.random() < 0.1 else None,
+        })
+    return detalles, round(sum(d["subtotal"] for d in detalles), 2)
+
+
+def _comandas(n: int, dias: int, clientes: list[dict], platos: list[dict], mesas: list[dict], hoy: datetime) -> list[dict]:
+    """Comandas repartidas en `dias` días; las de hoy siguen abiertas, el resto cerradas."""
+    fechas = sorted(
+        hoy - timedelta(days=random.randint(0, dias - 1)) + timedelta(hours=random.choice(HORAS), minutes=random.randint(0, 59))
+        for _ in range(n)
+    )
+    abiertos = [EstadoComanda.PENDIENTE, EstadoComanda.EN_PREPARACION, EstadoComanda.LISTA, EstadoComanda.ENTREGADA]
+    comandas = []
+    for i, creada in enumerate(fechas, start=1):
+        detalles, subtotal = _detalles(platos)
+        if creada >= hoy:
+            estado = random.choice(abiertos)
+        else:
+            estado = EstadoComanda.CANCELADA if random.random() < 0.04 else EstadoComanda.PAGADA
+        origen = random.choice(list(OrigenComanda))
+        comandas.append({
+            "numero": formatear_numero_comanda(i),
+            "mesa_id": str(random.choice(mesas)["_id"]) if origen != OrigenComanda.AREA_CLIENTE or random.random() < 0.5 else None,
+            "cliente_id": str(random.choice(clientes)["_id"]),
+            "estado": estado.value,
+            "forma_pago": random.choice(list(FormaPago)).value if estado == EstadoComanda.PAGADA else None,
+            "origen": origen.value,
+            "subtotal": subtotal, "impuesto": 0.0, "total": subtotal,
+            "detalles": detalles,
+            "created_at": creada,
+            "updated_at": creada + timedelta(minutes=random.randint(5, 90)),
+        })
+    return comandas
+
+
+async def sembrar(comandas: int, clientes: int, dias: int, platos: int = 80, mesas: int = 40, semilla: int = 7) -> dict:
+    """Reemplaza el contenido de la base actual por datos sintéticos. Devuelve tiempos por fase."""
+    random.seed(semilla)
+    tiempos: dict[str, float] = {}
+
+    async def fase(nombre: str, corrutina):
+        inicio = time.perf_counter()
+        resultado = await corrutina
+        tiempos[nombre] = round(time.perf_counter() - inicio, 2)
+        return resultado
+
+    await fase("limpiar", limpiar())
+    categorias, docs_platos, docs_mesas = _catalogo(platos, mesas)
+    docs_clientes = _clientes(clientes)
+    hoy = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    docs_comandas = _comandas(comandas, dias, docs_clientes, [p for p in docs_platos if p["disponible"]], docs_mesas, hoy)
+    await fase("usuarios", _insertar(User, _usuarios()))
+    await fase("categorias", _insertar(CategoriaPlato, categorias))
+    await fase("platos", _insertar(Plato, docs_platos))
+    await fase("mesas", _insertar(Mesa, docs_mesas))
+    await fase("clientes", _insertar(Cliente, docs_clientes))
+    await fase("comandas", _insertar(Comanda, docs_comandas))
+    await fase("resumenes", reconstruir())
+    archivadas = await fase("archivo", archivar())
+    await fase("ocupacion", ocupacion.reconstruir())
+    return {"comandas": comandas, "clientes": clientes, "dias": dias, "archivadas": archivadas, "segundos": tiempos}
@@ -0,0 +1,201 @@
+"""
+Escenario "hora del almuerzo": varios actores concurrentes contra la app en proceso.
+
+- clientes: cargan el menú (revalidando con ETag) y piden mesas disponibles
+- clientes que llaman a la mesonera: POST notificar-mesonera; se mide además
+  cuánto tarda la notificación en llegar al canal de WebSocket
+- mesoneras: crean comandas, listan las abiertas y avanzan su estado
+- caja: búsquedas de facturación por nombre, cédula y rango de fechas
+
+Cada petición se anota con la plantilla de su ruta; el informe da rps,
+errores y p50/p95/p99 por ruta.
+"""
+import asyncio
+import random
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+import httpx
+from app.api.websocket import CANAL_MESONERA
+from app.core.broker import broker
+from app.core.security import create_access_token
+from app.main import app
+from app.models.cliente import Cliente
+from app.models.mesa import Mesa
+from app.models.plato import Plato
+from app.models.user import User, RolUsuario
+from benchmarks.datos import NOMBRES, APELLIDOS
+
+SIGUIENTE_ESTADO = {"pendiente": "en_preparacion", "en_preparacion": "lista", "lista": "entregada", "entregada": "pagada"}
+NOTIFICACION_WS = "WS notificacion_mesonera (entrega)"
+
+
+def percentil(ordenadas: list[float], p: float) -> float:
+    if not ordenadas:
+        return 0.0
+    return ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * p))]
+
+
+class Registro:
+    """Latencias y errores por ruta."""
+
+    def __init__(self):
+        self.latencias: dict[str, list[float]] = defaultdict(list)
+        self.errores: dict[str, int] = defaultdict(int)
+
+    def anotar(self, ruta: str, segundos: float, ok: bool):
+        self.latencias[ruta].append(segundos)
+        if not ok:
+            self.errores[ruta] += 1
+
+    def informe(self, duracion: float) -> dict:
+        rutas = {}
+        for ruta, valores in sorted(self.latencias.items()):
+            ordenadas = sorted(valores)
+            rutas[ruta] = {
+                "peticiones": len(ordenadas),
+                "rps": round(len(ordenadas) / duracion, 1),
+                "errores": self.errores[ruta],
+                "p50_ms": round(percentil(ordenadas, 0.50) * 1000, 2),
+                "p95_ms": round(percentil(ordenadas, 0.95) * 1000, 2),
+                "p99_ms": round(percentil(ordenadas, 0.99) * 1000, 2),
+                "max_ms": round(ordenadas[-1] * 1000, 2),
+            }
+        total = sum(len(v) for ruta, v in self.latencias.items() if ruta != NOTIFICACION_WS)
+        return {"duracion_s": round(duracion, 2), "rps_total": round(total / duracion, 1), "rutas": rutas}
+
+
+class Rush:
+    def __init__(self, cliente: httpx.AsyncClient, registro: Registro, fin: float):
+        self.http = cliente
+        self.registro = registro
+        self.fin = fin
+        self.abiertas: list[tuple[str, str]] = []  # (id, estado) de comandas creadas en el escenario
+        self.notificaciones: dict[str, float] = {}
+        self.tokens: dict[str, str] = {}
+        self.platos: list[str] = []
+        self.mesas: list[str] = []
+
+    async def preparar(self):
+        for rol in (RolUsuario.MESONERA, RolUsuario.PUNTO_VENTA):
+            usuario = await User.find_one({"rol": rol.value, "activo": 1})
+            if not usuario:
+                raise SystemExit("Base sin usuarios: ejecutar antes python -m benchmarks sembrar")
+            self.tokens[rol.value] = create_access_token(data={"sub": str(usuario.id), "rol": rol.value})
+        self.platos = [str(p.id) for p in await Plato.find({"disponible": 1}).to_list()]
+        self.mesas = [str(m.id) for m in await Mesa.find({"activa": 1}).to_list()]
+        broker.suscribir(CANAL_MESONERA, self._notificacion_recibida)
+
+    def _notificacion_recibida(self, mensaje: dict):
+        enviada = self.notificaciones.pop(mensaje.get("mensaje", ""), None)
+        if enviada is not None:
+            self.registro.anotar(NOTIFICACION_WS, time.perf_counter() - enviada, True)
+
+    def _auth(self, rol: str) -> dict:
+        return {"Authorization": f"Bearer {self.tokens[rol]}"}
+
+    async def pedir(self, ruta: str, metodo: str, url: str, ok=(200,), **kwargs) -> httpx.Response:
+        inicio = time.perf_counter()
+        try:
+            r = await self.http.request(metodo, url, **kwargs)
+        except Exception:
+            self.registro.anotar(ruta, time.perf_counter() - inicio, False)
+            raise
+        self.registro.anotar(ruta, time.perf_counter() - inicio, r.status_code in ok)
+        return r
+
+    def _cliente(self) -> dict:
+        return {
+            "cedula": f"V-{random.randint(10_000_000, 10_060_000)}",
+            "nombre": random.choice(NOMBRES), "apellido": random.choice(APELLIDOS), "telefono": "04140000000",
+        }
+
+    async def comensal(self):
+        etag = None
+        while time.perf_counter() < self.fin:
+            headers = {"Accept-Encoding": "gzip"}
+            if etag and random.random() < 0.7:
+                headers["If-None-Match"] = etag
+            r = await self.pedir("GET /api/cliente/menu", "GET", "/api/cliente/menu", ok=(200, 304), headers=headers)
+            etag = r.headers.get("etag", etag)
+            await self.pedir("GET /api/cliente/mesas-disponibles", "GET", "/api/cliente/mesas-disponibles")
+            await asyncio.sleep(random.uniform(0.05, 0.2))
+
+    async def llamada_mesonera(self):
+        while time.perf_counter() < self.fin:
+            mensaje = f"bench-{random.getrandbits(48):x}"
+            self.notificaciones[mensaje] = time.perf_counter()
+            await self.pedir(
+                "POST /api/cliente/notificar-mesonera", "POST", "/api/cliente/notificar-mesonera",
+                params={"mesa_id": random.choice(self.mesas), "mensaje": mensaje},
+            )
+            await asyncio.sleep(random.uniform(0.5, 1.5))
+
+    async def mesonera(self):
+        auth = self._auth(RolUsuario.MESONERA.value)
+        while time.perf_counter() < self.fin:
+            accion = random.random()
+            if accion < 0.4 or not self.abiertas:
+                cuerpo = {
+                    "cliente": self._cliente(), "mesa_id": random.choice(self.mesas), "origen": "mesonera",
+                    "platos": [{"plato_id": p, "cantidad": random.randint(1, 3)} for p in random.sample(self.platos, random.randint(1, 5))],
+                }
+                r = await self.pedir("POST /api/mesonera/comanda", "POST", "/api/mesonera/comanda", json=cuerpo, headers=auth)
+                if r.status_code == 200:
+                    self.abiertas.append((r.json()["id"], "pendiente"))
+            elif accion < 0.7:
+                await self.pedir(
+                    "GET /api/mesonera/comandas?campos=resumen", "GET", "/api/mesonera/comandas",
+                    params={"estado": random.choice(["pendiente", "lista"]), "campos": "resumen"}, headers=auth,
+                )
+            else:
+                comanda_id, estado = self.abiertas.pop(random.randrange(len(self.abiertas)))
+                nuevo = SIGUIENTE_ESTADO[estado]
+                cuerpo = {"estado": nuevo, **({"forma_pago": "efectivo"} if nuevo == "pagada" else {})}
+                r = await self.pedir("PATCH /api/comandas/{id}", "PATCH", f"/api/comandas/{comanda_id}", ok=(200, 409), json=cuerpo, headers=auth)
+                if r.status_code == 200 and nuevo != "pagada":
+                    self.abiertas.append((comanda_id, nuevo))
+            await asyncio.sleep(random.uniform(0.02, 0.1))
+
+    async def caja(self):
+        auth = self._auth(RolUsuario.PUNTO_VENTA.value)
+        while time.perf_counter() < self.fin:
+            accion = random.random()
+            if accion < 0.4:
+                params = {"nombre": random.choice(NOMBRES)[:random.randint(2, 4)]}
+                ruta = "GET /api/facturacion/comandas?nombre="
+            elif accion < 0.6:
+                params = {"cedula": str(random.randint(10_000_000, 10_050_000))[:random.randint(4, 8)]}
+                ruta = "GET /api/facturacion/comandas?cedula="
+            else:
+                desde = date.today() - timedelta(days=random.choice([0, 1, 7, 30]))
+                params = {"fecha_desde": desde.isoformat()}
+                ruta = "GET /api/facturacion/comandas?fecha_desde="
+            await self.pedir(ruta, "GET", "/api/facturacion/comandas", params=params, headers=auth)
+            q = random.choice(NOMBRES)[:3]
+            await self.pedir("GET /api/clientes/buscar", "GET", "/api/clientes/buscar", params={"q": q}, headers=auth)
+            await asyncio.sleep(random.uniform(0.1, 0.3))
+
+
+async def ejecutar(segundos: float, comensales: int, mesoneras: int, cajas: int, llamadas: int, semilla: int = 11) -> dict:
+    """Corre el escenario sobre la base ya inicializada (init_db) y devuelve el informe."""
+    random.seed(semilla)
+    registro = Registro()
+    transporte = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://bench", timeout=30) as cliente:
+        rush = Rush(cliente, registro, fin=0)
+        await rush.preparar()
+        inicio = time.perf_counter()
+        rush.fin = inicio + segundos
+        actores = (
+            [rush.comensal() for _ in range(comensales)]
+            + [rush.mesonera() for _ in range(mesoneras)]
+            + [rush.caja() for _ in range(cajas)]
+            + [rush.llamada_mesonera() for _ in range(llamadas)]
+        )
+        await asyncio.gather(*actores)
+        duracion = time.perf_counter() - inicio
+    informe = registro.informe(duracion)
+    informe["actores"] = {"comensales": comensales, "mesoneras": mesoneras, "cajas": cajas, "llamadas": llamadas}
+    informe["clientes_en_bd"] = await Cliente.count()
+    return informe
@@ -0,0 +1,123 @@
+"""
+Tamaño del pool de conexiones bajo carga concurrente.
+
+Para cada maxPoolSize se abre un cliente nuevo (mismas opciones que init_db) y
+`concurrencia` tareas repiten durante `segundos` una mezcla de consultas de la
+app sobre la base de benchmarks: comanda por _id, listado de abiertas y la
+búsqueda de facturación. Además de la latencia por consulta se mide cuánto
+esperan las operaciones por una conexión libre del pool: si la espera crece con
+pools chicos, el pool es el cuello de botella; si no baja con pools grandes,
+lo es el servidor.
+"""
+import asyncio
+import random
+import time
+from datetime import date, timedelta
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+from app.api.facturacion import _pipeline_busqueda
+from app.config import get_settings
+from app.database import opciones_cliente
+from app.models.comanda import Comanda
+from benchmarks.escenario import Registro, percentil
+
+ABIERTAS = ["pendiente", "en_preparacion", "lista", "entregada"]
+
+
+class EsperaPool(monitoring.ConnectionPoolListener):
+    """Espera por conexión (checkout) y máximo de conexiones abiertas."""
+
+    def __init__(self):
+        self.esperas: list[float] = []
+        self.abiertas = 0
+        self.max_abiertas = 0
+
+    def connection_checked_out(self, event):
+        if event.duration is not None:
+            self.esperas.append(event.duration)
+
+    def connection_created(self, event):
+        self.abiertas += 1
+        self.max_abiertas = max(self.max_abiertas, self.abiertas)
+
+    def connection_closed(self, event):
+        self.abiertas -= 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        pass
+
+    def connection_checked_in(self, event):
+        pass
+
+
+async def _medir(bd: str, tamano: int, concurrencia: int, segundos: float, ids: list) -> dict:
+    espera = EsperaPool()
+    cliente = AsyncIOMotorClient(get_settings().MONGODB_URL, **opciones_cliente(maxPoolSize=tamano, event_listeners=[espera]))
+    comandas = cliente[bd][Comanda.get_collection_name()]
+    registro = Registro()
+    fin = time.perf_counter() + segundos
+
+    async def operacion(nombre: str, corrutina):
+        inicio = time.perf_counter()
+        try:
+            await corrutina
+            registro.anotar(nombre, time.perf_counter() - inicio, True)
+        except Exception:
+            registro.anotar(nombre, time.perf_counter() - inicio, False)
+
+    async def trabajador():
+        while time.perf_counter() < fin:
+            accion = random.random()
+            if accion < 0.5:
+                await operacion("comanda por _id", comandas.find_one({"_id": random.choice(ids)}))
+            elif accion < 0.8:
+                cursor = comandas.find({"estado": {"$in": ABIERTAS}}, {"detalles": 0}).sort("created_at", -1).limit(50)
+                await operacion("comandas abiertas", cursor.to_list(50))
+            else:
+                desde = date.today() - timedelta(days=random.choice([0, 1, 7, 30]))
+                await operacion("facturación por fecha", comandas.aggregate(_pipeline_busqueda(desde, None, 0, 50)).to_list(None))
+
+    try:
+        inicio = time.perf_counter()
+        await asyncio.gather(*(trabajador() for _ in range(concurrencia)))
+        informe = registro.informe(time.perf_counter() - inicio)
+    finally:
+        cliente.close()
+    esperas = sorted(espera.esperas)
+    informe["espera_pool_ms"] = {
+        "p50": round(percentil(esperas, 0.50) * 1000, 2),
+        "p95": round(percentil(esperas, 0.95) * 1000, 2),
+        "p99": round(percentil(esperas, 0.99) * 1000, 2),
+        "max": round(esperas[-1] * 1000, 2) if esperas else 0.0,
+    }
+    informe["conexiones_max"] = espera.max_abiertas
+    return {"max_pool": tamano, **informe}
+
+
+async def comparar(bd: str, tamanos: list[int], concurrencia: int, segundos: float, semilla: int = 13) -> dict:
+    """Corre la misma carga con cada tamaño de pool sobre una base ya sembrada."""
+    random.seed(semilla)
+    muestra = await Comanda.get_motor_collection().aggregate([{"$sample": {"size": 2000}}, {"$project": {"_id": 1}}]).to_list(None)
+    if not muestra:
+        raise SystemExit("Base sin comandas: ejecutar antes python -m benchmarks sembrar")
+    ids = [d["_id"] for d in muestra]
+    resultados = [await _medir(bd, tamano, concurrencia, segundos, ids) for tamano in tamanos]
+    return {"concurrencia": concurrencia, "segundos_por_tamano": segundos, "tamanos": resultados}
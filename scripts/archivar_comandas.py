@@ -0,0 +1,25 @@
+"""
+Mueve a comandas_historico las comandas pagadas/canceladas más viejas que ARCHIVO_EDAD_DIAS.
+
+La API ya lo hace cada ARCHIVO_INTERVALO_SEGUNDOS; esto sirve para la primera
+migración o para correrlo desde cron con ARCHIVO_INTERVALO_SEGUNDOS=0.
+
+    python scripts/archivar_comandas.py
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import init_db
+from app.core.archivo import archivar
+
+
+async def main():
+    await init_db()
+    print(f"Comandas archivadas: {await archivar()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
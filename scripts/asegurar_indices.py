@@ -0,0 +1,27 @@
+"""
+Crea (y ajusta) los índices declarados en los modelos.
+
+Con INDICES_MODO=manual la API arranca sin tocarlos: correr esto en cada deploy,
+antes o después de levantar el servicio.
+
+    python scripts/asegurar_indices.py
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import asegurar_indices, init_db, modelos
+
+
+async def main():
+    await init_db(indices=False)
+    inicio = time.perf_counter()
+    await asegurar_indices()
+    print(f"Índices asegurados en {len(modelos())} colecciones ({time.perf_counter() - inicio:.2f}s)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,73 @@
+"""
+Latencia del event loop durante logins concurrentes: bcrypt en el loop vs. en el pool.
+
+Lanza N verificaciones de contraseña a la vez mientras una tarea "latido" duerme
+intervalos cortos y mide cuánto se retrasa. El retraso es lo que sufren en ese
+momento los WebSocket y las demás requests del mismo worker.
+
+    python scripts/bench_bcrypt.py --logins 12
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config import get_settings
+from app.core.security import get_password_hash, verify_password, verify_password_async
+
+INTERVALO = 0.005
+
+
+async def _latido(retrasos: list[float], fin: asyncio.Event):
+    while not fin.is_set():
+        inicio = time.perf_counter()
+        await asyncio.sleep(INTERVALO)
+        retrasos.append(time.perf_counter() - inicio - INTERVALO)
+
+
+async def _login_bloqueante(hashed: str):
+    # Equivalente al handler anterior: verificación síncrona dentro de la corrutina.
+    await asyncio.sleep(0)
+    verify_password("clave-de-prueba", hashed)
+
+
+async def _login_pool(hashed: str):
+    await verify_password_async("clave-de-prueba", hashed)
+
+
+async def medir(login, logins: int, hashed: str) -> dict:
+    retrasos: list[float] = []
+    fin = asyncio.Event()
+    latido = asyncio.create_task(_latido(retrasos, fin))
+    await asyncio.sleep(INTERVALO * 4)
+    inicio = time.perf_counter()
+    await asyncio.gather(*(login(hashed) for _ in range(logins)))
+    total = time.perf_counter() - inicio
+    fin.set()
+    await latido
+    retrasos_ms = sorted(r * 1000 for r in retrasos)
+    return {
+        "logins_total_s": round(total, 3),
+        "muestras": len(retrasos_ms),
+        "lag_p50_ms": round(statistics.median(retrasos_ms), 2),
+        "lag_p99_ms": round(retrasos_ms[int(len(retrasos_ms) * 0.99) - 1], 2),
+        "lag_max_ms": round(retrasos_ms[-1], 2),
+    }
+
+
+async def main(logins: int):
+    settings = get_settings()
+    hashed = get_password_hash("clave-de-prueba")
+    print(f"bcrypt rounds={settings.BCRYPT_ROUNDS} pool={settings.BCRYPT_MAX_CONCURRENCIA} logins concurrentes={logins}")
+    for nombre, login in (("en el event loop", _login_bloqueante), ("en el pool", _login_pool)):
+        print(f"{nombre:>18}: {await medir(login, logins, hashed)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=12)
+    asyncio.run(main(parser.parse_args().logins))
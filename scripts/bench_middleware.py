@@ -0,0 +1,111 @@
+"""
+Requests/s y p99 de /api/cliente/menu y /api/mesonera/comandas con el stack de
+middlewares anterior (BaseHTTPMiddleware + CORSMiddleware) y con el actual
+(CORS y Compresion ASGI puros).
+
+Corre en proceso con httpx.ASGITransport contra la base de MONGODB_URL, así que
+mide el costo de la app y no el de la red. Necesita un usuario mesonera o admin
+(python scripts/seed_db.py).
+
+    python scripts/bench_middleware.py --concurrencia 20 --segundos 5
+"""
+import argparse
+import asyncio
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from app.database import init_db
+from app.main import app, _cors_origins
+from app.models.user import User, RolUsuario
+from app.core.security import create_access_token
+
+ORIGEN = "https://casa-fernando-frontend.vercel.app"
+VERCEL_REGEX = re.compile(r"^https://[a-z0-9.-]+\.vercel\.app$")
+
+
+class AddCORSHeadersMiddleware(BaseHTTPMiddleware):
+    """Copia del middleware anterior de app/main.py."""
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+        origin = request.headers.get("origin")
+        if origin and (origin in ("http://localhost:3000", ORIGEN) or VERCEL_REGEX.match(origin)):
+            response.headers["Access-Control-Allow-Origin"] = origin
+        response.headers["Access-Control-Allow-Credentials"] = "true"
+        response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, PATCH, DELETE, OPTIONS"
+        response.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization"
+        return response
+
+
+def app_anterior() -> FastAPI:
+    anterior = FastAPI()
+    anterior.router.routes.extend(app.router.routes)
+    anterior.add_middleware(AddCORSHeadersMiddleware)
+    anterior.add_middleware(
+        CORSMiddleware,
+        allow_origins=_cors_origins,
+        allow_origin_regex=r"https://.*\.vercel\.app",
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["*"],
+    )
+    return anterior
+
+
+async def _trabajador(cliente: httpx.AsyncClient, ruta: str, headers: dict, fin: float, latencias: list[float]):
+    while time.perf_counter() < fin:
+        inicio = time.perf_counter()
+        r = await cliente.get(ruta, headers=headers)
+        r.raise_for_status()
+        latencias.append(time.perf_counter() - inicio)
+
+
+async def medir(asgi, ruta: str, headers: dict, concurrencia: int, segundos: float) -> dict:
+    transporte = httpx.ASGITransport(app=asgi)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://bench") as cliente:
+        await cliente.get(ruta, headers=headers)  # calienta caches (catálogo, menú, tokens)
+        latencias: list[float] = []
+        fin = time.perf_counter() + segundos
+        await asyncio.gather(*(_trabajador(cliente, ruta, headers, fin, latencias) for _ in range(concurrencia)))
+        r = await cliente.get(ruta, headers=headers)
+    latencias.sort()
+    return {
+        "rps": round(len(latencias) / segundos, 1),
+        "p50_ms": round(latencias[len(latencias) // 2] * 1000, 2),
+        "p99_ms": round(latencias[int(len(latencias) * 0.99) - 1] * 1000, 2),
+        "bytes": len(r.content),
+        "encoding": r.headers.get("content-encoding", "-"),
+    }
+
+
+async def main(concurrencia: int, segundos: float):
+    await init_db()
+    usuario = await User.find_one({"rol": {"$in": [RolUsuario.MESONERA.value, RolUsuario.ADMIN.value]}, "activo": 1})
+    if not usuario:
+        sys.exit("No hay usuario mesonera/admin: ejecutar python scripts/seed_db.py")
+    token = create_access_token(data={"sub": str(usuario.id), "rol": usuario.rol.value})
+    base = {"Origin": ORIGEN, "Accept-Encoding": "gzip, br"}
+    rutas = [
+        ("/api/cliente/menu", base),
+        ("/api/mesonera/comandas", {**base, "Authorization": f"Bearer {token}"}),
+    ]
+    print(f"concurrencia={concurrencia} segundos={segundos}")
+    for ruta, headers in rutas:
+        for nombre, asgi in (("anterior", app_anterior()), ("actual", app)):
+            print(f"{ruta:<26} {nombre:>8}: {await medir(asgi, ruta, headers, concurrencia, segundos)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrencia", type=int, default=20)
+    parser.add_argument("--segundos", type=float, default=5.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrencia, args.segundos))
@@ -0,0 +1,46 @@
+"""
+Completa el campo `busqueda` de los clientes (typeahead y filtros de facturación).
+
+Los clientes nuevos o actualizados ya lo reciben al crear una comanda; esto es
+para los que existían antes. Con --todos recalcula también los que ya lo tienen.
+
+    python scripts/indexar_clientes.py
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pymongo import UpdateOne
+from app.database import init_db
+from app.models.cliente import Cliente
+from app.core.busqueda import tokens_cliente
+
+LOTE = 1000
+
+
+async def main(todos: bool):
+    await init_db()
+    coleccion = Cliente.get_motor_collection()
+    filtro = {} if todos else {"busqueda": {"$in": [None, []]}}
+    pendientes: list[UpdateOne] = []
+    total = 0
+    async for doc in coleccion.find(filtro, {"nombre": 1, "apellido": 1, "cedula": 1}):
+        tokens = tokens_cliente(doc.get("nombre") or "", doc.get("apellido") or "", doc.get("cedula") or "")
+        pendientes.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"busqueda": tokens}}))
+        if len(pendientes) >= LOTE:
+            await coleccion.bulk_write(pendientes, ordered=False)
+            total += len(pendientes)
+            pendientes = []
+    if pendientes:
+        await coleccion.bulk_write(pendientes, ordered=False)
+        total += len(pendientes)
+    print(f"Clientes indexados: {total}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--todos", action="store_true")
+    asyncio.run(main(parser.parse_args().todos))
@@ -0,0 +1,111 @@
+"""
+Migración única de índices que cambiaron de opciones (correr antes de desplegar).
+
+- clientes.cedula_1 pasa a ser único: si hay cédulas repetidas se listan y, con
+  --fusionar, se conserva el cliente más antiguo y las comandas de los demás
+  pasan a apuntar a él. Luego se reemplaza el índice.
+- comandas.numero_1 es único (en vivas e histórico): la numeración vieja con
+  count() pudo repetir números. Se conserva el número en la comanda más antigua
+  y las demás reciben uno nuevo de la secuencia; se listan para avisar en caja.
+
+init_db no elimina índices: con el índice viejo todavía en la base la API no
+arranca (IndexOptionsConflict), de ahí este paso aparte. El script se conecta sin
+revisar índices y crea los únicos que falten solo después de corregir los datos.
+
+    python scripts/migrar_indices.py
+    python scripts/migrar_indices.py --fusionar
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pymongo import ASCENDING
+from app.database import asegurar_indices_unicos, init_db
+from app.models.cliente import Cliente
+from app.models.comanda import Comanda, ComandaHistorico
+from app.core.secuencias import formatear_numero_comanda, secuencia_comandas
+
+
+async def _indice_unico(coleccion, nombre: str, campo: str) -> bool:
+    """Deja `nombre` como índice único sobre `campo` (lo elimina si existía sin unique)."""
+    indices = await coleccion.index_information()
+    if indices.get(nombre, {}).get("unique"):
+        return False
+    if nombre in indices:
+        await coleccion.drop_index(nombre)
+    await coleccion.create_index([(campo, ASCENDING)], name=nombre, unique=True)
+    return True
+
+
+async def _duplicados(coleccion, campo: str) -> list[dict]:
+    """Grupos {_id: valor, ids: [...]} con más de un documento, del más antiguo al más nuevo."""
+    return await coleccion.aggregate([
+        {"$sort": {"_id": 1}},
+        {"$group": {"_id": f"${campo}", "ids": {"$push": "$_id"}, "n": {"$sum": 1}}},
+        {"$match": {"n": {"$gt": 1}}},
+    ], allowDiskUse=True).to_list(None)
+
+
+async def migrar_cedula(fusionar: bool) -> bool:
+    clientes = Cliente.get_motor_collection()
+    grupos = await _duplicados(clientes, "cedula")
+    if grupos and not fusionar:
+        for g in grupos:
+            print(f"  cédula repetida {g['_id']}: {', '.join(str(i) for i in g['ids'])}")
+        print(f"clientes: {len(grupos)} cédulas repetidas; revisar y correr con --fusionar")
+        return False
+    for g in grupos:
+        conservado, *sobrantes = g["ids"]
+        sobrantes_str = [str(i) for i in sobrantes]
+        for modelo in (Comanda, ComandaHistorico):
+            await modelo.get_motor_collection().update_many({"cliente_id": {"$in": sobrantes_str}}, {"$set": {"cliente_id": str(conservado)}})
+        await clientes.delete_many({"_id": {"$in": sobrantes}})
+    cambiado = await _indice_unico(clientes, "cedula_1", "cedula")
+    print(f"clientes: {len(grupos)} cédulas fusionadas, índice cedula_1 {'reemplazado por único' if cambiado else 'ya era único'}")
+    return True
+
+
+async def migrar_numero() -> bool:
+    # Los números se repiten también entre vivas e histórico: se agrupan juntas.
+    campos = {"numero": 1, "created_at": 1}
+    grupos = await Comanda.get_motor_collection().aggregate([
+        {"$project": {**campos, "historico": {"$literal": False}}},
+        {"$unionWith": {"coll": ComandaHistorico.get_collection_name(), "pipeline": [{"$project": {**campos, "historico": {"$literal": True}}}]}},
+        {"$sort": {"created_at": 1, "_id": 1}},
+        {"$group": {"_id": "$numero", "docs": {"$push": {"id": "$_id", "historico": "$historico"}}, "n": {"$sum": 1}}},
+        {"$match": {"n": {"$gt": 1}}},
+    ], allowDiskUse=True).to_list(None)
+    sobrantes = [doc for g in grupos for doc in g["docs"][1:]]
+    numeros = await secuencia_comandas.siguientes(len(sobrantes)) if sobrantes else []
+    for doc, n in zip(sobrantes, numeros):
+        modelo = ComandaHistorico if doc["historico"] else Comanda
+        nuevo = formatear_numero_comanda(n)
+        anterior = await modelo.get_motor_collection().find_one_and_update({"_id": doc["id"]}, {"$set": {"numero": nuevo}}, {"numero": 1})
+        print(f"  comanda {doc['id']}: {anterior['numero']} -> {nuevo}")
+    for modelo in (Comanda, ComandaHistorico):
+        await _indice_unico(modelo.get_motor_collection(), "numero_1", "numero")
+    print(f"comandas: {len(sobrantes)} renumeradas, índice numero_1 único")
+    return True
+
+
+async def migrar(fusionar: bool) -> bool:
+    # La numeración primero: no depende de la decisión de fusionar clientes.
+    ok = await migrar_numero()
+    if not (await migrar_cedula(fusionar) and ok):
+        return False
+    await asegurar_indices_unicos()
+    return True
+
+
+async def main(fusionar: bool) -> bool:
+    await init_db(indices=None)
+    return await migrar(fusionar)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fusionar", action="store_true", help="Fusionar los clientes con cédula repetida")
+    sys.exit(0 if asyncio.run(main(parser.parse_args().fusionar)) else 1)
@@ -0,0 +1,121 @@
+"""
+Perfil de arranque en frío: importación de módulos, fases de init y primer byte.
+
+1. `python -X importtime -c "import app.main"`: los módulos que más tardan en
+   importarse, agrupados por paquete.
+2. Levanta uvicorn en un puerto libre (como en Render) y mide cuánto tarda en
+   responder la primera request a /api/cliente/menu, desde el lanzamiento del
+   proceso. Las fases del lifespan se leen de /metrics.
+
+    python scripts/perfil_arranque.py
+    python scripts/perfil_arranque.py --indices segundo_plano --salida resultados/arranque.json
+"""
+import argparse
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+
+RAIZ = Path(__file__).parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from app.config import get_settings
+
+LINEA_IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+LINEA_FASE = re.compile(r'app_startup_phase_seconds\{fase="([^"]+)"\} (\S+)')
+
+
+def perfil_importacion(top: int) -> dict:
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=RAIZ, capture_output=True, text=True, check=True,
+    )
+    propio_por_paquete: dict[str, int] = defaultdict(int)
+    total_us = 0
+    for linea in proceso.stderr.splitlines():
+        m = LINEA_IMPORTTIME.match(linea)
+        if not m:
+            continue
+        propio, acumulado, sangria, modulo = int(m[1]), int(m[2]), m[3], m[4]
+        propio_por_paquete[modulo.split(".")[0]] += propio
+        if modulo == "app.main" and len(sangria) == 1:
+            total_us = acumulado
+    paquetes = sorted(propio_por_paquete.items(), key=lambda kv: kv[1], reverse=True)[:top]
+    return {
+        "import_app_main_ms": round(total_us / 1000, 1),
+        "por_paquete_ms": {paquete: round(us / 1000, 1) for paquete, us in paquetes},
+    }
+
+
+def _puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def perfil_servidor(indices: str | None, timeout: float) -> dict:
+    puerto = _puerto_libre()
+    entorno = {**os.environ, "METRICAS_HABILITADAS": "true", **({"INDICES_MODO": indices} if indices else {})}
+    inicio = time.perf_counter()
+    servidor = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(puerto), "--log-level", "warning"],
+        cwd=RAIZ, env=entorno,
+    )
+    base = f"http://127.0.0.1:{puerto}"
+    try:
+        while True:
+            if servidor.poll() is not None:
+                raise SystemExit(f"uvicorn terminó al arrancar (código {servidor.returncode})")
+            if time.perf_counter() - inicio > timeout:
+                raise SystemExit(f"Sin respuesta tras {timeout}s")
+            try:
+                r = httpx.get(f"{base}/api/cliente/menu", timeout=timeout)
+                break
+            except httpx.TransportError:
+                time.sleep(0.02)
+        primer_byte = time.perf_counter() - inicio
+        segunda = time.perf_counter()
+        httpx.get(f"{base}/api/cliente/menu")
+        segunda = time.perf_counter() - segunda
+        fases = {}
+        token = get_settings().METRICAS_TOKEN
+        metricas = httpx.get(f"{base}/metrics", headers={"Authorization": f"Bearer {token}"} if token else {})
+        if metricas.status_code == 200:
+            fases = {m[1]: round(float(m[2]), 3) for m in LINEA_FASE.finditer(metricas.text)}
+    finally:
+        servidor.terminate()
+        servidor.wait(timeout=10)
+    return {
+        "indices": indices or entorno.get("INDICES_MODO", "arranque"),
+        "primer_byte_s": round(primer_byte, 3),
+        "estado_primera_respuesta": r.status_code,
+        "segunda_respuesta_ms": round(segunda * 1000, 1),
+        "fases_s": fases,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perfil de arranque en frío")
+    parser.add_argument("--indices", choices=["arranque", "segundo_plano", "manual"], help="INDICES_MODO (por defecto el de .env)")
+    parser.add_argument("--top", type=int, default=15, help="Paquetes a listar en el perfil de importación")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--salida", help="Archivo JSON donde guardar el informe")
+    args = parser.parse_args()
+
+    informe = {"importacion": perfil_importacion(args.top), "servidor": perfil_servidor(args.indices, args.timeout)}
+    texto = json.dumps(informe, indent=2, ensure_ascii=False)
+    if args.salida:
+        Path(args.salida).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.salida).write_text(texto + "\n", encoding="utf-8")
+    print(texto)
+
+
+if __name__ == "__main__":
+    main()
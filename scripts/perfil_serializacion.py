@@ -0,0 +1,113 @@
+"""
+Perfil de CPU de la serialización de comandas: camino anterior vs. actual.
+
+Anterior: ComandaResponse campo a campo, revalidación de FastAPI contra el
+response_model y json estándar. Actual: dict desde el documento + orjson
+(core.respuestas). No toca la base de datos: las comandas son sintéticas.
+
+    python scripts/perfil_serializacion.py --comandas 500 --top 12
+"""
+import argparse
+import cProfile
+import io
+import json
+import pstats
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bson import ObjectId
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+from app.models.comanda import Comanda, ComandaDetalleEmbedded, EstadoComanda, OrigenComanda
+from app.schemas.comanda import ComandaResponse, ComandaDetalleResponse
+from app.core.relaciones import comanda_response
+
+
+def comandas_sinteticas(n: int) -> list[Comanda]:
+    inicio = datetime(2024, 1, 1, 12)
+    comandas = []
+    for i in range(n):
+        detalles = [
+            ComandaDetalleEmbedded(plato_id=str(ObjectId()), plato_nombre=f"Plato {j}", cantidad=2, precio_unitario=7.5, subtotal=15.0, observaciones="sin cebolla" if j % 3 == 0 else None)
+            for j in range(random.randint(2, 8))
+        ]
+        comandas.append(Comanda.model_construct(
+            id=ObjectId(), numero=f"CMD-{i:06d}", mesa_id=str(ObjectId()), cliente_id=str(ObjectId()), usuario_id=None,
+            estado=random.choice(list(EstadoComanda)), forma_pago=None, origen=OrigenComanda.MESONERA,
+            subtotal=sum(d.subtotal for d in detalles), impuesto=0.0, total=sum(d.subtotal for d in detalles),
+            observaciones=None, detalles=detalles, created_at=inicio + timedelta(minutes=i),
+        ))
+    return comandas
+
+
+CLIENTE = SimpleNamespace(nombre="Ana", apellido="Pérez", cedula="V-12345678")
+MESA = SimpleNamespace(numero="4")
+ADAPTADOR_LISTA = TypeAdapter(list[ComandaResponse])
+ADAPTADOR_UNA = TypeAdapter(ComandaResponse)
+
+
+def _response_anterior(c: Comanda) -> ComandaResponse:
+    return ComandaResponse(
+        id=str(c.id), numero=c.numero, mesa_id=c.mesa_id, mesa_numero=MESA.numero, cliente_id=c.cliente_id,
+        estado=c.estado, forma_pago=c.forma_pago, origen=c.origen, subtotal=c.subtotal, impuesto=c.impuesto,
+        total=c.total, observaciones=c.observaciones, created_at=c.created_at,
+        detalles=[ComandaDetalleResponse(plato_id=d.plato_id, plato_nombre=d.plato_nombre, cantidad=d.cantidad, precio_unitario=d.precio_unitario, subtotal=d.subtotal, observaciones=d.observaciones) for d in c.detalles],
+        cliente_nombre=f"{CLIENTE.nombre} {CLIENTE.apellido}", cliente_cedula=CLIENTE.cedula,
+    )
+
+
+def _fastapi_anterior(adaptador: TypeAdapter, contenido) -> bytes:
+    # Lo que hacía serialize_response: validar contra response_model, volcar a JSON-compatible y json.dumps.
+    validado = adaptador.validate_python(contenido, from_attributes=True)
+    return JSONResponse(adaptador.dump_python(validado, mode="json")).body
+
+
+ESCENARIOS = {
+    "listar_comandas_mesonera": {
+        "anterior": lambda cs: _fastapi_anterior(ADAPTADOR_LISTA, [_response_anterior(c) for c in cs]),
+        "actual": lambda cs: ORJSONResponse([comanda_response(c, CLIENTE, MESA) for c in cs]).body,
+    },
+    "actualizar_comanda": {
+        "anterior": lambda cs: [_fastapi_anterior(ADAPTADOR_UNA, _response_anterior(c)) for c in cs],
+        "actual": lambda cs: [ORJSONResponse(comanda_response(c, CLIENTE, MESA)).body for c in cs],
+    },
+}
+
+
+def perfilar(funcion, comandas: list[Comanda], top: int) -> tuple[float, str]:
+    perfil = cProfile.Profile()
+    inicio = time.perf_counter()
+    perfil.runcall(funcion, comandas)
+    total = time.perf_counter() - inicio
+    salida = io.StringIO()
+    pstats.Stats(perfil, stream=salida).sort_stats("cumulative").print_stats(top)
+    return total, salida.getvalue()
+
+
+def main(n: int, top: int, detalle: bool):
+    random.seed(1)
+    comandas = comandas_sinteticas(n)
+    assert json.loads(ESCENARIOS["listar_comandas_mesonera"]["anterior"](comandas)) == json.loads(ESCENARIOS["listar_comandas_mesonera"]["actual"](comandas))
+    for escenario, caminos in ESCENARIOS.items():
+        tiempos = {}
+        for nombre, funcion in caminos.items():
+            tiempos[nombre], informe = perfilar(funcion, comandas, top)
+            if detalle:
+                print(f"===== {escenario} / {nombre} =====\n{informe}")
+        print(f"{escenario:<26} comandas={n} anterior={tiempos['anterior'] * 1000:.1f}ms actual={tiempos['actual'] * 1000:.1f}ms "
+              f"({tiempos['anterior'] / tiempos['actual']:.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--comandas", type=int, default=500)
+    parser.add_argument("--top", type=int, default=12, help="Funciones por perfil (orden acumulado)")
+    parser.add_argument("--resumen", action="store_true", help="Solo los tiempos, sin los perfiles")
+    args = parser.parse_args()
+    main(args.comandas, args.top, not args.resumen)
@@ -0,0 +1,18 @@
+"""Recalcula los resúmenes de ventas (resumen_ventas) desde el historial de comandas."""
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import init_db
+from app.core.resumenes import reconstruir
+
+
+async def main():
+    await init_db()
+    print(f"Resúmenes generados: {await reconstruir()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
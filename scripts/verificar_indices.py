@@ -0,0 +1,146 @@
+"""
+Comprueba que cada forma de consulta usada en app/api/* tiene un índice.
+
+Crea los índices declarados en los modelos sobre una base de datos aparte
+(por defecto <bd>_explain), la siembra con datos sintéticos si está vacía,
+ejecuta explain() sobre cada consulta y falla si alguna planifica un COLLSCAN.
+
+    python scripts/verificar_indices.py
+    python scripts/verificar_indices.py --bd casa_fernando_explain --documentos 2000
+"""
+import argparse
+import asyncio
+import random
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bson import ObjectId
+from app import database
+from app.config import get_settings
+from app.database import init_db
+from app.api.facturacion import _pipeline_busqueda
+from app.core.busqueda import filtro_busqueda, tokens_cliente
+from app.core.ocupacion import ESTADOS_ACTIVOS
+from app.api.websocket import ESTADOS_COCINA
+
+ACTIVOS = [e.value for e in ESTADOS_ACTIVOS]
+COCINA = [e.value for e in ESTADOS_COCINA]
+HACE_UNA_SEMANA = datetime(2024, 1, 1) - timedelta(days=7)
+
+# (descripción, colección, filtro, orden)
+CONSULTAS_FIND = [
+    ("mesonera.listar_comandas_mesonera (todas)", "comandas", {}, {"created_at": -1}),
+    ("mesonera.listar_comandas_mesonera (?estado=)", "comandas", {"estado": "pendiente"}, {"created_at": -1}),
+    ("ocupacion.registrar (otra comanda activa en la mesa)", "comandas", {"mesa_id": "x", "estado": {"$in": ACTIVOS}}, {"created_at": -1}),
+    ("ocupacion.reconstruir", "comandas", {"mesa_id": {"$ne": None}, "estado": {"$in": ACTIVOS}}, {"created_at": 1}),
+    ("websocket.websocket_cocina (snapshot)", "comandas", {"estado": {"$in": COCINA}}, {"created_at": 1}),
+    ("mesonera.listar_notificaciones_pendientes", "notificaciones_mesonera", {"atendida": 0}, {"created_at": -1}),
+    ("archivo.archivar", "comandas", {"estado": {"$in": ["pagada", "cancelada"]}, "created_at": {"$lt": HACE_UNA_SEMANA}}, None),
+    ("archivo (histórico por cliente)", "comandas_historico", {"cliente_id": "x", "created_at": {"$gte": HACE_UNA_SEMANA}}, None),
+    ("catalogo.cargar (platos)", "platos", {}, {"nombre": 1}),
+    ("platos disponibles", "platos", {"disponible": 1}, {"nombre": 1}),
+    ("catalogo.cargar (categorías)", "categorias_plato", {}, {"orden": 1}),
+    ("categorías activas", "categorias_plato", {"activo": 1}, {"orden": 1}),
+    ("catalogo.cargar (mesas)", "mesas", {}, {"numero": 1}),
+    ("admin.listar_mesas", "mesas", {}, {"numero": 1}),
+    ("admin.crear_mesa (número repetido)", "mesas", {"numero": "1"}, None),
+    ("cliente_area._crear_comanda (cliente por cédula)", "clientes", {"cedula": "V-1"}, None),
+    ("cliente_area._crear_comandas_lote (claves ya sincronizadas)", "comandas", {"clave_idempotencia": {"$in": ["a", "b"], "$type": "string"}}, None),
+    ("cliente_area._crear_comandas_lote (claves archivadas)", "comandas_historico", {"clave_idempotencia": {"$in": ["a", "b"], "$type": "string"}}, None),
+    ("cliente_area._crear_comandas_lote (clientes por cédula)", "clientes", {"cedula": {"$in": ["V-1", "V-2"]}}, None),
+    ("busqueda.buscar_clientes (nombre)", "clientes", filtro_busqueda("nombre1 apell"), None),
+    ("busqueda.buscar_clientes (cédula)", "clientes", filtro_busqueda("V-12"), None),
+    ("auth.login", "users", {"email": "a@b.c", "activo": 1}, None),
+    ("ocupacion (por mesa)", "ocupacion_mesas", {"mesa_id": "x"}, None),
+    ("secuencias (contador)", "contadores", {"nombre": "comanda"}, None),
+]
+
+
+def consultas_aggregate() -> list[tuple[str, str, list]]:
+    """(descripción, colección, pipeline). Se arma tras init_db: los $lookup usan nombres de colección de Beanie."""
+    return [
+        ("facturacion.buscar_comandas (sin filtros)", "comandas", _pipeline_busqueda(None, None, 0, 50)),
+        ("facturacion.buscar_comandas (rango de fechas)", "comandas", _pipeline_busqueda(HACE_UNA_SEMANA.date(), None, 0, 50)),
+        ("facturacion.buscar_comandas (clientes encontrados)", "comandas", _pipeline_busqueda(None, None, 0, 50, cliente_ids=["a", "b"])),
+        ("facturacion.buscar_comandas (con histórico)", "comandas", _pipeline_busqueda(HACE_UNA_SEMANA.date(), None, 0, 50, incluir_historico=True)),
+        ("facturacion.buscar_comandas (demasiados clientes)", "comandas", _pipeline_busqueda(None, None, 0, 50, filtro_cliente=filtro_busqueda("ana", campo="cliente.busqueda"))),
+    ]
+
+
+async def sembrar(db, n: int):
+    """Inserta datos sintéticos en las colecciones vacías."""
+    if await db.comandas.estimated_document_count():
+        return
+    mesas = [{"_id": ObjectId(), "numero": str(i), "capacidad": 4, "activa": 1} for i in range(1, 21)]
+    categorias = [{"_id": ObjectId(), "nombre": f"Categoría {i}", "orden": i, "activo": 1} for i in range(5)]
+    platos = [{"_id": ObjectId(), "categoria_id": str(random.choice(categorias)["_id"]), "nombre": f"Plato {i}", "precio": 5.0, "disponible": 1} for i in range(50)]
+    clientes = [
+        {"_id": ObjectId(), "cedula": f"V-{i}", "nombre": f"Nombre{i}", "apellido": f"Apellido{i}", "telefono": "0", "busqueda": tokens_cliente(f"Nombre{i}", f"Apellido{i}", f"V-{i}")}
+        for i in range(n // 4)
+    ]
+    estados = ["pendiente", "en_preparacion", "lista", "entregada", "pagada", "cancelada"]
+    inicio = datetime(2024, 1, 1) - timedelta(days=90)
+    comandas = [{
+        "numero": f"CMD-{i:06d}",
+        "mesa_id": str(random.choice(mesas)["_id"]),
+        "cliente_id": str(random.choice(clientes)["_id"]),
+        "estado": random.choice(estados),
+        "origen": "mesonera",
+        "total": 10.0,
+        "detalles": [],
+        "created_at": inicio + timedelta(minutes=i * 60),
+    } for i in range(n)]
+    notificaciones = [{"mensaje": "x", "atendida": random.randint(0, 1), "created_at": inicio + timedelta(minutes=i)} for i in range(n // 4)]
+    await db.mesas.insert_many(mesas)
+    await db.categorias_plato.insert_many(categorias)
+    await db.platos.insert_many(platos)
+    await db.clientes.insert_many(clientes)
+    await db.comandas.insert_many(comandas)
+    await db.notificaciones_mesonera.insert_many(notificaciones)
+
+
+def _tiene_collscan(plan) -> bool:
+    """Busca una etapa COLLSCAN en el plan ganador (ignora rejectedPlans)."""
+    if isinstance(plan, dict):
+        if plan.get("stage") == "COLLSCAN":
+            return True
+        return any(_tiene_collscan(v) for k, v in plan.items() if k != "rejectedPlans")
+    if isinstance(plan, list):
+        return any(_tiene_collscan(v) for v in plan)
+    return False
+
+
+async def verificar(nombre_bd: str, documentos: int) -> bool:
+    await init_db(nombre_bd)
+    db = database.client.get_database(nombre_bd)
+    await sembrar(db, documentos)
+    ok = True
+    for descripcion, coleccion, filtro, orden in CONSULTAS_FIND:
+        comando = {"find": coleccion, "filter": filtro}
+        if orden:
+            comando["sort"] = orden
+        plan = await db.command("explain", comando, verbosity="queryPlanner")
+        ok &= _informar(descripcion, plan)
+    for descripcion, coleccion, pipeline in consultas_aggregate():
+        plan = await db.command("explain", {"aggregate": coleccion, "pipeline": pipeline, "cursor": {}}, verbosity="queryPlanner")
+        ok &= _informar(descripcion, plan)
+    return ok
+
+
+def _informar(descripcion: str, plan: dict) -> bool:
+    collscan = _tiene_collscan(plan)
+    print(f"{'COLLSCAN' if collscan else 'ok':>8}  {descripcion}")
+    return not collscan
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--bd", default=None, help="Base de datos a usar (default: <bd de MONGODB_URL>_explain)")
+    parser.add_argument("--documentos", type=int, default=2000, help="Comandas sintéticas a sembrar")
+    args = parser.parse_args()
+    from pymongo.uri_parser import parse_uri
+    nombre = args.bd or f"{parse_uri(get_settings().MONGODB_URL)['database'] or 'casa_fernando'}_explain"
+    sys.exit(0 if asyncio.run(verificar(nombre, args.documentos)) else 1)
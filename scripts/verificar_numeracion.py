@@ -0,0 +1,45 @@
+"""
+Verifica que la secuencia de números de comanda no repite valores bajo concurrencia.
+
+Simula varios workers (instancias independientes de la secuencia) pidiendo
+cientos de números en paralelo contra la MongoDB configurada. Usa un contador
+propio que se elimina al terminar, por lo que no altera la numeración real.
+Las altas completas por el endpoint (índice único y reintento incluidos) las
+prueba tests/test_numeracion.py.
+
+    python scripts/verificar_numeracion.py --workers 4 --pedidos 500 --bloque 20
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import init_db
+from app.models.contador import Contador
+from app.core.secuencias import Secuencia
+
+NOMBRE = "verificacion_numeracion"
+
+
+async def verificar(workers: int, pedidos: int, bloque: int) -> bool:
+    await init_db()
+    await Contador.find(Contador.nombre == NOMBRE).delete()
+    secuencias = [Secuencia(NOMBRE, bloque=bloque) for _ in range(workers)]
+    try:
+        numeros = await asyncio.gather(*(secuencias[i % workers].siguiente() for i in range(pedidos)))
+    finally:
+        await Contador.find(Contador.nombre == NOMBRE).delete()
+    repetidos = len(numeros) - len(set(numeros))
+    print(f"{pedidos} números pedidos por {workers} workers (bloque {bloque}): {len(set(numeros))} únicos, {repetidos} repetidos")
+    return repetidos == 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--pedidos", type=int, default=500)
+    parser.add_argument("--bloque", type=int, default=20)
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(verificar(args.workers, args.pedidos, args.bloque)) else 1)
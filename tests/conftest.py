@@ -0,0 +1,40 @@
+import os
+import uuid
+import pytest
+
+pytest_plugins = ["app.pytest_plugin", "pytester"]
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def _reiniciar_caches():
+    """Las cachés de proceso (catálogo, ocupación, bloque de números) son de la base anterior."""
+    from app.core.catalogo import catalogo
+    from app.core.ocupacion import ocupacion
+    from app.core.secuencias import secuencia_comandas
+    catalogo.invalidar()
+    ocupacion.por_mesa, ocupacion._cargado_en = {}, None
+    secuencia_comandas._inicializada, secuencia_comandas._siguiente, secuencia_comandas._limite = False, 1, 0
+
+
+@pytest.fixture
+async def bd():
+    """
+    Base MongoDB desechable (se borra al terminar), sin índices: cada test crea los
+    que necesita. Los tests que la usan se saltan si no hay MONGODB_URL en el entorno.
+    """
+    if not os.environ.get("MONGODB_URL"):
+        pytest.skip("MONGODB_URL no definida: tests contra MongoDB desactivados")
+    from app import database
+    nombre = f"casa_fernando_test_{uuid.uuid4().hex[:8]}"
+    await database.init_db(nombre, indices=None)
+    _reiniciar_caches()
+    try:
+        yield database.database
+    finally:
+        await database.client.drop_database(nombre)
+        database.client.close()
+        _reiniciar_caches()
@@ -0,0 +1,41 @@
+from app.core.busqueda import SIN_COINCIDENCIAS, filtro_busqueda, tokens_cliente
+
+
+def _prefijos(filtro: dict) -> list[str]:
+    """Prefijos de la rama indexada (la primera del $or)."""
+    por_tokens = filtro["$or"][0]
+    condiciones = por_tokens.get("$and", [por_tokens])
+    return [c["busqueda"]["$regex"] for c in condiciones]
+
+
+def test_tokens_cliente():
+    assert tokens_cliente("María José", "Peña", "V-12.345.678") == ["maria", "jose", "pena", "12345678"]
+
+
+def test_sin_busqueda_no_filtra():
+    assert filtro_busqueda() is None
+    assert filtro_busqueda("  ", "") is None
+
+
+def test_busqueda_sin_palabras_no_coincide_con_nada():
+    assert filtro_busqueda("!!") is SIN_COINCIDENCIAS
+    assert filtro_busqueda("-") is SIN_COINCIDENCIAS
+    assert filtro_busqueda(cedula="V-") is SIN_COINCIDENCIAS
+
+
+def test_palabras_por_prefijo_sin_acentos():
+    assert _prefijos(filtro_busqueda("Peña Á")) == ["^pena", "^a"]
+
+
+def test_q_con_forma_de_cedula():
+    assert _prefijos(filtro_busqueda("V-12.3")) == ["^123"]
+
+
+def test_cedula_explicita_no_se_reemplaza_por_q():
+    assert _prefijos(filtro_busqueda("12", cedula="V-9")) == ["^12", "^9"]
+
+
+def test_clientes_sin_indexar_por_regex():
+    sin_indexar = filtro_busqueda("ana", campo="cliente.busqueda")["$or"][1]["$and"]
+    assert sin_indexar[0] == {"cliente.busqueda": {"$in": [None, []]}}
+    assert sin_indexar[1]["$or"][0] == {"cliente.nombre": {"$regex": "ana", "$options": "i"}}
@@ -0,0 +1,150 @@
+"""
+Presupuesto de consultas sin MongoDB: los comandos se simulan entregando
+CommandStartedEvent al listener, como lo hace el driver.
+"""
+import logging
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pymongo import monitoring
+from app.core.consultas import (
+    ContadorComandos,
+    PresupuestoConsultas,
+    PresupuestoExcedido,
+    _es_find_por_id,
+    contar_consultas,
+    forma_comando,
+    max_consultas,
+)
+
+listener = ContadorComandos()
+
+
+def comando(documento: dict, bd: str = "casa_fernando"):
+    """Como lo ve el driver: el nombre del comando es la primera clave."""
+    listener.started(monitoring.CommandStartedEvent(documento, bd, 1, ("localhost", 27017), 1))
+
+
+def find_por_id(coleccion: str = "comandas", _id="abc"):
+    comando({"find": coleccion, "filter": {"_id": _id}, "limit": 1})
+
+
+def test_forma_comando_find_sin_valores():
+    forma = forma_comando("find", {"find": "comandas", "filter": {"estado": {"$in": ["pendiente", "lista"]}, "mesa_id": "m1"}})
+    assert forma == 'find comandas {"estado": {"$in": ["?", "..."]}, "mesa_id": "?"}'
+
+
+def test_forma_comando_por_tipo():
+    assert forma_comando("aggregate", {"aggregate": "comandas", "pipeline": [{"$sort": {"_id": 1}}, {"$match": {"numero": "C-1"}}]}) == 'aggregate comandas {"numero": "?"}'
+    assert forma_comando("update", {"update": "mesas", "updates": [{"q": {"_id": 1}, "u": {"$set": {"x": 1}}}]}) == 'update mesas {"_id": "?"}'
+    assert forma_comando("delete", {"delete": "mesas", "deletes": [{"q": {"mesa_id": 2}, "limit": 1}]}) == 'delete mesas {"mesa_id": "?"}'
+    assert forma_comando("findAndModify", {"findAndModify": "secuencias", "query": {"_id": "comandas"}}) == 'findAndModify secuencias {"_id": "?"}'
+    assert forma_comando("getMore", {"getMore": 123, "collection": "comandas"}) == "getMore comandas"
+    assert forma_comando("insert", {"insert": "comandas", "documents": [{}]}) == "insert comandas"
+
+
+def test_es_find_por_id():
+    assert _es_find_por_id("find", {"find": "comandas", "filter": {"_id": "abc"}})
+    assert not _es_find_por_id("find", {"find": "comandas", "filter": {"_id": {"$in": ["a", "b"]}}})
+    assert not _es_find_por_id("find", {"find": "comandas", "filter": {"_id": "abc", "estado": "lista"}})
+    assert not _es_find_por_id("aggregate", {"aggregate": "comandas", "pipeline": [{"$match": {"_id": "abc"}}]})
+
+
+def test_contar_consultas_ignora_comandos_del_driver():
+    with contar_consultas() as contador:
+        comando({"ping": 1}, "admin")
+        comando({"hello": 1}, "admin")
+        find_por_id()
+        find_por_id(_id="otro")
+    assert contador.total == 2
+    assert contador.repetidas_por_id(2) == [('find comandas {"_id": "?"}', 2)]
+
+
+def test_max_consultas_dentro_del_limite():
+    with max_consultas(2) as contador:
+        find_por_id()
+        find_por_id()
+    assert contador.total == 2
+
+
+def test_max_consultas_excedido():
+    with pytest.raises(PresupuestoExcedido, match=r"3 consultas \(máximo 2\): 3x find comandas"):
+        with max_consultas(2):
+            for _ in range(3):
+                find_por_id()
+
+
+def test_max_consultas_como_decorador():
+    @max_consultas(1)
+    def dos_consultas():
+        find_por_id()
+        find_por_id("mesas")
+
+    with pytest.raises(PresupuestoExcedido):
+        dos_consultas()
+
+
+def test_presupuesto_consultas_fixture(presupuesto_consultas):
+    find_por_id()  # fuera del bloque: no cuenta
+    with presupuesto_consultas(1) as contador:
+        find_por_id()
+    assert contador.total == 1
+
+
+def test_consultas_fixture(consultas):
+    find_por_id()
+    comando({"aggregate": "comandas", "pipeline": [{"$match": {"estado": "lista"}}], "cursor": {}})
+    assert consultas.total == 2, consultas.resumen()
+
+
+def _app_de_prueba(consultas_por_request: int) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/comandas")
+    async def listar():
+        for i in range(consultas_por_request):
+            find_por_id(_id=i)
+        return {"ok": True}
+
+    return app
+
+
+@pytest.mark.max_consultas(2)
+def test_endpoint_dentro_del_presupuesto():
+    respuesta = TestClient(_app_de_prueba(2)).get("/comandas")
+    assert respuesta.status_code == 200
+
+
+@pytest.mark.max_consultas(0)
+def test_root_no_consulta_la_base():
+    from app.main import app
+    assert TestClient(app).get("/").json()["app"] == "Casa Fernando Backend"
+
+
+def test_marca_max_consultas_hace_fallar_el_test(pytester):
+    pytester.makeconftest('pytest_plugins = ["app.pytest_plugin"]')
+    pytester.makepyfile(
+        """
+        import pytest
+        from pymongo import monitoring
+        from app.core.consultas import ContadorComandos
+
+        @pytest.mark.max_consultas(1)
+        def test_dos_consultas():
+            for _ in range(2):
+                ContadorComandos().started(monitoring.CommandStartedEvent({"find": "mesas", "filter": {}}, "bd", 1, ("localhost", 27017), 1))
+        """
+    )
+    resultado = pytester.runpytest_inprocess()
+    resultado.assert_outcomes(failed=1)
+    resultado.stdout.fnmatch_lines(["*PresupuestoExcedido: 2 consultas (máximo 1)*"])
+
+
+def test_middleware_avisa_n_mas_uno(caplog):
+    app = PresupuestoConsultas(_app_de_prueba(4), presupuesto=3, repeticiones_max=3)
+    with caplog.at_level(logging.WARNING, logger="app.core.consultas"):
+        respuesta = TestClient(app).get("/comandas")
+    assert respuesta.status_code == 200
+    mensajes = [r.getMessage() for r in caplog.records]
+    assert any("GET /comandas hizo 4 consultas (presupuesto 3)" in m for m in mensajes)
+    assert any("repitió 4 veces" in m and "N+1" in m for m in mensajes)
@@ -0,0 +1,21 @@
+from app.core.middleware import codificaciones_aceptadas
+
+
+def test_codificaciones_aceptadas():
+    assert codificaciones_aceptadas("gzip, deflate, br") == {"gzip", "deflate", "br"}
+    assert codificaciones_aceptadas("GZIP;q=0.5") == {"gzip"}
+    assert codificaciones_aceptadas("") == set()
+
+
+def test_q_cero_rechaza():
+    assert codificaciones_aceptadas("gzip;q=0, identity") == {"identity"}
+    assert codificaciones_aceptadas("gzip; q=0.0") == set()
+
+
+def test_tokens_parecidos_no_cuentan():
+    assert "gzip" not in codificaciones_aceptadas("x-gzip-foo")
+
+
+def test_comodin():
+    assert codificaciones_aceptadas("*") == {"gzip", "br"}
+    assert codificaciones_aceptadas("*, gzip;q=0") == {"br"}
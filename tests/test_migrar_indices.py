@@ -0,0 +1,79 @@
+"""scripts/migrar_indices.py sobre una base anterior: índices sin unique y datos repetidos."""
+from datetime import datetime, timedelta
+import pytest
+from bson import ObjectId
+from app.database import asegurar_indices_unicos
+from app.models.cliente import Cliente
+from app.models.comanda import Comanda, ComandaHistorico
+from scripts.migrar_indices import migrar
+
+pytestmark = pytest.mark.anyio
+
+HACE_UN_DIA = datetime.utcnow() - timedelta(days=1)
+
+
+def _comanda(numero: str, cliente_id: str, minutos: int) -> dict:
+    return {"_id": ObjectId(), "numero": numero, "cliente_id": cliente_id, "estado": "pagada", "created_at": HACE_UN_DIA + timedelta(minutes=minutos)}
+
+
+async def _base_anterior():
+    clientes = Cliente.get_motor_collection()
+    original, repetido = ObjectId(), ObjectId()
+    await clientes.insert_many([
+        {"_id": original, "cedula": "V-1", "nombre": "Ana", "apellido": "Pérez"},
+        {"_id": repetido, "cedula": "V-1", "nombre": "Ana", "apellido": "Perez"},
+    ])
+    await clientes.create_index("cedula", name="cedula_1")
+    vivas, historico = Comanda.get_motor_collection(), ComandaHistorico.get_motor_collection()
+    await historico.insert_many([_comanda("CMD-000001", str(original), 0), _comanda("CMD-000002", str(original), 1)])
+    await vivas.insert_many([
+        _comanda("CMD-000002", str(repetido), 2),
+        _comanda("CMD-000003", str(repetido), 3),
+        _comanda("CMD-000003", str(original), 4),
+    ])
+    for coleccion in (vivas, historico):
+        await coleccion.create_index("numero", name="numero_1")
+    return original, repetido
+
+
+async def _numeros() -> list[str]:
+    return [
+        doc["numero"]
+        for modelo in (Comanda, ComandaHistorico)
+        async for doc in modelo.get_motor_collection().find({}, {"numero": 1})
+    ]
+
+
+async def test_sin_migrar_los_unicos_no_se_pueden_crear(bd):
+    await _base_anterior()
+    with pytest.raises(RuntimeError, match="migrar_indices.py"):
+        await asegurar_indices_unicos()
+
+
+async def test_migrar_sin_fusionar_no_toca_clientes(bd):
+    await _base_anterior()
+    assert not await migrar(fusionar=False)
+    assert await Cliente.get_motor_collection().count_documents({"cedula": "V-1"}) == 2
+    assert not (await Cliente.get_motor_collection().index_information())["cedula_1"].get("unique")
+
+
+async def test_migrar_corrige_datos_y_crea_los_unicos(bd):
+    original, repetido = await _base_anterior()
+    assert await migrar(fusionar=True)
+
+    numeros = await _numeros()
+    assert len(numeros) == 5 and len(set(numeros)) == 5
+    # Conserva su número la comanda más antigua de cada grupo; las demás siguen a la más alta.
+    assert sorted(numeros) == ["CMD-000001", "CMD-000002", "CMD-000003", "CMD-000004", "CMD-000005"]
+    assert await ComandaHistorico.get_motor_collection().count_documents({"numero": "CMD-000002"}) == 1
+
+    clientes = Cliente.get_motor_collection()
+    assert [doc["_id"] async for doc in clientes.find({"cedula": "V-1"})] == [original]
+    assert await Comanda.get_motor_collection().count_documents({"cliente_id": str(repetido)}) == 0
+
+    for coleccion, nombre in ((clientes, "cedula_1"), (Comanda.get_motor_collection(), "numero_1"), (ComandaHistorico.get_motor_collection(), "numero_1")):
+        assert (await coleccion.index_information())[nombre]["unique"]
+
+    # Repetirla no cambia nada.
+    assert await migrar(fusionar=True)
+    assert sorted(await _numeros()) == sorted(numeros)
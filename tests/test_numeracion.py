@@ -0,0 +1,61 @@
+"""Numeración de comandas bajo carga: cientos de altas simultáneas por el endpoint público."""
+import asyncio
+import httpx
+import pytest
+from app.database import asegurar_indices
+from app.models.comanda import Comanda
+from app.models.contador import Contador
+from app.models.plato import CategoriaPlato, Plato
+
+pytestmark = pytest.mark.anyio
+
+ALTAS = 300
+
+
+async def _plato() -> str:
+    categoria = await CategoriaPlato(nombre="Principales").insert()
+    return str((await Plato(categoria_id=str(categoria.id), nombre="Pabellón", precio=12.5).insert()).id)
+
+
+def _comanda(i: int, plato_id: str) -> dict:
+    # Diez cédulas para que también coincidan altas de un mismo cliente nuevo.
+    return {
+        "origen": "area_cliente",
+        "cliente": {"cedula": f"V-{i % 10}", "nombre": "Cliente", "apellido": str(i % 10), "telefono": "0414"},
+        "platos": [{"plato_id": plato_id, "cantidad": 1}],
+    }
+
+
+async def _crear_en_paralelo(plato_id: str) -> list[httpx.Response]:
+    from app.main import app
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        return await asyncio.gather(*(client.post("/api/cliente/comanda", json=_comanda(i, plato_id)) for i in range(ALTAS)))
+
+
+def _numero(texto: str) -> int:
+    return int(texto.removeprefix("CMD-"))
+
+
+async def test_altas_simultaneas_sin_repetir_ni_saltar_numeros(bd):
+    await asegurar_indices()
+    respuestas = await _crear_en_paralelo(await _plato())
+
+    assert [r.status_code for r in respuestas] == [200] * ALTAS
+    numeros = sorted(_numero(r.json()["numero"]) for r in respuestas)
+    assert numeros == list(range(1, ALTAS + 1))
+    assert await Comanda.count() == ALTAS
+
+
+async def test_contador_desfasado_reintenta_con_otro_numero(bd):
+    # Contador por detrás de comandas ya guardadas: los primeros números chocan con el índice único.
+    await asegurar_indices()
+    await Comanda.get_motor_collection().insert_many([
+        {"numero": "CMD-000001", "cliente_id": "x", "estado": "pagada", "origen": "area_cliente"},
+        {"numero": "CMD-000002", "cliente_id": "x", "estado": "pagada", "origen": "area_cliente"},
+    ])
+    await Contador.get_motor_collection().insert_one({"nombre": "comanda", "valor": 0})
+    respuestas = await _crear_en_paralelo(await _plato())
+
+    assert [r.status_code for r in respuestas] == [200] * ALTAS
+    numeros = sorted(_numero(doc["numero"]) async for doc in Comanda.get_motor_collection().find({}, {"numero": 1}))
+    assert numeros == list(range(1, ALTAS + 3))